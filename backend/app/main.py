@@ -1,19 +1,40 @@
 from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, Header
 from fastapi.responses import HTMLResponse
 from fastapi.responses import JSONResponse
+from fastapi.responses import PlainTextResponse
+from fastapi.responses import Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
-from app.services.cache_service import get_price
+from app.services.cache_service import CACHE_DIR
+from app.services.price_hub import price_hub, get_latest_price, get_latest_prices
+from app.services.price_bus import price_bus_subscriber
+from app.services.poller_supervisor import poller_supervisor
 from app.services.rss_service import rss_service
 from app.services.forex_factory_service import forex_factory_service
+from app.services.preset_service import preset_registry
+from app.services.event_stream import event_stream_hub
+from app.services.json_service import FastJSONResponse, send_json
+from app.services.price_protocol import PackedPriceEncoder, wants_packed
+from app.services.rotation_service import rotation_snapshot, rotation_fingerprint, MAX_ROTATION_ITEMS
+from app.services.warmup_service import warmup_service
+from app.services.chart_history_service import chart_history_db
+from app.services.widget_service import widget_render_service
+from app.models.auth_models import auth_db
+from app.models.price_models import PriceRecord, stream_entry
 from app.routes.mt5_routes import router as mt5_router
 from app.routes.auth_routes import router as auth_router
 # from app.routes.account_routes import router as account_router
-# from app.routes.widget_routes import router as widget_router
+from app.routes.widget_routes import router as widget_router
+from app.routes.profiler_routes import router as profiler_router
 from app.middleware.auth_middleware import AuthMiddleware
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.profiling_middleware import ProfilingMiddleware
+from app.services.metrics_service import metrics, WS_CLIENTS, WS_SEND_DURATION, WS_MESSAGES
 # from app.services.fivers_api_client import initialize_api_client
 from dotenv import load_dotenv
 import asyncio
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 import os
 import json
@@ -25,10 +46,31 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-load_dotenv("C:/WidgetForge/widgetforge-backend/.env")
-
-app = FastAPI()
+# WIDGETFORGE_ENV_FILE overrides the production .env location
+load_dotenv(os.getenv("WIDGETFORGE_ENV_FILE", "C:/WidgetForge/widgetforge-backend/.env"))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # POLLER_MODE=supervised runs the pollers in-process; otherwise they run as separate processes
+    await poller_supervisor.start()
+    if not poller_supervisor.enabled:
+        # External pollers can push prices to every worker over the local price bus (PRICE_BUS)
+        await price_bus_subscriber.start()
+    # Warm caches in the background; /ready reports 503 until this finishes
+    await warmup_service.start()
+    try:
+        yield
+    finally:
+        await warmup_service.stop()
+        await price_bus_subscriber.stop()
+        await poller_supervisor.stop()
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+# Innermost: needs the user resolved by AuthMiddleware
+app.add_middleware(ProfilingMiddleware)
 app.add_middleware(AuthMiddleware)
+# Added last so it is outermost and the latency includes authentication
+app.add_middleware(MetricsMiddleware)
 
 # Initialize 5ers API client if configured
 # fivers_api_key = os.getenv("FIVERS_API_KEY")
@@ -43,130 +85,226 @@ app.add_middleware(AuthMiddleware)
 app.include_router(mt5_router)
 app.include_router(auth_router)
 # app.include_router(account_router)
-# app.include_router(widget_router)
+app.include_router(widget_router)
+app.include_router(profiler_router)
 
 
 static_path = os.path.join(os.path.dirname(__file__), "static")
 app.mount("/static", StaticFiles(directory=static_path), name="static")
 
 # ✅ Mount .cache as /static/data
-cache_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".cache"))
-app.mount("/static/data", StaticFiles(directory=cache_path), name="data")
+app.mount("/static/data", StaticFiles(directory=CACHE_DIR), name="data")
 
 templates = Jinja2Templates(directory="app/templates")
 
+def _compile_templates():
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
+
+# Start-up warm-up steps, in order (see warmup_service and /ready)
+warmup_service.register("auth_db", lambda: auth_db.get() is not None)
+warmup_service.register("calendar", lambda: len(forex_factory_service.get_upcoming_events(MAX_ROTATION_ITEMS, "High")))
+warmup_service.register("rotation", lambda: len(rotation_snapshot.get_response_bytes()))
+warmup_service.register("chart_db", chart_history_db.open)
+warmup_service.register("templates", _compile_templates)
+# WARMUP_BASE_URL (public URL widgets are loaded from) enables pre-rendering default/preset widgets
+warmup_service.register("widgets", lambda: widget_render_service.warm(app, os.getenv("WARMUP_BASE_URL")))
+
+# Seconds between price frames on /ws/price-stream
+PRICE_STREAM_INTERVAL = 1.0
+
+# Seconds between payload rebuilds for the SSE news/rotation streams
+STREAM_REFRESH_INTERVAL = float(os.getenv("STREAM_REFRESH_INTERVAL", "15"))
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 
 @app.get("/ping")
 def ping():
     return {"status": "ok"}
 
+@app.get("/ready")
+def ready():
+    """Readiness for load balancers: 200 once the start-up warm-up has finished, 503 before"""
+    status = warmup_service.get_status()
+    return FastJSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/metrics")
+def get_metrics():
+    """Prometheus text exposition of API and poller metrics"""
+    return PlainTextResponse(metrics.render_all(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 @app.get("/api/rss/financial-juice")
 async def get_financial_juice_news(max_items: int = 20):
     """Get Financial Juice news from RSS feed"""
     try:
         news_items = rss_service.fetch_financial_juice_news(max_items)
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": news_items,
             "count": len(news_items)
-        }
+        })
     except Exception as e:
-        return {
+        return FastJSONResponse({
             "success": False,
             "error": str(e),
             "data": []
-        }
+        })
+
+@app.get("/api/rss/financial-juice/stream")
+async def stream_financial_juice_news(max_items: int = 20):
+    """Server-Sent Events stream of Financial Juice news, pushed when new items arrive"""
+    max_items = max(1, min(max_items, 50))
+
+    def produce():
+        news_items = rss_service.fetch_financial_juice_news(max_items)
+        return {"success": True, "data": news_items, "count": len(news_items)}
+
+    messages = event_stream_hub.stream(f"financial_juice:{max_items}", "news", produce, STREAM_REFRESH_INTERVAL)
+    return StreamingResponse(messages, media_type="text/event-stream", headers=SSE_HEADERS)
 
 @app.get("/api/rss/myfxbook-economic-calendar")
 async def get_myfxbook_economic_calendar(max_items: int = 20):
     """Get MyFXBook economic calendar events from RSS feed"""
     try:
         calendar_events = rss_service.fetch_myfxbook_economic_calendar(max_items)
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": calendar_events,
             "count": len(calendar_events)
-        }
+        })
     except Exception as e:
-        return {
+        return FastJSONResponse({
             "success": False,
             "error": str(e),
             "data": []
-        }
+        })
 
 @app.get("/api/rss/all-economic-news")
 async def get_all_economic_news(max_items: int = 20):
     """Get combined economic news from all RSS sources"""
     try:
         all_news = rss_service.fetch_all_economic_news(max_items)
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": all_news,
             "count": len(all_news),
             "sources": list(set([item.get('source', 'Unknown') for item in all_news]))
-        }
+        })
     except Exception as e:
-        return {
+        return FastJSONResponse({
             "success": False,
             "error": str(e),
             "data": []
-        }
+        })
+
+
+def _price_batch_response(prices, since_seq: int, missing=()):
+    """
+    Body of the bulk price endpoints: one read of the price store, so every
+    record comes from the same batch. ``seq`` is the cursor for the next
+    ``since_seq``; with ``since_seq`` only records that moved since are sent
+    (prices without a sequence number are always sent).
+    """
+    seq = max([since_seq] + [data.get("seq") or 0 for data in prices.values()])
+    if since_seq:
+        prices = {symbol: data for symbol, data in prices.items() if not data.get("seq") or data["seq"] > since_seq}
+    return FastJSONResponse({
+        "success": True,
+        "seq": seq,
+        "since_seq": since_seq,
+        "count": len(prices),
+        "data": prices,
+        "missing": list(missing),
+    })
+
+# Declared before /price/{symbol} so "all" is not taken for a symbol
+@app.get("/price/all")
+def get_all_prices(since_seq: int = 0):
+    return _price_batch_response(get_latest_prices(), since_seq)
 
+@app.get("/price")
+def get_prices(symbols: str, since_seq: int = 0):
+    requested = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols.split(",") if symbol.strip()))
+    if not requested:
+        return FastJSONResponse({"success": False, "error": "No symbols requested", "data": {}}, status_code=400)
+    prices = get_latest_prices(requested)
+    return _price_batch_response(prices, since_seq, [symbol for symbol in requested if symbol not in prices])
 
 @app.get("/price/{symbol}")
 def get_price_data(symbol: str):
-    data = get_price(symbol)
+    data = get_latest_price(symbol)
     if not data:
         return {"error": "Not found"}
-    return data
+    if isinstance(data, PriceRecord):
+        # Encoded once per tick, shared by every request
+        return Response(data.to_json(), media_type="application/json")
+    return FastJSONResponse(data)
 
 @app.websocket("/ws/price-stream")
 async def price_stream(websocket: WebSocket):
-    await websocket.accept()
-    print("[WS] Client connected to /ws/price-stream")
+    # Opt-in compact binary frames: ?format=packed or the widgetforge.packed.v2 subprotocol
+    packed, subprotocol = wants_packed(websocket.query_params.get("format"), websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    print(f"[WS] Client connected to /ws/price-stream{' (packed)' if packed else ''}")
 
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    symbols_file = os.path.join(base_dir, "pollers", "symbols.txt")
-
-    try:
-        with open(symbols_file, 'r') as f:
-            symbols = [line.strip() for line in f if line.strip()]
-        print(f"[INFO] Loaded {len(symbols)} symbols from symbols.txt")
-    except FileNotFoundError:
-        await websocket.close()
-        print("[ERROR] symbols.txt not found")
-        return
-    except Exception as e:
+    symbols = preset_registry.get_symbols()
+    if not symbols:
         await websocket.close()
-        print(f"[ERROR] Error reading symbols.txt: {e}")
+        print("[ERROR] No symbols configured in symbols.txt")
         return
+    print(f"[INFO] Streaming {len(symbols)} symbols")
+
+    clients = WS_CLIENTS.labels("price")
+    send_duration = WS_SEND_DURATION.labels("price")
+    messages_sent = WS_MESSAGES.labels("price")
+    clients.inc()
+
+    seq = price_hub.seq
+    encoder = PackedPriceEncoder() if packed else None
 
     try:
         while True:
-            payload = []
-            for symbol in symbols:
-                try:
-                    data = get_price(symbol)
-                    if data:
-                        payload.append({
-                            "symbol": symbol,
-                            "price": data.get("price"),
-                            "change_pct": data.get("change_pct"),
-                            "spread": data.get("spread")
-                        })
+            cycle_start = time.perf_counter()
+            # Re-read each cycle so symbols.txt hot reloads reach open streams
+            symbols = preset_registry.get_symbols()
+
+            if encoder is not None:
+                prices = {symbol: get_latest_price(symbol) for symbol in symbols}
+                for frame in encoder.encode(symbols, prices):
+                    if isinstance(frame, bytes):
+                        await websocket.send_bytes(frame)
                     else:
-                        print(f"[WARN] No price data available for: {symbol}")
-                except Exception as e:
-                    print(f"[ERROR] Error retrieving data for {symbol}: {e}")
-
-            # Fallback dummy payload to avoid frontend disconnect
-            if not payload:
-                payload = [{"symbol": "N/A", "price": None, "change_pct": None, "spread": None}]
-
-            await websocket.send_json(payload)
-            await asyncio.sleep(1)
+                        await websocket.send_text(frame)
+            else:
+                payload = []
+                for symbol in symbols:
+                    try:
+                        data = get_latest_price(symbol)
+                        if data:
+                            payload.append(stream_entry(symbol, data))
+                        else:
+                            print(f"[WARN] No price data available for: {symbol}")
+                    except Exception as e:
+                        print(f"[ERROR] Error retrieving data for {symbol}: {e}")
+
+                # Fallback dummy payload to avoid frontend disconnect
+                if not payload:
+                    payload = [{"symbol": "N/A", "price": None, "change_pct": None, "spread": None}]
+
+                await send_json(websocket, payload)
+            send_duration.observe(time.perf_counter() - cycle_start)
+            messages_sent.inc()
+            if price_hub.active:
+                # Supervised pollers: send as soon as the next poll pass lands
+                seq = await price_hub.wait_for_update(seq, PRICE_STREAM_INTERVAL)
+            else:
+                await asyncio.sleep(PRICE_STREAM_INTERVAL)
     except WebSocketDisconnect:
         print("[WS] Client disconnected from /ws/price-stream")
+    finally:
+        clients.dec()
     
 @app.get("/admin/login", response_class=HTMLResponse)
 async def admin_login(request: Request):
@@ -175,10 +313,7 @@ async def admin_login(request: Request):
 
 @app.get("/admin/ticker", response_class=HTMLResponse)
 async def admin_ticker(request: Request):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    symbols_file = os.path.join(base_dir, "pollers", "symbols.txt")
-    with open(symbols_file, 'r') as f:
-        all_assets = [line.strip() for line in f if line.strip()]
+    all_assets = preset_registry.get_symbols()
 
     selected_assets = request.query_params.getlist("symbols")
     return templates.TemplateResponse("admin_ticker.html", {
@@ -200,10 +335,7 @@ async def admin_ticker(request: Request):
 
 @app.get("/admin/enhanced-ticker", response_class=HTMLResponse)
 async def admin_enhanced_ticker(request: Request):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    symbols_file = os.path.join(base_dir, "pollers", "symbols.txt")
-    with open(symbols_file, 'r') as f:
-        all_assets = [line.strip() for line in f if line.strip()]
+    all_assets = preset_registry.get_symbols()
     
     return templates.TemplateResponse("admin_enhanced_ticker.html", {
         "request": request,
@@ -236,92 +368,6 @@ async def widget_ticker(request: Request):
         "websocket_host": "62.171.135.138:8000"
     })
 
-@app.get("/widgets/enhanced-ticker", response_class=HTMLResponse)
-async def enhanced_ticker_widget(request: Request):
-    params = request.query_params
-    return templates.TemplateResponse("enhanced_ticker_widget.html", {
-        "request": request,
-        # Data Configuration
-        "symbols": params.get("symbols", ""),
-        "static_text": params.get("staticText", ""),
-        "websocket_host": request.headers.get("host", "62.171.135.138:8000"),
-        
-        # Display Mode
-        "display_mode": params.get("display_mode", "scroll"),  # scroll, static, grid, card, compact
-        "update_animation": params.get("update_animation", "none"),  # none, fade, slide
-        
-        # Typography
-        "font": params.get("font", "Inter"),
-        "font_size": params.get("fontSize", "16"),
-        "font_weight": params.get("fontWeight", "400"),
-        "font_color": params.get("fontColor", "#ffffff"),
-        
-        # Colors
-        "bg_color": params.get("bgColor", "#000000"),
-        "bg_gradient": params.get("bgGradient", ""),
-        "asset_color": params.get("assetColor", "#ffffff"),
-        "asset_font_weight": params.get("assetFontWeight", "600"),
-        "asset_font_size": params.get("assetFontSize", "100"),
-        "price_font_weight": params.get("priceFontWeight", "500"),
-        "up_color": params.get("upColor", "#00ff88"),
-        "down_color": params.get("downColor", "#ff4444"),
-        "neutral_color": params.get("neutralColor", "#cccccc"),
-        "spread_color": params.get("spreadColor", "#999999"),
-        "spread_opacity": params.get("spreadOpacity", "0.8"),
-        "spread_font_size": params.get("spreadFontSize", "85"),
-        "change_font_size": params.get("changeFontSize", "90"),
-        
-        # Layout
-        "padding": params.get("padding", "0"),
-        "item_spacing": params.get("itemSpacing", "20"),
-        "item_margin": params.get("itemMargin", "30"),
-        "item_gap": params.get("itemGap", "8"),
-        "item_layout": params.get("itemLayout", "row"),  # row, column
-        "item_align": params.get("itemAlign", "center"),
-        
-        # Scroll Mode
-        "scroll_speed": params.get("scrollSpeed", "30"),
-        
-        # Static Mode
-        "static_align": params.get("staticAlign", "center"),  # left, center, right
-        
-        # Grid Mode
-        "grid_columns": params.get("gridColumns", "3"),
-        "grid_gap": params.get("gridGap", "20"),
-        "grid_padding": params.get("gridPadding", "20"),
-        
-        # Card Mode
-        "card_gap": params.get("cardGap", "15"),
-        "card_padding": params.get("cardPadding", "20"),
-        "card_bg_color": params.get("cardBgColor", "rgba(255,255,255,0.05)"),
-        "card_border_width": params.get("cardBorderWidth", "1"),
-        "card_border_color": params.get("cardBorderColor", "rgba(255,255,255,0.1)"),
-        "card_border_radius": params.get("cardBorderRadius", "8"),
-        "card_inner_padding": params.get("cardInnerPadding", "15"),
-        "card_shadow": params.get("cardShadow", "0 2px 8px rgba(0,0,0,0.1)"),
-        "card_hover_shadow": params.get("cardHoverShadow", "0 4px 16px rgba(0,0,0,0.2)"),
-        
-        # Features
-        "show_spread": params.get("showSpread", "true"),
-        "show_timestamp": params.get("showTimestamp", "false"),
-        "timestamp_format": params.get("timestampFormat", "time"),  # time, short, full
-        "timestamp_color": params.get("timestampColor", "#666666"),
-        "timestamp_font_size": params.get("timestampFontSize", "80"),
-        "timestamp_opacity": params.get("timestampOpacity", "0.7"),
-        "show_connection_status": params.get("showConnectionStatus", "false"),
-        "price_decimals": params.get("priceDecimals", "5"),
-        
-        # Logo
-        "show_logo": params.get("showLogo", "false"),
-        "logo_url": params.get("logoUrl", ""),
-        "logo_position": params.get("logoPosition", "top"),  # top, bottom
-        "logo_height": params.get("logoHeight", "30"),
-        "logo_margin": params.get("logoMargin", "10px"),
-        
-        # Custom CSS
-        "custom_css": params.get("customCSS", "")
-    })
-
 @app.get("/widgets/test-simple", response_class=HTMLResponse)
 async def test_simple_widget(request: Request):
     params = request.query_params
@@ -332,83 +378,6 @@ async def test_simple_widget(request: Request):
         "show_spread": params.get("showSpread", "true")
     })
 
-@app.get("/widgets/smooth-ticker", response_class=HTMLResponse)
-async def smooth_ticker_widget(request: Request):
-    params = request.query_params
-    return templates.TemplateResponse("smooth_ticker_widget.html", {
-        "request": request,
-        # Data Configuration
-        "symbols": params.get("symbols", ""),
-        "static_text": params.get("staticText", ""),
-        "websocket_host": "5ers-stream.ddns.net" if "5ers-stream.ddns.net" in request.headers.get("host", "") else "127.0.0.1:8000",
-        "websocket_protocol": "wss" if "5ers-stream.ddns.net" in request.headers.get("host", "") else "ws",
-        
-        # Typography
-        "font": params.get("font", "Inter"),
-        "font_size": params.get("fontSize", "16"),
-        "font_weight": params.get("fontWeight", "400"),
-        "font_color": params.get("fontColor", "#ffffff"),
-        
-        # Colors
-        "bg_color": params.get("bgColor", "#000000"),
-        "bg_gradient": params.get("bgGradient", ""),
-        "asset_color": params.get("assetColor", "#ffffff"),
-        "up_color": params.get("upColor", "#00ff88"),
-        "down_color": params.get("downColor", "#ff4444"),
-        "neutral_color": params.get("neutralColor", "#cccccc"),
-        "spread_color": params.get("spreadColor", "#999999"),
-        
-        # Animation
-        "scroll_speed": params.get("scrollSpeed", "30"),
-        
-        # Features
-        "show_spread": params.get("showSpread", "true"),
-        "show_connection_status": params.get("showConnectionStatus", "false"),
-        
-        # Logo
-        "show_logo": params.get("showLogo", "false"),
-        "logo_url": params.get("logoUrl", ""),
-        "logo_height": params.get("logoHeight", "30")
-    })
-
-@app.get("/widgets/canvas-ticker", response_class=HTMLResponse)
-async def canvas_ticker_widget(request: Request):
-    params = request.query_params
-    return templates.TemplateResponse("canvas_ticker_widget.html", {
-        "request": request,
-        # Data Configuration
-        "symbols": params.get("symbols", ""),
-        "static_text": params.get("staticText", ""),
-        "websocket_host": request.headers.get("host", "62.171.135.138:8000"),
-        
-        # Typography
-        "font": params.get("font", "Inter"),
-        "font_size": params.get("fontSize", "16"),
-        "font_weight": params.get("fontWeight", "400"),
-        "font_color": params.get("fontColor", "#ffffff"),
-        
-        # Colors
-        "bg_color": params.get("bgColor", "#000000"),
-        "bg_gradient": params.get("bgGradient", ""),
-        "asset_color": params.get("assetColor", "#ffffff"),
-        "up_color": params.get("upColor", "#00ff88"),
-        "down_color": params.get("downColor", "#ff4444"),
-        "neutral_color": params.get("neutralColor", "#cccccc"),
-        "spread_color": params.get("spreadColor", "#999999"),
-        
-        # Animation
-        "scroll_speed": params.get("scrollSpeed", "30"),
-        
-        # Features
-        "show_spread": params.get("showSpread", "true"),
-        "show_connection_status": params.get("showConnectionStatus", "false"),
-        
-        # Logo
-        "show_logo": params.get("showLogo", "false"),
-        "logo_url": params.get("logoUrl", ""),
-        "logo_height": params.get("logoHeight", "30")
-    })
-
 @app.get("/widgets/market-sessions", response_class=HTMLResponse)
 async def market_sessions_widget(request: Request):
     params = dict(request.query_params)
@@ -509,15 +478,10 @@ async def rotating_asset_minimal_widget(request: Request):
 
 @app.get("/assets", response_class=HTMLResponse)
 async def get_assets():
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    symbols_file = os.path.join(base_dir, "pollers", "symbols.txt")
-
-    try:
-        with open(symbols_file, "r") as f:
-            symbols = [line.strip() for line in f if line.strip()]
-        return "<option>" + "</option><option>".join(symbols) + "</option>"
-    except Exception as e:
-        return f"<option disabled>Error loading symbols</option>"
+    symbols = preset_registry.get_symbols()
+    if not symbols:
+        return "<option disabled>Error loading symbols</option>"
+    return "<option>" + "</option><option>".join(symbols) + "</option>"
     
 
 @app.get("/admin/enhanced-account-builder", response_class=HTMLResponse)
@@ -634,97 +598,65 @@ async def get_upcoming_events(max_items: int = 20, impact: str = None):
     """Get upcoming Forex Factory economic calendar events"""
     try:
         events = forex_factory_service.get_upcoming_events(max_items, impact)
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": events,
             "count": len(events)
-        }
+        })
     except Exception as e:
         logger.error(f"Error in Forex Factory API endpoint: {e}")
-        return {
+        return FastJSONResponse({
             "success": False,
             "error": str(e),
             "data": []
-        }
+        })
 
 @app.get("/api/forex-factory/high-impact")
 async def get_high_impact_events(max_items: int = 10):
     """Get upcoming high-impact Forex Factory events"""
     try:
         events = forex_factory_service.get_high_impact_events(max_items)
-        return {
+        return FastJSONResponse({
             "success": True,
             "data": events,
             "count": len(events)
-        }
+        })
     except Exception as e:
         logger.error(f"Error in high-impact events API endpoint: {e}")
-        return {
+        return FastJSONResponse({
             "success": False,
             "error": str(e),
             "data": []
-        }
+        })
+
+@app.get("/api/forex-factory/changes")
+async def get_calendar_changes(since_seq: int = 0):
+    """Event-level calendar changes (added/removed/rescheduled/changed) newer than since_seq"""
+    try:
+        entries = await asyncio.to_thread(forex_factory_service.get_changes, since_seq)
+        return FastJSONResponse({
+            "success": True,
+            "data": entries,
+            "count": len(entries),
+            "seq": entries[-1]["seq"] if entries else since_seq
+        })
+    except Exception as e:
+        logger.error(f"Error in calendar changes API endpoint: {e}")
+        return FastJSONResponse({
+            "success": False,
+            "error": str(e),
+            "data": []
+        })
 
 @app.get("/api/combined/rotation-data")
 async def get_rotation_data(news_count: int = 8, events_count: int = 8):
     """Get data for rotating widget display with cross-referenced news"""
     try:
-        # Get news data from all sources (fetch more to find relevant items, then limit display)
-        all_news_items = rss_service.fetch_all_economic_news(50)
-        news_items = all_news_items[:news_count]
-        
-        # Get ONLY Forex Factory high-impact events (past and upcoming)
-        recent_past_events = forex_factory_service.get_recent_past_events(events_count, "High") 
-        upcoming_events = forex_factory_service.get_upcoming_events(events_count, "High")
-        
-        # Enhance events with actual results from RSS news
-        enhanced_past_events = forex_factory_service.enhance_events_with_rss_results(recent_past_events, all_news_items)
-        enhanced_upcoming_events = forex_factory_service.enhance_events_with_rss_results(upcoming_events, all_news_items)
-        
-        # Combine events with priority for upcoming events (ensure USD PPI and other future events show)
-        # Prioritize upcoming events, then fill remaining slots with past events
-        max_upcoming = max(6, events_count // 2)  # Ensure at least 6 upcoming events or half the total
-        max_past = events_count - len(enhanced_upcoming_events[:max_upcoming])
-
-        calendar_display_events = enhanced_upcoming_events[:max_upcoming] + enhanced_past_events[:max_past]
-        
-        # Remove duplicates based on title and country
-        seen_events = set()
-        deduplicated_events = []
-        for event in calendar_display_events:
-            event_key = (event.get('title', ''), event.get('country', ''))
-            if event_key not in seen_events:
-                seen_events.add(event_key)
-                deduplicated_events.append(event)
-
-        calendar_display_events = deduplicated_events
-
-        # Sort combined events by timestamp for proper chronological order
-        calendar_display_events.sort(key=lambda x: x.get('timestamp', 0))
-        all_events = forex_factory_service.get_todays_events() + upcoming_events
-        
-        # Cross-reference news with calendar events (but keep chronological order)
-        enhanced_news = rss_service.cross_reference_with_calendar(news_items, all_events)
-        
-        # Get pinned items (but disable pinned event to avoid duplicates)
-        pinned_news = rss_service.get_recent_high_impact_news()
-        pinned_event = None  # Disable pinned event since we show recent events in main list
-        
-        return {
-            "success": True,
-            "data": {
-                "news_feed": {
-                    "items": enhanced_news,
-                    "pinned": pinned_news
-                },
-                "calendar_feed": {
-                    "items": calendar_display_events,
-                    "pinned": pinned_event
-                },
-                "rotation_ready": True,
-                "last_updated": datetime.now().isoformat()
-            }
-        }
+        # Served from the precomputed snapshot; only a stale snapshot is rebuilt (off the event loop)
+        body = rotation_snapshot.peek_response_bytes(news_count, events_count)
+        if body is None:
+            body = await asyncio.to_thread(rotation_snapshot.get_response_bytes, news_count, events_count)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Error in rotation data API endpoint: {e}")
         return {
@@ -733,58 +665,17 @@ async def get_rotation_data(news_count: int = 8, events_count: int = 8):
             "data": {}
         }
 
-@app.get("/widgets/rotating-financial-news", response_class=HTMLResponse)
-async def rotating_financial_news_widget(request: Request):
-    """Rotating widget combining Financial Juice news and Forex Factory calendar"""
-    params = request.query_params
-    
-    return templates.TemplateResponse("rotating_financial_news_widget.html", {
-        "request": request,
-        # Widget configuration
-        "title": params.get("title", "Market & Economic News"),
-        "rotation_interval": int(params.get("rotation_interval", "10")),
-        "refresh_interval": int(params.get("refresh_interval", "60")),
-        "auto_rotate": params.get("auto_rotate", "true").lower(),
-        "news_count": int(params.get("news_count", "8")),
-        "events_count": int(params.get("events_count", "8")),
-        
-        # Layout and sizing
-        "width": params.get("width", "300"),
-        "height": params.get("height", "500"),
-        "padding": params.get("padding", "16"),
-        "item_spacing": params.get("item_spacing", "8"),
-        "item_padding": params.get("item_padding", "12"),
-        "border_radius": params.get("border_radius", "8"),
-        
-        # Typography
-        "font": params.get("font", "Roboto"),
-        "font_size": params.get("font_size", "14"),
-        "title_font_size": params.get("title_font_size", "18"),
-        "news_title_size": params.get("news_title_size", "14"),
-        "meta_font_size": params.get("meta_font_size", "11"),
-        "badge_font_size": params.get("badge_font_size", "9"),
-        "small_font_size": params.get("small_font_size", "12"),
-        "title_weight": params.get("title_weight", "600"),
-        
-        # Colors
-        "bg_color": params.get("bg_color", "#1a1d29"),
-        "font_color": params.get("font_color", "#e2e8f0"),
-        "title_color": params.get("title_color", "#ffffff"),
-        "secondary_color": params.get("secondary_color", "#64748b"),
-        "accent_color": params.get("accent_color", "#3b82f6"),
-        "item_bg_color": params.get("item_bg_color", "#2d3748"),
-        "hover_color": params.get("hover_color", "#374151"),
-        "normal_color": params.get("normal_color", "#60a5fa"),
-        "high_impact_color": params.get("high_impact_color", "#ef4444"),
-        "high_impact_bg": params.get("high_impact_bg", "#3c1e1e"),
-        "high_impact_text_color": params.get("high_impact_text_color", "#fca5a5"),
-        "news_title_color": params.get("news_title_color", "#f8fafc"),
-        "meta_color": params.get("meta_color", "#94a3b8"),
-        "error_color": params.get("error_color", "#ef4444"),
-        
-        # Behavior
-        "open_links_new_tab": params.get("open_links_new_tab", "true")
-    })
+@app.get("/api/combined/rotation-stream")
+async def stream_rotation_data(news_count: int = 8, events_count: int = 8):
+    """Server-Sent Events stream of rotation data, pushed whenever it changes"""
+    news_count = max(1, min(news_count, MAX_ROTATION_ITEMS))
+    events_count = max(1, min(events_count, MAX_ROTATION_ITEMS))
 
-    
+    def produce():
+        return {"success": True, "data": rotation_snapshot.get_data(news_count, events_count)}
 
+    messages = event_stream_hub.stream(
+        f"rotation:{news_count}:{events_count}", "rotation", produce,
+        STREAM_REFRESH_INTERVAL, fingerprint=rotation_fingerprint
+    )
+    return StreamingResponse(messages, media_type="text/event-stream", headers=SSE_HEADERS)
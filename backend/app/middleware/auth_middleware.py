@@ -7,7 +7,7 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 import logging
 
-from app.models.auth_models import auth_db
+from app.services.session_token_service import session_token_service
 
 logger = logging.getLogger(__name__)
 
@@ -19,9 +19,11 @@ class AuthMiddleware(BaseHTTPMiddleware):
         self.public_routes = {
             "/",
             "/ping",
+            "/ready",  # Load balancer readiness probe
+            "/metrics",  # Prometheus scrape endpoint
             "/api/auth/login",
             "/admin/login",
-            "/price/",  # Price data endpoints
+            "/price",  # Price data endpoints (/price/{symbol}, /price/all, /price?symbols=)
             "/ws/price-stream",  # WebSocket price streaming
             "/api/rss/",  # RSS feeds
             "/api/forex-factory/",  # Forex factory data
@@ -56,9 +58,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
         user = None
         
         if session_token:
-            # Clean up expired sessions
-            auth_db.cleanup_expired_sessions()
-            user = auth_db.get_session_user(session_token)
+            # Signed tokens are verified in memory; DB sessions are looked up
+            user = session_token_service.get_session_user(session_token, full_profile=False)
         
         # Check if route requires authentication
         if self.requires_auth(path):
@@ -0,0 +1,62 @@
+"""
+Metrics Middleware for WidgetForge
+
+Records per-route HTTP latency. Implemented as plain ASGI (not BaseHTTPMiddleware)
+so it adds no extra task or body buffering to each request.
+
+Streaming responses (``text/event-stream``, e.g. ``/api/combined/rotation-stream``)
+last as long as the client stays connected, so their lifetime is recorded in
+``widgetforge_http_stream_duration_seconds`` instead of the request latency
+histogram.
+"""
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics_service import HTTP_REQUEST_DURATION, HTTP_STREAM_DURATION
+
+STREAMING_CONTENT_TYPES = (b"text/event-stream",)
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = {"code": 500, "streaming": False}
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                status["streaming"] = self.is_streaming(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            if status["streaming"]:
+                HTTP_STREAM_DURATION.labels(scope["method"], self.route_label(scope)).observe(elapsed)
+            else:
+                HTTP_REQUEST_DURATION.labels(scope["method"], self.route_label(scope), status["code"]).observe(elapsed)
+
+    @staticmethod
+    def is_streaming(message: Message) -> bool:
+        for name, value in message.get("headers", ()):
+            if name.lower() == b"content-type":
+                return value.startswith(STREAMING_CONTENT_TYPES)
+        return False
+
+    @staticmethod
+    def route_label(scope: Scope) -> str:
+        """Route template (e.g. /price/{symbol}) so labels stay low-cardinality"""
+        route = scope.get("route")
+        if route is not None and getattr(route, "path", None):
+            return route.path
+        if scope["path"].startswith("/static/"):
+            return "/static"
+        return "unmatched"
@@ -0,0 +1,65 @@
+"""
+Per-request Profiling Middleware for WidgetForge
+
+An admin request carrying ``X-Profile: 1`` is run under cProfile. The response
+gets an ``X-Profile-Id`` header; the report is fetched from
+``/api/admin/profiler/requests/{id}``. Sits inside AuthMiddleware so the user it
+resolved is reused.
+
+cProfile hooks the event-loop thread, not the request's coroutine: it stays
+enabled across every ``await``, so the report also contains whatever other
+coroutines (WebSocket streams, SSE producers, other requests) ran on the loop
+while this request was in flight. Work the handler sends to the threadpool is
+not seen at all. Profile on a quiet instance, or use the sampling profiler.
+"""
+import time
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.profiler_service import request_profiler
+from app.services.session_token_service import session_token_service
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = request_profiler.start()
+        if profile is None:
+            # Another request is being profiled; serve this one normally
+            await self.app(scope, receive, self.tag_response(send, "busy"))
+            return
+
+        profile_id = request_profiler.new_id()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, self.tag_response(send, profile_id))
+        finally:
+            request_profiler.finish(profile, profile_id, scope["method"], scope["path"],
+                                    time.perf_counter() - start)
+
+    @staticmethod
+    def should_profile(scope: Scope) -> bool:
+        if Headers(scope=scope).get("x-profile", "").lower() not in ("1", "true"):
+            return False
+        user = scope.get("state", {}).get("user")
+        if user is None:
+            # Public routes skip the session lookup in AuthMiddleware
+            session_token = HTTPConnection(scope).cookies.get("session_token")
+            if session_token:
+                user = session_token_service.get_session_user(session_token, full_profile=False)
+        return user is not None and user.role == "admin"
+
+    @staticmethod
+    def tag_response(send: Send, value: str) -> Send:
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Profile-Id"] = value
+            await send(message)
+        return send_wrapper
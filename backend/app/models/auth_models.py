@@ -5,10 +5,12 @@ import sqlite3
 import os
 import hashlib
 import secrets
+import threading
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Tuple
 from dataclasses import dataclass
-from cryptography.fernet import Fernet
+
+from app.services.cache_service import CACHE_DIR
 
 @dataclass
 class User:
@@ -47,9 +49,8 @@ class AuthDatabase:
     def __init__(self, db_path: str = None):
         if db_path is None:
             # Use .cache directory for database
-            cache_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".cache"))
-            os.makedirs(cache_dir, exist_ok=True)
-            db_path = os.path.join(cache_dir, "auth.db")
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            db_path = os.path.join(CACHE_DIR, "auth.db")
         
         self.db_path = db_path
         self.init_encryption()
@@ -57,6 +58,8 @@ class AuthDatabase:
     
     def init_encryption(self):
         """Initialize encryption for investor passwords"""
+        from cryptography.fernet import Fernet
+
         cache_dir = os.path.dirname(self.db_path)
         key_file = os.path.join(cache_dir, "auth_key.key")
         
@@ -122,6 +125,11 @@ class AuthDatabase:
                 )
             ''')
             
+            # Revocation generation for signed session tokens (added after initial schema)
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(users)')]
+            if 'session_generation' not in columns:
+                conn.execute('ALTER TABLE users ADD COLUMN session_generation INTEGER NOT NULL DEFAULT 0')
+            
             conn.commit()
     
     def hash_password(self, password: str) -> str:
@@ -321,6 +329,33 @@ class AuthDatabase:
         except:
             return False
     
+    def get_session_generations(self) -> Dict[int, int]:
+        """Get the signed-session revocation generation for every user"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, session_generation FROM users')
+            return {row[0]: row[1] for row in cursor.fetchall()}
+    
+    def bump_session_generation(self, user_id: int) -> Optional[int]:
+        """Revoke all signed sessions of a user by incrementing their generation"""
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE users 
+                    SET session_generation = session_generation + 1
+                    WHERE id = ?
+                ''', (user_id,))
+                conn.commit()
+                
+                if cursor.rowcount == 0:
+                    return None
+                
+                cursor.execute('SELECT session_generation FROM users WHERE id = ?', (user_id,))
+                return cursor.fetchone()[0]
+        except:
+            return None
+    
     def cleanup_expired_sessions(self):
         """Clean up expired sessions"""
         with sqlite3.connect(self.db_path) as conn:
@@ -434,5 +469,26 @@ class AuthDatabase:
         """Get database connection (for context manager)"""
         return sqlite3.connect(self.db_path)
 
+class LazyAuthDatabase:
+    """Proxy that opens the AuthDatabase (key file, tables) on first use instead of at import"""
+
+    def __init__(self):
+        self._instance: Optional[AuthDatabase] = None
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._instance is not None
+
+    def get(self) -> AuthDatabase:
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = AuthDatabase()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
 # Global database instance
-auth_db = AuthDatabase()
\ No newline at end of file
+auth_db = LazyAuthDatabase()
\ No newline at end of file
@@ -0,0 +1,178 @@
+"""
+Price Models for WidgetForge
+
+``PriceRecord`` is one quote as produced by the market poller: bid/ask rounded
+to the instrument's digits, the derived mid price, spread and change, a UTC
+epoch millisecond timestamp (the poller converts the terminal's server-time
+tick time, see ``mt5_source.ServerClock``) and a sequence number. It replaces
+the per-tick dict (with a formatted string timestamp) that was pickled into
+diskcache and re-shaped by every reader.
+
+Each wire form is built at most once per record and shared by every reader:
+
+* ``pack()`` / ``unpack()``: fixed-width struct, stored in diskcache as raw
+  bytes (diskcache does not pickle ``bytes``)::
+
+      B version, d bid, d ask, d price, d spread, d change, d change_pct,
+      d prev_close, q time_ms, Q seq, B digits, then the UTF-8 symbol
+                                                       (74 bytes + symbol)
+
+  Unknown values are NaN. Derived fields are stored rather than recomputed,
+  so decoding is a struct unpack without any rounding.
+
+* ``to_dict()`` / ``to_json()``: the ``/price/{symbol}`` body,
+* ``stream_dict()``: the four fields sent by ``/ws/price-stream``,
+* ``pack_records()`` / ``unpack_records()``: a whole poll pass in one value
+  (each packed record prefixed with its ``H`` length), read by ``/price``.
+
+Records are never modified after construction, so they can be shared between
+threads, caches and connections. ``get()`` / ``[]`` keep code written for the
+old dicts working.
+"""
+import math
+import struct
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+STORAGE_VERSION = 1
+STORAGE = struct.Struct("<BdddddddqQB")
+RECORD_LENGTH = struct.Struct("<H")
+
+# Public fields, in to_dict() order
+FIELDS = ("symbol", "price", "bid", "ask", "spread", "change", "change_pct", "digits", "prev_close", "time_ms", "seq")
+
+class PriceRecord:
+    __slots__ = FIELDS + ("_dict", "_json", "_stream")
+
+    def __init__(self, symbol: str, bid: float, ask: float, digits: int = 5,
+                 prev_close: Optional[float] = None, time_ms: Optional[int] = None, seq: int = 0):
+        self.symbol = symbol
+        self.digits = digits
+        self.bid = round(bid, digits)
+        self.ask = round(ask, digits)
+        self.price = round((self.bid + self.ask) / 2, digits)
+        self.spread = round(self.ask - self.bid, digits)
+        self.prev_close = prev_close
+        if prev_close:
+            self.change = round(self.price - prev_close, digits)
+            self.change_pct = round(self.change / prev_close * 100, 2)
+        else:
+            self.change = None
+            self.change_pct = None
+        self.time_ms = int(time.time() * 1000) if time_ms is None else int(time_ms)
+        self.seq = seq
+        self._dict = None
+        self._json = None
+        self._stream = None
+
+    # Dict compatibility
+    def get(self, name: str, default: Any = None) -> Any:
+        return getattr(self, name, default) if name in FIELDS else default
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in FIELDS:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, PriceRecord) and self.pack() == other.pack()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PriceRecord({self.symbol} {self.bid}/{self.ask} seq={self.seq} time_ms={self.time_ms})"
+
+    @classmethod
+    def _from_fields(cls, symbol, bid, ask, price, spread, change, change_pct, prev_close, time_ms, seq, digits):
+        # Already-derived values (decoding): skip __init__ and its rounding
+        record = cls.__new__(cls)
+        record.symbol = symbol
+        record.bid = bid
+        record.ask = ask
+        record.price = price
+        record.spread = spread
+        record.change = change
+        record.change_pct = change_pct
+        record.prev_close = prev_close
+        record.time_ms = time_ms
+        record.seq = seq
+        record.digits = digits
+        record._dict = None
+        record._json = None
+        record._stream = None
+        return record
+
+    # Storage
+    def pack(self) -> bytes:
+        return STORAGE.pack(
+            STORAGE_VERSION, self.bid, self.ask, self.price, self.spread, _nan(self.change), _nan(self.change_pct),
+            _nan(self.prev_close), self.time_ms, self.seq, self.digits
+        ) + self.symbol.encode("utf-8")
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "PriceRecord":
+        (version, bid, ask, price, spread, change, change_pct, prev_close,
+         time_ms, seq, digits) = STORAGE.unpack_from(data)
+        if version != STORAGE_VERSION:
+            raise ValueError(f"Unsupported price record version {version}")
+        return cls._from_fields(
+            bytes(data[STORAGE.size:]).decode("utf-8"), bid, ask, price, spread, _none(change), _none(change_pct),
+            _none(prev_close), time_ms, seq, digits
+        )
+
+    # Wire formats
+    def to_dict(self) -> Dict[str, Any]:
+        if self._dict is None:
+            self._dict = {name: getattr(self, name) for name in FIELDS}
+        return self._dict
+
+    def to_json(self) -> bytes:
+        if self._json is None:
+            from app.services.json_service import dumps
+            self._json = dumps(self.to_dict())
+        return self._json
+
+    def stream_dict(self) -> Dict[str, Any]:
+        """Fields of one entry in the ``/ws/price-stream`` JSON frame"""
+        if self._stream is None:
+            self._stream = {"symbol": self.symbol, "price": self.price, "change_pct": self.change_pct, "spread": self.spread}
+        return self._stream
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PriceRecord":
+        """Rebuild a record from ``to_dict()`` output (e.g. a price bus frame)"""
+        return cls._from_fields(**{name: data.get(name) for name in FIELDS})
+
+def _nan(value: Optional[float]) -> float:
+    return math.nan if value is None else value
+
+def _none(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+def pack_records(records: Iterable[PriceRecord]) -> bytes:
+    return b"".join(RECORD_LENGTH.pack(len(packed)) + packed for packed in (record.pack() for record in records))
+
+def unpack_records(data: bytes) -> List[PriceRecord]:
+    records = []
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        (length,) = RECORD_LENGTH.unpack_from(view, offset)
+        offset += RECORD_LENGTH.size
+        records.append(PriceRecord.unpack(view[offset:offset + length]))
+        offset += length
+    return records
+
+def as_price_record(data) -> Any:
+    """Decode cached/bus price values into records; other values (legacy dicts) pass through"""
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return PriceRecord.unpack(data)
+    if isinstance(data, dict) and all(name in data for name in FIELDS):
+        return PriceRecord.from_dict(data)
+    return data
+
+def stream_entry(symbol: str, data) -> Dict[str, Any]:
+    """``/ws/price-stream`` entry for a record or a legacy price dict"""
+    if isinstance(data, PriceRecord):
+        return data.stream_dict()
+    return {"symbol": symbol, "price": data.get("price"), "change_pct": data.get("change_pct"), "spread": data.get("spread")}
@@ -0,0 +1,249 @@
+"""
+Widget Parameter Schemas for WidgetForge
+
+Declarative description of the query parameters each widget accepts. A schema
+turns raw query params into a validated, canonical parameter set which is used
+both as the template context and as the render cache key.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class WidgetParam:
+    key: str                                # Template context name
+    query: str                              # Query string name
+    default: Any = ""
+    type: str = "str"                       # str, int, float or bool
+    choices: Optional[Tuple[str, ...]] = None
+
+    def parse(self, raw: Optional[str]) -> Any:
+        """Convert a raw query value, falling back to the default when invalid"""
+        if raw is None:
+            return self.default
+
+        try:
+            if self.type == "int":
+                value = int(raw)
+            elif self.type == "float":
+                value = float(raw)
+            elif self.type == "bool":
+                # Templates compare against the strings 'true'/'false'
+                value = "true" if raw.strip().lower() in ("true", "1", "yes", "on") else "false"
+            else:
+                value = raw
+        except (ValueError, TypeError):
+            logger.debug(f"Invalid value for widget param {self.query}: {raw!r}")
+            return self.default
+
+        if self.choices and value not in self.choices:
+            return self.default
+        return value
+
+@dataclass
+class WidgetSchema:
+    name: str
+    template: str
+    params: List[WidgetParam]
+    # Values derived from the request itself (e.g. WebSocket host) rather than the query
+    request_context: Optional[Callable[[Request], Dict[str, Any]]] = None
+
+    def resolve(self, query_params) -> Dict[str, Any]:
+        """Build the validated template context from query params"""
+        return {param.key: param.parse(query_params.get(param.query)) for param in self.params}
+
+    def canonical_key(self, values: Dict[str, Any]) -> Tuple:
+        """Hashable, order-independent representation of a resolved parameter set"""
+        return tuple(values[param.key] for param in self.params)
+
+# Request-derived context helpers
+def direct_stream_host(request: Request) -> Dict[str, Any]:
+    """WebSocket host taken directly from the Host header"""
+    return {"websocket_host": request.headers.get("host", "62.171.135.138:8000")}
+
+def proxied_stream_host(request: Request) -> Dict[str, Any]:
+    """WebSocket host/protocol for widgets served through the 5ers stream proxy"""
+    is_proxy = "5ers-stream.ddns.net" in request.headers.get("host", "")
+    return {
+        "websocket_host": "5ers-stream.ddns.net" if is_proxy else "127.0.0.1:8000",
+        "websocket_protocol": "wss" if is_proxy else "ws",
+    }
+
+# Parameters shared by the scrolling ticker widgets
+TICKER_BASE_PARAMS = [
+    # Data Configuration
+    WidgetParam("symbols", "symbols", ""),
+    WidgetParam("static_text", "staticText", ""),
+
+    # Typography
+    WidgetParam("font", "font", "Inter"),
+    WidgetParam("font_size", "fontSize", "16"),
+    WidgetParam("font_weight", "fontWeight", "400"),
+    WidgetParam("font_color", "fontColor", "#ffffff"),
+
+    # Colors
+    WidgetParam("bg_color", "bgColor", "#000000"),
+    WidgetParam("bg_gradient", "bgGradient", ""),
+    WidgetParam("asset_color", "assetColor", "#ffffff"),
+    WidgetParam("up_color", "upColor", "#00ff88"),
+    WidgetParam("down_color", "downColor", "#ff4444"),
+    WidgetParam("neutral_color", "neutralColor", "#cccccc"),
+    WidgetParam("spread_color", "spreadColor", "#999999"),
+
+    # Animation
+    WidgetParam("scroll_speed", "scrollSpeed", "30"),
+
+    # Features
+    WidgetParam("show_spread", "showSpread", "true", type="bool"),
+    WidgetParam("show_connection_status", "showConnectionStatus", "false", type="bool"),
+
+    # Logo
+    WidgetParam("show_logo", "showLogo", "false", type="bool"),
+    WidgetParam("logo_url", "logoUrl", ""),
+    WidgetParam("logo_height", "logoHeight", "30"),
+]
+
+# Price stream encoding for widgets that ship the packed protocol decoder
+STREAM_FORMAT_PARAM = WidgetParam("stream_format", "streamFormat", "json", choices=("json", "packed"))
+
+ENHANCED_TICKER_SCHEMA = WidgetSchema(
+    name="enhanced-ticker",
+    template="enhanced_ticker_widget.html",
+    request_context=direct_stream_host,
+    params=TICKER_BASE_PARAMS + [
+        STREAM_FORMAT_PARAM,
+
+        # Display Mode
+        WidgetParam("display_mode", "display_mode", "scroll", choices=("scroll", "static", "grid", "card", "compact")),
+        WidgetParam("update_animation", "update_animation", "none", choices=("none", "fade", "slide")),
+
+        # Colors
+        WidgetParam("asset_font_weight", "assetFontWeight", "600"),
+        WidgetParam("asset_font_size", "assetFontSize", "100"),
+        WidgetParam("price_font_weight", "priceFontWeight", "500"),
+        WidgetParam("spread_opacity", "spreadOpacity", "0.8"),
+        WidgetParam("spread_font_size", "spreadFontSize", "85"),
+        WidgetParam("change_font_size", "changeFontSize", "90"),
+
+        # Layout
+        WidgetParam("padding", "padding", "0"),
+        WidgetParam("item_spacing", "itemSpacing", "20"),
+        WidgetParam("item_margin", "itemMargin", "30"),
+        WidgetParam("item_gap", "itemGap", "8"),
+        WidgetParam("item_layout", "itemLayout", "row", choices=("row", "column")),
+        WidgetParam("item_align", "itemAlign", "center"),
+
+        # Static Mode
+        WidgetParam("static_align", "staticAlign", "center", choices=("left", "center", "right")),
+
+        # Grid Mode
+        WidgetParam("grid_columns", "gridColumns", "3"),
+        WidgetParam("grid_gap", "gridGap", "20"),
+        WidgetParam("grid_padding", "gridPadding", "20"),
+
+        # Card Mode
+        WidgetParam("card_gap", "cardGap", "15"),
+        WidgetParam("card_padding", "cardPadding", "20"),
+        WidgetParam("card_bg_color", "cardBgColor", "rgba(255,255,255,0.05)"),
+        WidgetParam("card_border_width", "cardBorderWidth", "1"),
+        WidgetParam("card_border_color", "cardBorderColor", "rgba(255,255,255,0.1)"),
+        WidgetParam("card_border_radius", "cardBorderRadius", "8"),
+        WidgetParam("card_inner_padding", "cardInnerPadding", "15"),
+        WidgetParam("card_shadow", "cardShadow", "0 2px 8px rgba(0,0,0,0.1)"),
+        WidgetParam("card_hover_shadow", "cardHoverShadow", "0 4px 16px rgba(0,0,0,0.2)"),
+
+        # Features
+        WidgetParam("show_timestamp", "showTimestamp", "false", type="bool"),
+        WidgetParam("timestamp_format", "timestampFormat", "time", choices=("time", "short", "full")),
+        WidgetParam("timestamp_color", "timestampColor", "#666666"),
+        WidgetParam("timestamp_font_size", "timestampFontSize", "80"),
+        WidgetParam("timestamp_opacity", "timestampOpacity", "0.7"),
+        WidgetParam("price_decimals", "priceDecimals", 5, type="int"),
+
+        # Logo
+        WidgetParam("logo_position", "logoPosition", "top", choices=("top", "bottom")),
+        WidgetParam("logo_margin", "logoMargin", "10px"),
+
+        # Custom CSS
+        WidgetParam("custom_css", "customCSS", ""),
+    ]
+)
+
+SMOOTH_TICKER_SCHEMA = WidgetSchema(
+    name="smooth-ticker",
+    template="smooth_ticker_widget.html",
+    request_context=proxied_stream_host,
+    params=list(TICKER_BASE_PARAMS)
+)
+
+CANVAS_TICKER_SCHEMA = WidgetSchema(
+    name="canvas-ticker",
+    template="canvas_ticker_widget.html",
+    request_context=direct_stream_host,
+    params=TICKER_BASE_PARAMS + [STREAM_FORMAT_PARAM]
+)
+
+ROTATING_FINANCIAL_NEWS_SCHEMA = WidgetSchema(
+    name="rotating-financial-news",
+    template="rotating_financial_news_widget.html",
+    params=[
+        # Widget configuration
+        WidgetParam("title", "title", "Market & Economic News"),
+        WidgetParam("rotation_interval", "rotation_interval", 10, type="int"),
+        WidgetParam("refresh_interval", "refresh_interval", 60, type="int"),
+        WidgetParam("auto_rotate", "auto_rotate", "true", type="bool"),
+        WidgetParam("news_count", "news_count", 8, type="int"),
+        WidgetParam("events_count", "events_count", 8, type="int"),
+
+        # Layout and sizing
+        WidgetParam("width", "width", "300"),
+        WidgetParam("height", "height", "500"),
+        WidgetParam("padding", "padding", "16"),
+        WidgetParam("item_spacing", "item_spacing", "8"),
+        WidgetParam("item_padding", "item_padding", "12"),
+        WidgetParam("border_radius", "border_radius", "8"),
+
+        # Typography
+        WidgetParam("font", "font", "Roboto"),
+        WidgetParam("font_size", "font_size", "14"),
+        WidgetParam("title_font_size", "title_font_size", "18"),
+        WidgetParam("news_title_size", "news_title_size", "14"),
+        WidgetParam("meta_font_size", "meta_font_size", "11"),
+        WidgetParam("badge_font_size", "badge_font_size", "9"),
+        WidgetParam("small_font_size", "small_font_size", "12"),
+        WidgetParam("title_weight", "title_weight", "600"),
+
+        # Colors
+        WidgetParam("bg_color", "bg_color", "#1a1d29"),
+        WidgetParam("font_color", "font_color", "#e2e8f0"),
+        WidgetParam("title_color", "title_color", "#ffffff"),
+        WidgetParam("secondary_color", "secondary_color", "#64748b"),
+        WidgetParam("accent_color", "accent_color", "#3b82f6"),
+        WidgetParam("item_bg_color", "item_bg_color", "#2d3748"),
+        WidgetParam("hover_color", "hover_color", "#374151"),
+        WidgetParam("normal_color", "normal_color", "#60a5fa"),
+        WidgetParam("high_impact_color", "high_impact_color", "#ef4444"),
+        WidgetParam("high_impact_bg", "high_impact_bg", "#3c1e1e"),
+        WidgetParam("high_impact_text_color", "high_impact_text_color", "#fca5a5"),
+        WidgetParam("news_title_color", "news_title_color", "#f8fafc"),
+        WidgetParam("meta_color", "meta_color", "#94a3b8"),
+        WidgetParam("error_color", "error_color", "#ef4444"),
+
+        # Behavior
+        WidgetParam("open_links_new_tab", "open_links_new_tab", "true"),
+    ]
+)
+
+WIDGET_SCHEMAS = {
+    schema.name: schema
+    for schema in (
+        ENHANCED_TICKER_SCHEMA,
+        SMOOTH_TICKER_SCHEMA,
+        CANVAS_TICKER_SCHEMA,
+        ROTATING_FINANCIAL_NEWS_SCHEMA,
+    )
+}
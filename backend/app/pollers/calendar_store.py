@@ -0,0 +1,261 @@
+"""
+Calendar Store - persistence for the Forex Factory poller
+
+* Every file is written to a temp file in the same directory and moved into
+  place with ``os.replace``, so ``ForexFactoryService`` readers see either the
+  old or the new ``ff_calendar_current.json``, never a half-written one.
+* Calendars are identified by a SHA-256 of their canonical encoding; saving a
+  calendar identical to the current one writes nothing but the metadata.
+* Calendar files are stored compact (no indentation).
+* History snapshots and backups are listed in ``calendar_manifest.json``;
+  retention drops the oldest manifest entries instead of globbing and sorting
+  the data directory on every cycle. Snapshots are hard links to the file just
+  written where the filesystem allows it, so they cost no extra write.
+* Each change is also recorded as an event-level diff in
+  ``calendar_changes.jsonl`` (see ``app/services/calendar_diff.py``), appended
+  before the calendar file is replaced so readers that notice the new file
+  always find its entry.
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.services.calendar_diff import CHANGES_FILE, diff_calendars, latest_seq, read_changes, summarize
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "ff_calendar_current.json"
+METADATA_FILE = "ff_calendar_metadata.json"
+MANIFEST_FILE = "calendar_manifest.json"
+
+# Change log entries kept after trimming (trimmed once it holds twice as many)
+MAX_CHANGES = 200
+
+def encode_calendar(data) -> bytes:
+    """Compact UTF-8 JSON as stored on disk"""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def content_hash(data) -> str:
+    """Hash of the calendar content, independent of key order and formatting"""
+    canonical = json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def atomic_write_bytes(path: Path, payload: bytes, retries: int = 5):
+    """Write ``payload`` to ``path`` via a temp file and ``os.replace``"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        for attempt in range(retries):
+            try:
+                os.replace(tmp_path, path)
+                return
+            except PermissionError:
+                # Windows refuses to replace a file while a reader has it open; reads are short
+                if attempt == retries - 1:
+                    raise
+                time.sleep(0.05 * (attempt + 1))
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+def atomic_write_json(path: Path, data, indent: Optional[int] = None):
+    atomic_write_bytes(path, json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8"))
+
+def _link_or_copy(source: Path, target: Path):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+class CalendarStore:
+    def __init__(self, data_dir: Path, backup_dir: Optional[Path] = None, keep: int = 10):
+        self.data_dir = Path(data_dir)
+        self.backup_dir = Path(backup_dir) if backup_dir else self.data_dir / "backups"
+        self.keep = keep
+        self.current_file = self.data_dir / CURRENT_FILE
+        self.metadata_file = self.data_dir / METADATA_FILE
+        self.manifest_file = self.data_dir / MANIFEST_FILE
+        self.changes_file = self.data_dir / CHANGES_FILE
+        self._manifest: Optional[Dict] = None
+        self.last_diff: Optional[Dict] = None
+
+    # Metadata
+    def read_metadata(self) -> Dict:
+        try:
+            with open(self.metadata_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def update_metadata(self, **fields) -> Dict:
+        """Merge ``fields`` into the metadata file (other keys such as last_weekly_update are kept)"""
+        metadata = self.read_metadata()
+        metadata.update(fields)
+        atomic_write_json(self.metadata_file, metadata, indent=2)
+        return metadata
+
+    # Manifest
+    @property
+    def manifest(self) -> Dict:
+        if self._manifest is None:
+            try:
+                with open(self.manifest_file, "r", encoding="utf-8") as f:
+                    self._manifest = json.load(f)
+            except FileNotFoundError:
+                self._manifest = self._adopt_existing_files()
+        return self._manifest
+
+    def _adopt_existing_files(self) -> Dict:
+        # One-time scan so files written before the manifest existed fall under retention
+        def listed(paths):
+            return [{"file": path.name} for path in sorted(paths, key=lambda p: p.stat().st_mtime)]
+
+        return {
+            "current": None,
+            "snapshots": listed(self.data_dir.glob("ff_calendar_2*.json")),
+            "backups": listed(self.backup_dir.glob("ff_calendar_backup_*.json")) if self.backup_dir.exists() else [],
+        }
+
+    def _save_manifest(self):
+        atomic_write_json(self.manifest_file, self.manifest, indent=2)
+
+    def _file_signature(self, path: Path) -> Optional[List[int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def current_hash(self) -> Optional[str]:
+        """Hash of ff_calendar_current.json if it is the file this store last wrote"""
+        current = self.manifest.get("current")
+        if not current or current.get("signature") != self._file_signature(self.current_file):
+            return None
+        return current.get("sha256")
+
+    def load_current(self) -> List[Dict]:
+        try:
+            with open(self.current_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return []
+
+    # Change log
+    def _append_change(self, entry: Dict) -> int:
+        """Append a change log line; returns the previous file size (for rollback)"""
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with open(self.changes_file, "ab") as f:
+            offset = f.tell()
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        return offset
+
+    def _trim_changes(self):
+        entries = read_changes(str(self.changes_file))
+        if len(entries) <= 2 * MAX_CHANGES:
+            return
+        payload = "".join(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+                          for entry in entries[-MAX_CHANGES:])
+        atomic_write_bytes(self.changes_file, payload.encode("utf-8"))
+
+    # Writes
+    def save(self, data, source_url: Optional[str] = None, snapshot: bool = True) -> bool:
+        """
+        Store a calendar; returns False (and writes only metadata) when it is unchanged
+
+        ``snapshot=False`` skips the history snapshot (small patches such as
+        actual results are already recorded in the change log).
+        """
+        digest = content_hash(data)
+        now = datetime.now()
+        previous_hash = self.current_hash()
+        if digest == previous_hash:
+            self.last_diff = None
+            self.update_metadata(last_checked=now.isoformat())
+            logger.info("Calendar unchanged, skipping write")
+            return False
+
+        manifest = self.manifest
+        diff = diff_calendars(self.load_current(), data)
+        seq = max(manifest.get("change_seq") or 0, latest_seq(str(self.changes_file))) + 1
+        offset = self._append_change({
+            "seq": seq, "at": now.isoformat(), "from": previous_hash, "to": digest, "diff": diff,
+        })
+        try:
+            atomic_write_bytes(self.current_file, encode_calendar(data))
+        except BaseException:
+            # The calendar was not replaced, so its change entry must not be seen either
+            with open(self.changes_file, "r+b") as f:
+                f.truncate(offset)
+            raise
+        self.last_diff = diff
+        manifest["change_seq"] = seq
+        self._trim_changes()
+
+        snapshot_file = self.data_dir / f"ff_calendar_{now.strftime('%Y%m%d_%H%M%S')}.json"
+        if snapshot and not snapshot_file.exists():
+            _link_or_copy(self.current_file, snapshot_file)
+            manifest["snapshots"].append({"file": snapshot_file.name, "sha256": digest, "saved_at": now.isoformat()})
+
+        manifest["current"] = {
+            "sha256": digest,
+            "events": len(data),
+            "saved_at": now.isoformat(),
+            "signature": self._file_signature(self.current_file),
+        }
+        self.prune()
+
+        self.update_metadata(
+            last_updated=now.isoformat(),
+            last_checked=now.isoformat(),
+            total_events=len(data),
+            source_url=source_url or self.read_metadata().get("source_url"),
+            file_size_bytes=self.current_file.stat().st_size,
+            sha256=digest,
+            change_seq=seq,
+            last_change=summarize(diff),
+        )
+        logger.info(f"Calendar data saved to: {self.current_file.name} (changes {summarize(diff)})")
+        return True
+
+    def backup_current(self) -> Optional[Path]:
+        """
+        Back up ff_calendar_current.json unless it is already kept as a snapshot
+
+        Files written by this store are always in the snapshot history, so a
+        copy is only made for a current file from elsewhere (legacy or edited).
+        """
+        if not self.current_file.exists() or self.current_hash() is not None:
+            return None
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+        backup_file = self.backup_dir / f"ff_calendar_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        _link_or_copy(self.current_file, backup_file)
+        self.manifest["backups"].append({"file": backup_file.name, "saved_at": datetime.now().isoformat()})
+        self.prune()
+        logger.info(f"Backed up existing calendar to: {backup_file.name}")
+        return backup_file
+
+    def prune(self):
+        """Apply retention (newest ``keep`` snapshots and backups) and persist the manifest"""
+        manifest = self.manifest
+        for key, directory in (("snapshots", self.data_dir), ("backups", self.backup_dir)):
+            entries = manifest[key]
+            while len(entries) > self.keep:
+                old = entries.pop(0)
+                with contextlib.suppress(FileNotFoundError):
+                    (directory / old["file"]).unlink()
+                    logger.info(f"Cleaned up old {key[:-1]}: {old['file']}")
+        self._save_manifest()
@@ -1,4 +1,3 @@
-import MetaTrader5 as mt5
 import sqlite3
 import time
 import os
@@ -10,27 +9,26 @@ import logging
 # Add backend directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from app.services.cache_service import CACHE_DIR
+from app.pollers.mt5_source import load_mt5, load_symbols, terminal_path
+from app.services.metrics_service import metrics, CHART_WRITE_DURATION
+
+mt5 = load_mt5()
+
 logger = logging.getLogger(__name__)
 
 class ChartDataCollector:
     def __init__(self):
         # Database path - auto-creates in .cache directory
-        cache_dir = os.path.join(os.path.dirname(__file__), '..', '..', '..', '.cache')
-        os.makedirs(cache_dir, exist_ok=True)
-        self.db_path = os.path.join(cache_dir, 'chart_history.db')
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.db_path = os.path.join(CACHE_DIR, 'chart_history.db')
         
         # Initialize database
         self.init_database()
         
         # Load symbols from the same file as price ticker
         symbols_file = os.path.join(os.path.dirname(__file__), 'symbols.txt')
-        with open(symbols_file, 'r') as f:
-            self.symbols = [line.strip() for line in f if line.strip()]
+        self.symbols = load_symbols(symbols_file)
         
         logger.info(f"Chart collector initialized with {len(self.symbols)} symbols")
         
@@ -61,7 +59,7 @@ class ChartDataCollector:
     
     def connect_mt5(self):
         """Connect to MT5 terminal"""
-        if not mt5.initialize(path="C:/MT5Terminals/Account1/terminal64.exe"):
+        if not mt5.initialize(path=terminal_path(1)):
             raise RuntimeError("MT5 initialization failed")
         logger.info("Connected to MT5")
     
@@ -172,7 +170,8 @@ class ChartDataCollector:
             
             # Collect initial history
             logger.info("Collecting initial 24-hour history...")
-            self.collect_initial_history()
+            with CHART_WRITE_DURATION.labels("initial_history").time():
+                self.collect_initial_history()
             
             # Update loop - every 3 minutes for ~480 points per day
             update_interval = 3 * 60  # 3 minutes in seconds
@@ -180,13 +179,16 @@ class ChartDataCollector:
             
             while True:
                 try:
-                    self.update_prices()
+                    with CHART_WRITE_DURATION.labels("update").time():
+                        self.update_prices()
                     logger.info(f"Updated prices for {len(self.symbols)} symbols")
+                    metrics.publish("chart_collector", force=True, ttl=update_interval * 2)
                     
                     # Run cleanup every 20 updates (roughly every hour)
                     cleanup_counter += 1
                     if cleanup_counter >= 20:
-                        self.cleanup_old_data()
+                        with CHART_WRITE_DURATION.labels("cleanup").time():
+                            self.cleanup_old_data()
                         cleanup_counter = 0
                     
                     time.sleep(update_interval)
@@ -203,5 +205,10 @@ class ChartDataCollector:
             mt5.shutdown()
 
 if __name__ == "__main__":
+    # Setup logging (standalone process; in supervised mode the API configures logging)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     collector = ChartDataCollector()
     collector.run()
\ No newline at end of file
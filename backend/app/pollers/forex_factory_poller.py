@@ -8,17 +8,21 @@ import os
 import sys
 import time
 import logging
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 # Add backend directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from app.pollers.calendar_store import CalendarStore
+from app.services.calendar_diff import event_key
+
+# Fields written into calendar events by update_actual_results
+ACTUAL_FIELDS = ('actual', 'actual_source', 'matched_news', 'archived_at')
+# News items remembered as already processed (older ones are forgotten first)
+MAX_SEEN_NEWS = 5000
+
 logger = logging.getLogger(__name__)
 
 class ForexFactoryPoller:
@@ -38,6 +42,12 @@ class ForexFactoryPoller:
         self.data_dir.mkdir(exist_ok=True)
         self.backup_dir.mkdir(exist_ok=True)
         
+        # Atomic, deduplicated writes and manifest-based retention (keeps last 10)
+        self.store = CalendarStore(self.data_dir, self.backup_dir, keep=10)
+        
+        # RSS items already checked for actual results (guid/link -> None)
+        self.seen_news = OrderedDict()
+        
         # Load last weekly update time from metadata
         self.load_last_weekly_update()
         
@@ -50,16 +60,13 @@ class ForexFactoryPoller:
     def load_last_weekly_update(self):
         """Load the last weekly update time from metadata"""
         try:
-            metadata_file = self.data_dir / "ff_calendar_metadata.json"
-            if metadata_file.exists():
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-                    last_weekly_str = metadata.get('last_weekly_update')
-                    if last_weekly_str:
-                        self.last_weekly_update = datetime.fromisoformat(last_weekly_str)
-                        logger.info(f"Loaded last weekly update time: {self.last_weekly_update}")
-                    else:
-                        logger.info("No last weekly update time found in metadata")
+            metadata = self.store.read_metadata()
+            last_weekly_str = metadata.get('last_weekly_update')
+            if last_weekly_str:
+                self.last_weekly_update = datetime.fromisoformat(last_weekly_str)
+                logger.info(f"Loaded last weekly update time: {self.last_weekly_update}")
+            elif metadata:
+                logger.info("No last weekly update time found in metadata")
             else:
                 logger.info("No metadata file found, will perform initial weekly update")
         except Exception as e:
@@ -68,42 +75,16 @@ class ForexFactoryPoller:
     def save_last_weekly_update(self):
         """Save the last weekly update time to metadata"""
         try:
-            metadata_file = self.data_dir / "ff_calendar_metadata.json"
-            metadata = {}
-            
-            # Load existing metadata if it exists
-            if metadata_file.exists():
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    metadata = json.load(f)
-            
-            # Update with last weekly update time
-            metadata['last_weekly_update'] = self.last_weekly_update.isoformat()
-            
-            # Save back to file
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
-                
+            self.store.update_metadata(last_weekly_update=self.last_weekly_update.isoformat())
             logger.info(f"Saved last weekly update time: {self.last_weekly_update}")
             
         except Exception as e:
             logger.warning(f"Error saving last weekly update time: {e}")
     
     def backup_existing_file(self):
-        """Backup existing calendar file if it exists"""
+        """Backup existing calendar file unless it is already kept as a snapshot"""
         try:
-            current_file = self.data_dir / "ff_calendar_current.json"
-            if current_file.exists():
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                backup_file = self.backup_dir / f"ff_calendar_backup_{timestamp}.json"
-                
-                # Read and write to create backup
-                with open(current_file, 'r', encoding='utf-8') as src:
-                    data = src.read()
-                with open(backup_file, 'w', encoding='utf-8') as dst:
-                    dst.write(data)
-                    
-                logger.info(f"Backed up existing calendar to: {backup_file.name}")
-                
+            self.store.backup_current()
         except Exception as e:
             logger.warning(f"Failed to backup existing file: {e}")
     
@@ -135,61 +116,21 @@ class ForexFactoryPoller:
             raise
     
     def save_calendar_data(self, data):
-        """Save calendar data to local files"""
+        """Save calendar data to local files; returns False when the calendar is unchanged"""
         try:
-            # Save main current file
-            current_file = self.data_dir / "ff_calendar_current.json"
-            
-            with open(current_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            # Also save with timestamp for historical reference
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            timestamped_file = self.data_dir / f"ff_calendar_{timestamp}.json"
-            
-            with open(timestamped_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
-            logger.info(f"Calendar data saved to: {current_file.name}")
-            logger.info(f"Timestamped copy saved to: {timestamped_file.name}")
-            
-            # Update metadata
-            metadata = {
-                "last_updated": datetime.now().isoformat(),
-                "total_events": len(data),
-                "source_url": self.ff_calendar_url,
-                "file_size_bytes": current_file.stat().st_size
-            }
-            
-            metadata_file = self.data_dir / "ff_calendar_metadata.json"
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2)
-                
-            logger.info(f"Metadata updated: {metadata}")
+            changed = self.store.save(data, source_url=self.ff_calendar_url)
+            if changed:
+                logger.info(f"Calendar data saved ({len(data)} events)")
+            return changed
             
         except Exception as e:
             logger.error(f"Error saving calendar data: {e}")
             raise
     
     def cleanup_old_files(self):
-        """Clean up old backup and timestamped files (keep last 10)"""
+        """Clean up old backup and timestamped files (keep last 10, tracked in the manifest)"""
         try:
-            # Clean up backup files
-            backup_files = list(self.backup_dir.glob("ff_calendar_backup_*.json"))
-            if len(backup_files) > 10:
-                backup_files.sort(key=lambda x: x.stat().st_mtime)
-                for old_file in backup_files[:-10]:
-                    old_file.unlink()
-                    logger.info(f"Cleaned up old backup: {old_file.name}")
-            
-            # Clean up timestamped files
-            timestamped_files = list(self.data_dir.glob("ff_calendar_2*.json"))
-            if len(timestamped_files) > 10:
-                timestamped_files.sort(key=lambda x: x.stat().st_mtime)
-                for old_file in timestamped_files[:-10]:
-                    old_file.unlink()
-                    logger.info(f"Cleaned up old timestamped file: {old_file.name}")
-                    
+            self.store.prune()
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
     
@@ -270,6 +211,9 @@ class ForexFactoryPoller:
                 logger.warning("Calendar data validation failed, may be stale data")
                 # Continue anyway but log the warning
             
+            # Keep actual results matched from RSS for events that are still in the calendar
+            calendar_data = self.carry_over_actuals(calendar_data)
+            
             # Save new data
             self.save_calendar_data(calendar_data)
             
@@ -287,24 +231,89 @@ class ForexFactoryPoller:
             logger.error(f"Weekly calendar structure update failed: {e}")
             return False
     
+    def carry_over_actuals(self, calendar_data):
+        """Copy RSS-matched actuals from the current calendar onto the same events in new data"""
+        previous = {
+            event_key(event): {field: event[field] for field in ACTUAL_FIELDS if field in event}
+            for event in self.store.load_current()
+            if event.get('actual_source') and (event.get('actual') or '').strip()
+        }
+        if not previous:
+            return calendar_data
+        return [
+            {**event, **previous[event_key(event)]}
+            if event_key(event) in previous and not (event.get('actual') or '').strip() else event
+            for event in calendar_data
+        ]
+    
+    def _news_id(self, item):
+        return item.get('guid') or item.get('link') or f"{item.get('title', '')}|{item.get('published_raw', '')}"
+    
+    def fetch_new_news_items(self):
+        """RSS items (current feeds + 7-day archive) not checked by a previous run"""
+        from app.services.rss_service import rss_service
+        
+        items = rss_service.fetch_all_economic_news(50) + rss_service.get_archived_economic_data(days_back=7)
+        new_items = []
+        for item in items:
+            news_id = self._news_id(item)
+            if news_id in self.seen_news:
+                continue
+            self.seen_news[news_id] = None
+            new_items.append(item)
+        while len(self.seen_news) > MAX_SEEN_NEWS:
+            self.seen_news.popitem(last=False)
+        return new_items
+    
+    def _released_without_actual(self, calendar_data):
+        """Events released within the last 7 days that have no actual value yet"""
+        now = datetime.now(timezone.utc)
+        pending = []
+        for event in calendar_data:
+            if (event.get('actual') or '').strip():
+                continue
+            try:
+                event_date = datetime.fromisoformat(event.get('date', '').replace('Z', '+00:00'))
+            except ValueError:
+                continue
+            if event_date.tzinfo is None:
+                event_date = event_date.replace(tzinfo=timezone.utc)
+            # A few minutes of slack: headlines can land just before the scheduled minute
+            if now - timedelta(days=7) <= event_date <= now + timedelta(minutes=5):
+                pending.append(event)
+        return pending
+    
     def update_actual_results(self):
-        """Frequent update - Update actual results from RSS feeds (not JSON API)"""
+        """Frequent update - patch actual results from newly seen RSS items into the calendar"""
         try:
             logger.info("Updating actual results from RSS feeds...")
             
             # Load existing calendar structure
-            current_file = self.data_dir / "ff_calendar_current.json"
-            if not current_file.exists():
+            calendar_data = self.store.load_current()
+            if not calendar_data:
                 logger.warning("No existing calendar structure found, need weekly update first")
                 return False
             
-            # TODO: Implement RSS feed parsing for actual results
-            # For now, we'll just skip this update to avoid hitting the JSON API
-            # The weekly structure update provides the base calendar data
-            # RSS feed parsing should update the 'actual' values in existing events
+            # Each feed item is matched once; later runs only look at new items
+            new_items = self.fetch_new_news_items()
+            pending = self._released_without_actual(calendar_data)
+            if not new_items or not pending:
+                logger.info(f"No actual results to match ({len(new_items)} new items, {len(pending)} events pending)")
+                return True
+            
+            from app.services.forex_factory_service import forex_factory_service
+            actuals = forex_factory_service.extract_actuals(pending, new_items)
+            if not actuals:
+                logger.info(f"No actual results found in {len(new_items)} new RSS items")
+                return True
             
-            logger.info("Actual results update skipped - RSS feed parsing not yet implemented")
-            logger.info("Using existing calendar structure until RSS parsing is added")
+            patched = [
+                {**event, **actuals[event_key(event)]} if event_key(event) in actuals else event
+                for event in calendar_data
+            ]
+            # Recorded in the change log as "changed" events; no history snapshot for a patch
+            self.store.save(patched, snapshot=False)
+            logger.info(f"Stored {len(actuals)} actual results from RSS")
             return True
             
         except Exception as e:
@@ -369,4 +378,9 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    # Setup logging (standalone process; in supervised mode the API configures logging)
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
     main()
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Simulated MetaTrader5 backend
+
+Drop-in stand-in for the subset of the ``MetaTrader5`` module the pollers use
+(initialize/shutdown/login, symbol_info_tick, copy_rates_*, symbols_get,
+account_info, positions_get). Prices are deterministic random walks seeded per
+symbol, so load tests of the poller -> cache -> WebSocket pipeline are
+reproducible on any OS without a terminal.
+
+Configured through environment variables (see ``SimulatedMT5.from_env``):
+  MT5_SIM_SEED          random seed (default 42)
+  MT5_SIM_SYMBOLS       number of symbols exposed by symbols_get (default 0 = well-known only)
+  MT5_SIM_TICK_RATE     price steps per symbol per second (default 4)
+  MT5_SIM_SPREAD        maximum spread in points (default 20)
+  MT5_SIM_GAP_PROB      probability that a step is a price gap (default 0.001)
+  MT5_SIM_GAP_SIZE      gap size in multiples of one step's volatility (default 25)
+  MT5_SIM_SERVER_OFFSET hours added to tick times, like a broker's trade server (default 0)
+"""
+import math
+import os
+import random
+import time
+import zlib
+from collections import namedtuple
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+# Timeframe constants match the MetaTrader5 package values
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+TIMEFRAME_W1 = 32769
+
+TIMEFRAME_SECONDS = {
+    TIMEFRAME_M1: 60,
+    TIMEFRAME_M5: 300,
+    TIMEFRAME_M15: 900,
+    TIMEFRAME_M30: 1800,
+    TIMEFRAME_H1: 3600,
+    TIMEFRAME_H4: 14400,
+    TIMEFRAME_D1: 86400,
+    TIMEFRAME_W1: 604800,
+}
+
+# Upper bound on bars walked back from "now" when serving historical windows
+MAX_HISTORY_BARS = 100_000
+
+Tick = namedtuple("Tick", "time bid ask last volume time_msc flags volume_real")
+SymbolInfo = namedtuple("SymbolInfo", "name digits point spread visible")
+TerminalInfo = namedtuple("TerminalInfo", "name build connected dlls_allowed trade_allowed path")
+AccountInfo = namedtuple(
+    "AccountInfo",
+    "login server name currency balance equity margin margin_free margin_level profit leverage trade_allowed"
+)
+
+# Price level and digits for well-known symbols; everything else gets a generic profile
+KNOWN_SYMBOLS = {
+    "EURUSD": (1.0850, 5), "GBPUSD": (1.2700, 5), "USDJPY": (151.20, 3), "AUDUSD": (0.6550, 5),
+    "USDCAD": (1.3600, 5), "USDCHF": (0.9050, 5), "NZDUSD": (0.6000, 5), "EURJPY": (163.50, 3),
+    "GBPJPY": (190.20, 3), "XAUUSD": (2350.0, 2), "XAGUSD": (28.50, 3), "US30": (39000.0, 1),
+    "US500": (5200.0, 1), "NAS100": (18000.0, 1), "GER40": (18200.0, 1), "BTCUSD": (65000.0, 2),
+    "ETHUSD": (3200.0, 2), "USOIL": (78.50, 3), "UKOIL": (82.50, 3),
+}
+
+# Typical one-day move, as a fraction of price, used to scale the random walk
+DAILY_VOLATILITY = 0.01
+
+class _SymbolState:
+    __slots__ = ("name", "digits", "point", "price", "rng", "step", "volatility")
+
+    def __init__(self, name: str, seed: int, tick_rate: float):
+        rng = random.Random((seed << 32) ^ zlib.crc32(name.encode()))
+        price, digits = KNOWN_SYMBOLS.get(name) or _generic_profile(name, rng)
+        self.name = name
+        self.digits = digits
+        self.point = 10 ** -digits
+        self.price = price
+        self.rng = rng
+        self.step = 0
+        # Per-step volatility so a day of ticks moves roughly DAILY_VOLATILITY
+        self.volatility = price * DAILY_VOLATILITY / math.sqrt(86400 * max(tick_rate, 0.001))
+
+def _generic_profile(name: str, rng: random.Random):
+    """Plausible price level and digits for a symbol the simulator does not know"""
+    if name.endswith("JPY"):
+        return round(rng.uniform(80.0, 200.0), 3), 3
+    if len(name) == 6 and name.isalpha():
+        return round(rng.uniform(0.5, 2.0), 5), 5
+    return round(rng.uniform(10.0, 5000.0), 2), 2
+
+class SimulatedMT5:
+    TIMEFRAME_M1 = TIMEFRAME_M1
+    TIMEFRAME_M5 = TIMEFRAME_M5
+    TIMEFRAME_M15 = TIMEFRAME_M15
+    TIMEFRAME_M30 = TIMEFRAME_M30
+    TIMEFRAME_H1 = TIMEFRAME_H1
+    TIMEFRAME_H4 = TIMEFRAME_H4
+    TIMEFRAME_D1 = TIMEFRAME_D1
+    TIMEFRAME_W1 = TIMEFRAME_W1
+
+    def __init__(self, seed: int = 42, symbol_count: int = 0, tick_rate: float = 4.0,
+                 spread_points: int = 20, gap_probability: float = 0.001, gap_size: float = 25.0,
+                 server_offset: float = 0.0, clock=time.time):
+        self.seed = seed
+        self.symbol_count = symbol_count
+        self.tick_rate = tick_rate
+        self.spread_points = spread_points
+        self.gap_probability = gap_probability
+        self.gap_size = gap_size
+        # Trade-server time = UTC + server_offset hours (tick times only)
+        self.server_offset = server_offset
+        self.clock = clock
+
+        self._symbols: Dict[str, _SymbolState] = {}
+        self._started_at: Optional[float] = None
+        self._initialized = False
+        self._last_error = (1, "Success")
+        self._login = 10000000 + seed
+
+    @classmethod
+    def from_env(cls) -> "SimulatedMT5":
+        return cls(
+            seed=int(os.getenv("MT5_SIM_SEED", "42")),
+            symbol_count=int(os.getenv("MT5_SIM_SYMBOLS", "0")),
+            tick_rate=float(os.getenv("MT5_SIM_TICK_RATE", "4")),
+            spread_points=int(os.getenv("MT5_SIM_SPREAD", "20")),
+            gap_probability=float(os.getenv("MT5_SIM_GAP_PROB", "0.001")),
+            gap_size=float(os.getenv("MT5_SIM_GAP_SIZE", "25")),
+            server_offset=float(os.getenv("MT5_SIM_SERVER_OFFSET", "0")),
+        )
+
+    # Connection lifecycle
+    def initialize(self, path: str = None, **kwargs) -> bool:
+        self._initialized = True
+        if path:
+            # Each terminal path gets its own stable simulated account
+            self._login = 10000000 + zlib.crc32(path.encode()) % 1000000
+        if self._started_at is None:
+            self._started_at = self.clock()
+        return True
+
+    def login(self, login=None, password=None, server=None, **kwargs) -> bool:
+        if login is not None:
+            self._login = int(login)
+        return True
+
+    def shutdown(self):
+        self._initialized = False
+
+    def last_error(self):
+        return self._last_error
+
+    def terminal_info(self) -> TerminalInfo:
+        return TerminalInfo("WidgetForge Simulator", 0, True, True, True, "simulated")
+
+    def account_info(self) -> AccountInfo:
+        return AccountInfo(self._login, "Simulated-Server", f"Simulated {self._login}", "USD",
+                           100000.0, 100000.0, 0.0, 100000.0, 0.0, 0.0, 100, True)
+
+    def positions_get(self, *args, **kwargs):
+        return ()
+
+    # Symbols
+    def _state(self, symbol: str) -> _SymbolState:
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = self._symbols[symbol] = _SymbolState(symbol, self.seed, self.tick_rate)
+        return state
+
+    def symbol_names(self) -> List[str]:
+        """Well-known symbols followed by generated ones, ``symbol_count`` in total"""
+        names = list(KNOWN_SYMBOLS)
+        if self.symbol_count <= 0:
+            return names
+        names = names[:self.symbol_count]
+        names.extend(f"SIM{i:04d}" for i in range(len(names), self.symbol_count))
+        return names
+
+    def symbols_total(self) -> int:
+        return len(self.symbol_names())
+
+    def symbols_get(self, group: str = None):
+        infos = []
+        for name in self.symbol_names():
+            state = self._state(name)
+            infos.append(SymbolInfo(name, state.digits, state.point, self.spread_points, True))
+        return tuple(infos)
+
+    def symbol_info(self, symbol: str) -> SymbolInfo:
+        state = self._state(symbol)
+        return SymbolInfo(symbol, state.digits, state.point, self.spread_points, True)
+
+    # Ticks
+    def _advance(self, state: _SymbolState, steps: int):
+        rng = state.rng
+        for _ in range(steps):
+            move = rng.gauss(0, state.volatility)
+            if rng.random() < self.gap_probability:
+                move += math.copysign(self.gap_size * state.volatility, move)
+            state.price = max(state.price + move, state.point)
+        state.step += steps
+
+    def symbol_info_tick(self, symbol: str) -> Optional[Tick]:
+        if not self._initialized:
+            self._last_error = (-10004, "No IPC connection")
+            return None
+
+        state = self._state(symbol)
+        now = self.clock()
+        target = int((now - self._started_at) * self.tick_rate)
+        if target > state.step:
+            # Catch up the steps missed since the last read (bounded per call)
+            self._advance(state, min(target - state.step, 1000))
+            state.step = max(state.step, target)
+
+        spread = state.rng.randint(1, max(1, self.spread_points))
+        bid = round(state.price, state.digits)
+        ask = round(bid + spread * state.point, state.digits)
+        server_now = now + self.server_offset * 3600
+        return Tick(int(server_now), bid, ask, 0.0, 0, int(server_now * 1000), 6, 0.0)
+
+    # Bars
+    def _bars(self, symbol: str, timeframe: int, end_time: float, count: int) -> List[Dict]:
+        seconds = TIMEFRAME_SECONDS.get(timeframe)
+        if seconds is None or count <= 0:
+            return []
+
+        state = self._state(symbol)
+        current_bar = int(self.clock()) // seconds * seconds
+        end_bar = min(int(end_time) // seconds * seconds, current_bar)
+        offset = (current_bar - end_bar) // seconds
+        total = min(offset + count, MAX_HISTORY_BARS)
+
+        # Walk backwards from the live price; seeding by the current bar keeps
+        # repeated requests within the same bar identical
+        rng = random.Random((self.seed << 40) ^ zlib.crc32(f"{symbol}:{timeframe}:{current_bar}".encode()))
+        bar_volatility = state.price * DAILY_VOLATILITY * math.sqrt(seconds / 86400)
+        close = state.price
+        bars = []
+        for i in range(total):
+            open_price = max(close - rng.gauss(0, bar_volatility), state.point)
+            high = max(open_price, close) + abs(rng.gauss(0, bar_volatility / 2))
+            low = max(min(open_price, close) - abs(rng.gauss(0, bar_volatility / 2)), state.point)
+            bars.append({
+                "time": current_bar - i * seconds,
+                "open": round(open_price, state.digits),
+                "high": round(high, state.digits),
+                "low": round(low, state.digits),
+                "close": round(close, state.digits),
+                "tick_volume": rng.randint(10, 500),
+                "spread": self.spread_points,
+                "real_volume": 0,
+            })
+            close = open_price
+
+        bars = bars[offset:offset + count]
+        bars.reverse()
+        return bars
+
+    def copy_rates_from_pos(self, symbol: str, timeframe: int, start_pos: int, count: int) -> List[Dict]:
+        seconds = TIMEFRAME_SECONDS.get(timeframe, 60)
+        return self._bars(symbol, timeframe, self.clock() - start_pos * seconds, count)
+
+    def copy_rates_from(self, symbol: str, timeframe: int, date_from, count: int) -> List[Dict]:
+        return self._bars(symbol, timeframe, _to_timestamp(date_from), count)
+
+    def copy_rates_range(self, symbol: str, timeframe: int, date_from, date_to) -> List[Dict]:
+        seconds = TIMEFRAME_SECONDS.get(timeframe)
+        if seconds is None:
+            return []
+        start, end = _to_timestamp(date_from), _to_timestamp(date_to)
+        count = int(end // seconds - start // seconds) + 1
+        return [bar for bar in self._bars(symbol, timeframe, end, count) if start <= bar["time"] <= end]
+
+def _to_timestamp(value) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return float(value)
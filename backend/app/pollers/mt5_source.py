@@ -0,0 +1,114 @@
+"""
+Market data source selection for the MT5 pollers
+
+The pollers talk to an object with the ``MetaTrader5`` module API. Which one is
+chosen by configuration:
+
+  MT5_BACKEND=terminal   the real MetaTrader5 package (default)
+  MT5_BACKEND=simulated  the deterministic simulator in mt5_simulator.py
+
+Terminal locations are configurable instead of hard-coded:
+
+  MT5_TERMINALS_DIR      directory holding Account<N>/terminal64.exe (default C:/MT5Terminals)
+  MT5_TERMINAL_PATH      explicit terminal64.exe for the price terminal (terminal 1)
+
+Tick times reported by a terminal are the broker's trade-server time, usually
+UTC+2/+3 and shifting with DST, not UTC. ``ServerClock`` converts them:
+
+  MT5_SERVER_UTC_OFFSET  server offset from UTC in hours (e.g. 3), or "auto" (default)
+                         to detect it from the freshest tick of each poll pass
+"""
+import os
+import time
+from typing import List, Optional
+
+DEFAULT_TERMINALS_DIR = "C:/MT5Terminals"
+
+_source = None
+
+def backend_name() -> str:
+    return os.getenv("MT5_BACKEND", "terminal").lower()
+
+def is_simulated() -> bool:
+    return backend_name() == "simulated"
+
+def load_mt5():
+    """Get the configured MetaTrader5-compatible market data source"""
+    global _source
+    if _source is None:
+        if is_simulated():
+            from app.pollers.mt5_simulator import SimulatedMT5
+            _source = SimulatedMT5.from_env()
+            print("🧪 Using simulated MT5 market data source")
+        else:
+            import MetaTrader5
+            _source = MetaTrader5
+    return _source
+
+class ServerClock:
+    """
+    Converts trade-server tick times (epoch ms in server time) to UTC epoch ms
+
+    Detection compares tick times with the local UTC clock: the freshest tick of
+    a pass is at most seconds old, so its distance from now, rounded to 30
+    minutes, is the server offset. Distances beyond any real offset (a closed
+    market, stale quotes over a weekend) are ignored and the last offset is kept.
+    """
+    STEP_MS = 30 * 60 * 1000
+    MAX_OFFSET_MS = 14 * 60 * 60 * 1000
+
+    def __init__(self, offset_hours: Optional[str] = None, clock=time.time):
+        value = (offset_hours if offset_hours is not None else os.getenv("MT5_SERVER_UTC_OFFSET", "auto")).strip().lower()
+        self.clock = clock
+        self.detect = value in ("", "auto")
+        self.offset_ms: Optional[int] = None if self.detect else int(float(value) * 3_600_000)
+        self._freshest: Optional[int] = None
+
+    def _rounded(self, delta_ms: int) -> Optional[int]:
+        offset = round(delta_ms / self.STEP_MS) * self.STEP_MS
+        return offset if abs(offset) <= self.MAX_OFFSET_MS else None
+
+    def to_utc(self, server_ms: int) -> int:
+        if self.detect:
+            delta = server_ms - int(self.clock() * 1000)
+            if self._freshest is None or delta > self._freshest:
+                self._freshest = delta
+            if self.offset_ms is None:
+                # First tick seen: best guess until the pass ends
+                self.offset_ms = self._rounded(delta)
+        return server_ms - (self.offset_ms or 0)
+
+    def end_pass(self):
+        """Adopt the offset indicated by the freshest tick of the pass that just ended"""
+        if self.detect and self._freshest is not None:
+            offset = self._rounded(self._freshest)
+            if offset is not None:
+                self.offset_ms = offset
+        self._freshest = None
+
+def terminal_path(terminal_id: int = 1) -> str:
+    """Path of a terminal's terminal64.exe"""
+    if terminal_id == 1 and os.getenv("MT5_TERMINAL_PATH"):
+        return os.getenv("MT5_TERMINAL_PATH")
+    terminals_dir = os.getenv("MT5_TERMINALS_DIR", DEFAULT_TERMINALS_DIR)
+    return os.path.join(terminals_dir, f"Account{terminal_id}", "terminal64.exe")
+
+def terminal_available(path: str) -> bool:
+    """Whether a terminal can be started (always true for the simulator)"""
+    return is_simulated() or os.path.exists(path)
+
+def load_symbols(symbols_file: str) -> List[str]:
+    """
+    Read the poller symbol list
+
+    With the simulator and MT5_SIM_SYMBOLS set, the simulator's generated symbol
+    universe is appended so the pipeline can be load-tested at hundreds of symbols.
+    """
+    with open(symbols_file, 'r') as f:
+        symbols = [line.strip() for line in f if line.strip()]
+
+    if is_simulated() and int(os.getenv("MT5_SIM_SYMBOLS", "0")) > 0:
+        for name in load_mt5().symbol_names():
+            if name not in symbols:
+                symbols.append(name)
+    return symbols
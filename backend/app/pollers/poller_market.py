@@ -1,4 +1,4 @@
-import MetaTrader5 as mt5
+import itertools
 import time
 import os
 import sys
@@ -8,17 +8,35 @@ import pytz
 # Add backend directory to Python path for imports
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from app.services.cache_service import set_price
+from app.models.price_models import PriceRecord
+from app.services.cache_service import set_price, set_price_snapshot
+from app.services.metrics_service import metrics, MT5_POLL_CYCLE, MT5_POLL_ERRORS, MT5_POLL_SYMBOLS
+from app.services.price_bus import PriceBusPublisher, bus_address
+from app.services.tick_journal import tick_journal
+from app.pollers.mt5_source import ServerClock, load_mt5, load_symbols, terminal_available, terminal_path
+
+mt5 = load_mt5()
+
+# Seconds between full passes over the symbol list
+POLL_INTERVAL = float(os.getenv("MT5_POLL_INTERVAL", "1"))
+
+# Sequence numbers start at the poller's start time (ms) so they keep increasing across restarts
+_sequence = itertools.count(int(time.time() * 1000))
+# symbol -> last PriceRecord (an unchanged quote keeps its sequence number) / digits
+_last_records = {}
+_digits = {}
+# Tick times arrive in the broker's server time; records carry UTC
+server_clock = ServerClock()
 
 
 def connect_mt5():
     """Connect to MT5 with detailed error reporting"""
-    mt5_path = "C:/MT5Terminals/Account1/terminal64.exe"
+    mt5_path = terminal_path(1)
     
     print(f"🔍 Attempting MT5 connection: {mt5_path}")
     
     # Check if file exists first
-    if not os.path.exists(mt5_path):
+    if not terminal_available(mt5_path):
         print(f"❌ MT5 executable not found at: {mt5_path}")
         raise RuntimeError("❌ MT5 terminal64.exe not found")
     
@@ -79,51 +97,95 @@ def get_previous_close(symbol):
     return candles[0]['close']
 
 
+def get_digits(symbol):
+    """Price digits of a symbol (looked up once per poller process)"""
+    digits = _digits.get(symbol)
+    if digits is None:
+        info = mt5.symbol_info(symbol)
+        digits = _digits[symbol] = info.digits if info is not None else 5
+    return digits
+
+
 def fetch_price(symbol):
     tick = mt5.symbol_info_tick(symbol)
     if tick is None:
         raise ValueError(f"⚠️ Symbol {symbol} not found or not available")
 
-    bid = tick.bid
-    ask = tick.ask
-    price = (bid + ask) / 2
-    spread = round(ask - bid, 5)
-
     last_close = get_previous_close(symbol)
     if last_close is None:
         raise ValueError(f"⚠️ Could not retrieve previous close for {symbol}")
 
-    change = round(price - last_close, 5)
-    change_pct = round((change / last_close) * 100, 2)
-
-    return {
-        "symbol": symbol,
-        "price": round(price, 5),
-        "change_pct": change_pct,
-        "spread": spread,
-        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-    }
+    digits = get_digits(symbol)
+    bid, ask, last_close = round(tick.bid, digits), round(tick.ask, digits), float(last_close)
+    # Quote time from the terminal (converted from server time to UTC) when it reports one
+    server_ms = getattr(tick, "time_msc", 0)
+    time_ms = server_clock.to_utc(server_ms) if server_ms else int(time.time() * 1000)
+    last = _last_records.get(symbol)
+    if last is not None and (last.bid, last.ask, last.prev_close) == (bid, ask, last_close):
+        seq = last.seq
+    else:
+        seq = next(_sequence)
+
+    record = PriceRecord(symbol, bid, ask, digits, last_close, time_ms, seq)
+    _last_records[symbol] = record
+    return record
+
+
+def get_symbols_file():
+    """Path of the poller symbol list (symbols.txt next to this file)"""
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'symbols.txt')
+
+
+def poll_symbols(symbols, verbose=True):
+    """Fetch and cache one pass over all symbols; returns {symbol: price data}"""
+    results = {}
+    cycle_start = time.perf_counter()
+    for symbol in symbols:
+        try:
+            data = fetch_price(symbol)
+            set_price(symbol, data)
+            results[symbol] = data
+            if verbose:
+                print(f"✅ {symbol}: {data['price']} ({data['change_pct']}%) Spread: {data['spread']}")
+        except Exception as e:
+            MT5_POLL_ERRORS.inc()
+            if verbose:
+                print(f"❌ Error with {symbol}: {e}")
+    server_clock.end_pass()
+    # The whole pass under one key as well, for multi-symbol reads (/price?symbols=, /price/all)
+    set_price_snapshot(results.values())
+    # Every new quote also goes to the tick journal (history, bar rebuilds, replay)
+    tick_journal.append_many(results.values())
+    MT5_POLL_CYCLE.observe(time.perf_counter() - cycle_start)
+    return results
 
 
 def run_mt5_poll():
     connect_mt5()
     
-    # Get the correct path to symbols.txt
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    symbols_file = os.path.join(script_dir, 'symbols.txt')
-    
-    with open(symbols_file, 'r') as f:
-        symbols = [line.strip() for line in f if line.strip()]
-
-    while True:
-        for symbol in symbols:
-            try:
-                data = fetch_price(symbol)
-                set_price(symbol, data)
-                print(f"✅ {symbol}: {data['price']} ({data['change_pct']}%) Spread: {data['spread']}")
-            except Exception as e:
-                print(f"❌ Error with {symbol}: {e}")
-        time.sleep(1)  # Adjust as needed
+    symbols = load_symbols(get_symbols_file())
+
+    MT5_POLL_SYMBOLS.set(len(symbols))
+
+    # PRICE_BUS: broadcast each pass to the API workers once instead of each worker polling the cache
+    publisher = None
+    address = bus_address()
+    if address:
+        publisher = PriceBusPublisher(address)
+        publisher.start()
+        print(f"📡 Price bus listening on {address}")
+
+    try:
+        while True:
+            results = poll_symbols(symbols)
+            if publisher is not None:
+                publisher.publish(results)
+            metrics.publish("market_poller")
+            time.sleep(POLL_INTERVAL)
+    finally:
+        if publisher is not None:
+            publisher.stop()
+        tick_journal.close()
 
 if __name__ == "__main__":
     run_mt5_poll()
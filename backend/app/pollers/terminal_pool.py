@@ -0,0 +1,217 @@
+"""
+MT5 Terminal Pool - one long-lived worker process per account terminal
+
+The MetaTrader5 package binds a single terminal per process, so each configured
+terminal (C:/MT5Terminals/Account<N>) gets its own worker process. Workers stay
+connected and snapshot account info (balance, equity, profit, open positions,
+today's closed-trade stats) into the shared cache every few seconds;
+``/api/mt5/multi-terminal-data`` serves those snapshots, so no request ever waits
+on ``mt5.initialize`` and latency does not grow with the number of terminals.
+
+Configuration:
+  MT5_TERMINAL_IDS        comma-separated terminal numbers, e.g. "2,3,4"
+  MT5_ACCOUNT_INTERVAL    seconds between snapshots per terminal (default 2)
+
+Run standalone (multi-process layout) or under the poller supervisor.
+"""
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Add backend directory to Python path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.services.cache_service import set_account, get_account
+
+MAX_RECONNECT_BACKOFF = 60.0
+
+# MetaTrader5 constants (ORDER_TYPE_BUY / DEAL_ENTRY_OUT)
+POSITION_TYPE_BUY = 0
+DEAL_ENTRY_OUT = 1
+
+def terminal_cache_key(terminal_id: int) -> str:
+    return f"terminal:{terminal_id}"
+
+def get_terminal_snapshot(terminal_id: int) -> Optional[Dict]:
+    """Latest account snapshot written by a terminal worker"""
+    return get_account(terminal_cache_key(terminal_id))
+
+def get_terminal_status(terminal_id: int) -> Optional[Dict]:
+    """Connection status of a terminal worker"""
+    return get_account(f"{terminal_cache_key(terminal_id)}:status")
+
+def configured_terminal_ids() -> List[int]:
+    raw = os.getenv("MT5_TERMINAL_IDS", "")
+    return [int(tid) for tid in raw.split(",") if tid.strip().isdigit()]
+
+def _daily_stats(mt5) -> Optional[Dict]:
+    """Closed-trade statistics since midnight (None if deal history is unavailable)"""
+    if not hasattr(mt5, "history_deals_get"):
+        return None
+    now = datetime.now()
+    deals = mt5.history_deals_get(datetime(now.year, now.month, now.day), now)
+    if deals is None:
+        return None
+
+    closed = [deal for deal in deals if getattr(deal, "entry", None) == DEAL_ENTRY_OUT]
+    wins = sum(1 for deal in closed if deal.profit > 0)
+    return {
+        "closed_trades": len(closed),
+        "wins": wins,
+        "win_rate": round(wins / len(closed) * 100, 1) if closed else 0,
+        "realized_profit": round(sum(deal.profit for deal in closed), 2),
+    }
+
+def build_snapshot(mt5, terminal_id: int) -> Dict:
+    """Read account info and open positions from a connected terminal"""
+    account = mt5.account_info()
+    if account is None:
+        raise RuntimeError(f"account_info() failed: {mt5.last_error()}")
+
+    positions = mt5.positions_get() or ()
+    open_trades = [
+        {
+            "ticket": getattr(position, "ticket", None),
+            "symbol": position.symbol,
+            "type": "BUY" if position.type == POSITION_TYPE_BUY else "SELL",
+            "volume": position.volume,
+            "price_open": position.price_open,
+            "profit": round(position.profit, 2),
+        }
+        for position in positions
+    ]
+
+    margin_level = getattr(account, "margin_level", None)
+    if margin_level is None:
+        margin_level = account.equity / account.margin * 100 if account.margin else 0.0
+
+    return {
+        "terminal_id": terminal_id,
+        "login": account.login,
+        "label": account.name or str(account.login),
+        "server": account.server,
+        "currency": account.currency,
+        "balance": round(account.balance, 2),
+        "equity": round(account.equity, 2),
+        "margin": round(account.margin, 2),
+        "margin_free": round(account.margin_free, 2),
+        "margin_level": round(margin_level, 2),
+        "profit": round(account.profit, 2),
+        "open_trades": open_trades,
+        "trade_count": len(open_trades),
+        "daily_stats": _daily_stats(mt5),
+        "timestamp": int(time.time()),
+    }
+
+def terminal_worker(terminal_id: int, interval: float, stop_event=None):
+    """Worker process body: stay connected to one terminal and keep its snapshot fresh"""
+    from app.pollers.mt5_source import load_mt5, terminal_available, terminal_path
+
+    mt5 = load_mt5()
+    path = terminal_path(terminal_id)
+    expire = int(max(30, interval * 5))
+    status_key = f"{terminal_cache_key(terminal_id)}:status"
+    backoff = 1.0
+    connected = False
+
+    while stop_event is None or not stop_event.is_set():
+        try:
+            if not connected:
+                if not terminal_available(path):
+                    raise RuntimeError(f"Terminal executable not found: {path}")
+                if not mt5.initialize(path=path):
+                    raise RuntimeError(f"initialize() failed: {mt5.last_error()}")
+                connected = True
+                backoff = 1.0
+                print(f"✅ Terminal {terminal_id} connected")
+
+            set_account(terminal_cache_key(terminal_id), build_snapshot(mt5, terminal_id), expire=expire)
+            set_account(status_key, {"status": "connected", "updated": int(time.time())}, expire=expire)
+            time.sleep(interval)
+
+        except Exception as e:
+            print(f"❌ Terminal {terminal_id}: {e}")
+            set_account(status_key, {"status": "error", "error": str(e), "updated": int(time.time())}, expire=expire)
+            if connected:
+                try:
+                    mt5.shutdown()
+                except Exception:
+                    pass
+                connected = False
+            time.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RECONNECT_BACKOFF)
+
+    if connected:
+        mt5.shutdown()
+
+class TerminalPool:
+    def __init__(self, terminal_ids: List[int] = None, interval: float = None):
+        self.terminal_ids = terminal_ids if terminal_ids is not None else configured_terminal_ids()
+        self.interval = interval or float(os.getenv("MT5_ACCOUNT_INTERVAL", "2"))
+        # spawn everywhere: matches Windows, where the MT5 terminals live
+        self._context = multiprocessing.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._workers: Dict[int, multiprocessing.Process] = {}
+
+    def _spawn(self, terminal_id: int):
+        process = self._context.Process(
+            target=terminal_worker,
+            args=(terminal_id, self.interval, self._stop_event),
+            name=f"mt5-terminal-{terminal_id}",
+            daemon=True,
+        )
+        process.start()
+        self._workers[terminal_id] = process
+
+    def start(self):
+        for terminal_id in self.terminal_ids:
+            self._spawn(terminal_id)
+        print(f"🚀 Terminal pool started for terminals: {self.terminal_ids}")
+
+    def check(self) -> List[int]:
+        """Restart any worker that has exited; returns the restarted terminal ids"""
+        restarted = []
+        if self._stop_event.is_set():
+            return restarted
+        for terminal_id, process in list(self._workers.items()):
+            if not process.is_alive():
+                print(f"⚠️ Terminal {terminal_id} worker exited ({process.exitcode}), restarting")
+                self._spawn(terminal_id)
+                restarted.append(terminal_id)
+        return restarted
+
+    def stop(self, timeout: float = 5.0):
+        self._stop_event.set()
+        for process in self._workers.values():
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._workers.clear()
+
+    def get_status(self) -> Dict[int, Dict]:
+        return {
+            terminal_id: {"alive": process.is_alive(), "pid": process.pid, **(get_terminal_status(terminal_id) or {})}
+            for terminal_id, process in self._workers.items()
+        }
+
+def run_terminal_pool():
+    pool = TerminalPool()
+    if not pool.terminal_ids:
+        print("ℹ️ MT5_TERMINAL_IDS is not set - no account terminals to poll")
+        return
+
+    pool.start()
+    try:
+        while True:
+            time.sleep(5)
+            pool.check()
+    except KeyboardInterrupt:
+        print("Terminal pool stopped by user")
+    finally:
+        pool.stop()
+
+if __name__ == "__main__":
+    run_terminal_pool()
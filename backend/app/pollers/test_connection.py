@@ -2,17 +2,22 @@
 MT5 Connection Test Script
 Used to test MT5 connections without permanent configuration
 """
-import MetaTrader5 as mt5
 import argparse
 import os
 import sys
 
+# Add backend directory to Python path for imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from app.pollers.mt5_source import load_mt5, terminal_available, terminal_path
+
+mt5 = load_mt5()
+
 def test_mt5_connection(terminal_id: int, login: str, password: str, server: str) -> bool:
     """Test MT5 connection and return success status"""
-    terminal_path = f"C:/MT5Terminals/Account{terminal_id}"
-    exe_path = os.path.join(terminal_path, "terminal64.exe")
+    exe_path = terminal_path(terminal_id)
     
-    if not os.path.exists(exe_path):
+    if not terminal_available(exe_path):
         print(f"Terminal executable not found: {exe_path}", file=sys.stderr)
         return False
     
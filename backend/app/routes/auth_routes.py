@@ -9,6 +9,7 @@ from datetime import datetime
 import logging
 
 from app.models.auth_models import auth_db, User, TraderAccount
+from app.services.session_token_service import session_token_service
 
 logger = logging.getLogger(__name__)
 
@@ -59,11 +60,9 @@ def get_current_user(session_token: Optional[str] = Cookie(None)) -> Optional[Us
     if not session_token:
         return None
     
-    # Clean up expired sessions
-    auth_db.cleanup_expired_sessions()
-    
-    # Get user from session
-    user = auth_db.get_session_user(session_token)
+    # Get user from session (DB-backed or signed token). Signed tokens resolve to
+    # id and role only, without a database read; use require_profile for the rest
+    user = session_token_service.get_session_user(session_token, full_profile=False)
     return user
 
 def require_auth(user: User = Depends(get_current_user)) -> User:
@@ -72,12 +71,30 @@ def require_auth(user: User = Depends(get_current_user)) -> User:
         raise HTTPException(status_code=401, detail="Authentication required")
     return user
 
+def require_profile(user: User = Depends(require_auth)) -> User:
+    """Require authentication and load the full user row"""
+    profile = session_token_service.load_profile(user)
+    if not profile:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    return profile
+
 def require_admin(user: User = Depends(require_auth)) -> User:
     """Require admin role"""
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return user
 
+def set_session_cookie(response: Response, session_token: str):
+    """Set the session cookie"""
+    response.set_cookie(
+        key="session_token",
+        value=session_token,
+        httponly=True,
+        secure=True,
+        samesite="lax",
+        max_age=24 * 60 * 60  # 24 hours
+    )
+
 # Authentication Endpoints
 @router.post("/api/auth/login")
 async def login(request: LoginRequest, response: Response):
@@ -93,20 +110,13 @@ async def login(request: LoginRequest, response: Response):
             raise HTTPException(status_code=401, detail="Invalid credentials")
         
         # Create session
-        session_token = auth_db.create_session(user.id)
+        session_token = session_token_service.create_session(user)
         
         # Update last login
         auth_db.update_last_login(user.id)
         
         # Set secure cookie
-        response.set_cookie(
-            key="session_token",
-            value=session_token,
-            httponly=True,
-            secure=True,
-            samesite="lax",
-            max_age=24 * 60 * 60  # 24 hours
-        )
+        set_session_cookie(response, session_token)
         
         return {
             "status": "success",
@@ -131,7 +141,7 @@ async def login(request: LoginRequest, response: Response):
 async def logout(response: Response, session_token: Optional[str] = Cookie(None)):
     """User logout"""
     if session_token:
-        auth_db.delete_session(session_token)
+        session_token_service.end_session(session_token)
     
     # Clear cookie
     response.delete_cookie("session_token")
@@ -139,7 +149,7 @@ async def logout(response: Response, session_token: Optional[str] = Cookie(None)
     return {"status": "success", "message": "Logged out successfully"}
 
 @router.get("/api/auth/current-user")
-async def get_current_user_info(user: User = Depends(require_auth)):
+async def get_current_user_info(user: User = Depends(require_profile)):
     """Get current user information"""
     return UserResponse(
         id=user.id,
@@ -152,7 +162,9 @@ async def get_current_user_info(user: User = Depends(require_auth)):
     )
 
 @router.post("/api/auth/change-password")
-async def change_password(request: ChangePasswordRequest, user: User = Depends(require_auth)):
+async def change_password(request: ChangePasswordRequest, response: Response,
+                          user: User = Depends(require_profile),
+                          session_token: Optional[str] = Cookie(None)):
     """Change user password"""
     try:
         # Verify current password
@@ -161,6 +173,10 @@ async def change_password(request: ChangePasswordRequest, user: User = Depends(r
         
         # Update password
         if auth_db.update_user_password(user.id, request.new_password):
+            # Invalidate other signed sessions of this user, then re-issue this one
+            session_token_service.revoke_user(user.id)
+            if session_token and session_token_service.is_signed_token(session_token):
+                set_session_cookie(response, session_token_service.issue(user))
             return {"status": "success", "message": "Password changed successfully"}
         else:
             raise HTTPException(status_code=500, detail="Failed to update password")
@@ -245,6 +261,9 @@ async def reset_user_password(user_id: int, admin: User = Depends(require_admin)
                 )
                 conn.commit()
             
+            # Invalidate existing signed sessions of this user
+            session_token_service.revoke_user(user_id)
+            
             return {
                 "status": "success",
                 "message": "Password reset successfully",
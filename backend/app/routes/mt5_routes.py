@@ -1,86 +1,132 @@
 """
-MT5 Routes - Price Data Only
+MT5 Routes - Price data and cached account terminal snapshots
 """
 from fastapi import APIRouter, HTTPException
-import os
-import sqlite3
+import asyncio
+import logging
+from collections import deque
+import time
+
+from app.services.chart_history_service import chart_history_db
+from app.services.json_service import FastJSONResponse
+from app.services.single_flight import SingleFlight
+from app.services.tick_journal import tick_journal_reader
+from app.pollers.terminal_pool import get_terminal_snapshot, get_terminal_status
 
 router = APIRouter()
 
+# Identical chart requests in flight share one query (e.g. many widgets after a reload)
+chart_flight = SingleFlight("chart_history")
+tick_flight = SingleFlight("tick_history")
+
 @router.get("/api/mt5/chart-history/{symbol}")
 async def get_chart_history(symbol: str, hours: int = 24, max_points: int = 180):
     """Get historical chart data for a symbol"""
     try:
-        # Connect to the chart history database
-        cache_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", ".cache"))
-        db_path = os.path.join(cache_dir, "chart_history.db")
-        
-        # Debug info
-        import logging
-        logging.info(f"Looking for database at: {db_path}")
-        logging.info(f"Database exists: {os.path.exists(db_path)}")
-        
-        if not os.path.exists(db_path):
-            # Try alternative path
-            alt_cache_dir = os.path.join(os.getcwd(), ".cache")
-            alt_db_path = os.path.join(alt_cache_dir, "chart_history.db")
-            logging.info(f"Trying alternative path: {alt_db_path}")
-            
-            if os.path.exists(alt_db_path):
-                db_path = alt_db_path
-            else:
-                raise HTTPException(status_code=404, detail=f"Chart history database not found. Searched: {db_path} and {alt_db_path}")
-        
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        # Calculate cutoff timestamp
-        import time
-        cutoff = int(time.time()) - (hours * 60 * 60)
-        
-        # Query data
-        cursor.execute('''
-            SELECT timestamp, price 
-            FROM price_history 
-            WHERE symbol = ? AND timestamp > ?
-            ORDER BY timestamp
-        ''', (symbol, cutoff))
-        
-        data = cursor.fetchall()
-        conn.close()
-        
-        if not data:
-            return {"symbol": symbol, "data": [], "message": "No data available for this symbol"}
-        
-        # Resample if we have too many points
-        if len(data) > max_points:
-            step = len(data) // max_points
-            data = data[::step]
+        # Locate the chart history database
+        db_path = chart_history_db.find_path()
+        if db_path is None:
+            searched = chart_history_db.candidate_paths()
+            raise HTTPException(status_code=404, detail=f"Chart history database not found. Searched: {searched[0]} and {searched[1]}")
         
-        # Format response with safe data conversion
-        chart_data = []
-        for ts, price in data:
-            try:
-                # Ensure timestamp and price are proper numbers
-                timestamp = int(ts) if isinstance(ts, (int, float)) else int(float(ts))
-                price_val = float(price) if isinstance(price, (int, float, str)) else 0.0
-                chart_data.append({"timestamp": timestamp, "price": price_val})
-            except (ValueError, TypeError) as e:
-                logging.warning(f"Skipping invalid data point: ts={ts}, price={price}, error={e}")
-                continue
-        
-        if not chart_data:
-            return {"symbol": symbol, "data": [], "message": "No valid data points found"}
-        
-        return {
-            "symbol": symbol,
-            "data": chart_data,
-            "first_price": chart_data[0]["price"] if chart_data else None,
-            "last_price": chart_data[-1]["price"] if chart_data else None,
-            "point_count": len(chart_data)
-        }
+        # Query data off the event loop (shared connection, kept open between requests)
+        key = (db_path, symbol, hours, max_points)
+        payload = await chart_flight.do_async(key, lambda: asyncio.to_thread(_build_chart_history, db_path, symbol, hours, max_points))
+        return FastJSONResponse(payload)
         
     except Exception as e:
         import traceback
         error_details = traceback.format_exc()
-        raise HTTPException(status_code=500, detail=f"Database error: {str(e)} | {error_details}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)} | {error_details}")
+
+def _build_chart_history(db_path: str, symbol: str, hours: int, max_points: int) -> dict:
+    """Chart payload for a symbol (runs in a worker thread)"""
+    # Calculate cutoff timestamp
+    cutoff = int(time.time()) - (hours * 60 * 60)
+    data = chart_history_db.query_history(db_path, symbol, cutoff)
+    
+    if not data:
+        return {"symbol": symbol, "data": [], "message": "No data available for this symbol"}
+    
+    # Resample if we have too many points
+    if len(data) > max_points:
+        step = len(data) // max_points
+        data = data[::step]
+    
+    # Format response with safe data conversion
+    chart_data = []
+    for ts, price in data:
+        try:
+            # Ensure timestamp and price are proper numbers
+            timestamp = int(ts) if isinstance(ts, (int, float)) else int(float(ts))
+            price_val = float(price) if isinstance(price, (int, float, str)) else 0.0
+            chart_data.append({"timestamp": timestamp, "price": price_val})
+        except (ValueError, TypeError) as e:
+            logging.warning(f"Skipping invalid data point: ts={ts}, price={price}, error={e}")
+            continue
+    
+    if not chart_data:
+        return {"symbol": symbol, "data": [], "message": "No valid data points found"}
+    
+    return {
+        "symbol": symbol,
+        "data": chart_data,
+        "first_price": chart_data[0]["price"] if chart_data else None,
+        "last_price": chart_data[-1]["price"] if chart_data else None,
+        "point_count": len(chart_data)
+    }
+
+@router.get("/api/mt5/tick-history/{symbol}")
+async def get_tick_history(symbol: str, minutes: int = 60, timeframe: int = 0, max_points: int = 5000):
+    """
+    High-resolution history from the tick journal
+
+    ``timeframe=0`` returns the raw ticks (the most recent ``max_points``),
+    otherwise OHLC bars of ``timeframe`` seconds rebuilt from the ticks.
+    """
+    if minutes <= 0 or timeframe < 0 or max_points <= 0:
+        raise HTTPException(status_code=400, detail="minutes and max_points must be positive, timeframe >= 0")
+    end_ms = int(time.time() * 1000) + 1
+    start_ms = end_ms - minutes * 60_000
+    key = (symbol.upper(), minutes, timeframe, max_points, end_ms // 1000)
+    payload = await tick_flight.do_async(key, lambda: asyncio.to_thread(
+        _build_tick_history, symbol.upper(), start_ms, end_ms, timeframe, max_points))
+    return FastJSONResponse(payload)
+
+def _build_tick_history(symbol: str, start_ms: int, end_ms: int, timeframe: int, max_points: int) -> dict:
+    """Tick or bar payload for a symbol (runs in a worker thread)"""
+    if timeframe:
+        data = tick_journal_reader.bars(symbol, start_ms, end_ms, timeframe)[-max_points:]
+    else:
+        data = [tick._asdict() for tick in deque(tick_journal_reader.ticks(symbol, start_ms, end_ms), maxlen=max_points)]
+    return {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "from_ms": start_ms,
+        "to_ms": end_ms,
+        "data": data,
+        "point_count": len(data),
+    }
+
+@router.get("/api/mt5/multi-terminal-data")
+async def get_multi_terminal_data(terminal_ids: str = ""):
+    """
+    Get account snapshots for several terminals (e.g. ?terminal_ids=2,3,4)
+
+    Served from the cache kept fresh by the terminal pool workers; a terminal
+    without a recent snapshot maps to null and its worker status is reported.
+    """
+    ids = [int(tid) for tid in terminal_ids.split(",") if tid.strip().isdigit()]
+
+    terminals = {}
+    status = {}
+    for terminal_id in ids:
+        terminals[str(terminal_id)] = get_terminal_snapshot(terminal_id)
+        status[str(terminal_id)] = get_terminal_status(terminal_id) or {"status": "unknown"}
+
+    return FastJSONResponse({
+        "success": True,
+        "terminals": terminals,
+        "status": status,
+        "count": sum(1 for snapshot in terminals.values() if snapshot)
+    })
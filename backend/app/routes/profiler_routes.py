@@ -0,0 +1,61 @@
+"""
+Profiler Routes - on-demand profiling of the running API process (admin only)
+"""
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.models.auth_models import User
+from app.routes.auth_routes import require_admin
+from app.services.profiler_service import ProfilerBusyError, request_profiler, sampling_profiler
+
+router = APIRouter()
+
+@router.get("/api/admin/profiler/sample")
+async def sample_process(
+    seconds: float = Query(10.0, gt=0, le=60),
+    interval: float = Query(0.005, ge=0.001, le=1.0),
+    format: str = Query("collapsed", pattern="^(collapsed|json)$"),
+    admin: User = Depends(require_admin)
+):
+    """
+    Sample every thread's stack for ``seconds`` and return the aggregate
+
+    ``format=collapsed`` returns a file for flamegraph.pl / speedscope;
+    ``format=json`` returns the collapsed text plus the hottest frames.
+    """
+    try:
+        # Sample from a worker thread so the event loop keeps serving (and is sampled)
+        result = await run_in_threadpool(sampling_profiler.sample, seconds, interval)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    if format == "json":
+        return {"success": True, "data": result}
+
+    filename = f"widgetforge-{datetime.now().strftime('%Y%m%d_%H%M%S')}.collapsed"
+    return PlainTextResponse(
+        result["collapsed"] + "\n",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/api/admin/profiler/requests")
+async def list_request_profiles(admin: User = Depends(require_admin)):
+    """List stored per-request profiles (send ``X-Profile: 1`` on a request to record one)"""
+    profiles = request_profiler.list()
+    return {"success": True, "data": profiles, "count": len(profiles)}
+
+@router.get("/api/admin/profiler/requests/{profile_id}")
+async def get_request_profile(profile_id: str, admin: User = Depends(require_admin)):
+    """
+    Get a per-request cProfile report
+
+    The profile covers the event-loop thread for the request's duration, so it
+    includes other coroutines that ran meanwhile and misses threadpool work.
+    """
+    profile = request_profiler.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile["report"])
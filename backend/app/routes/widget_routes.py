@@ -0,0 +1,54 @@
+"""
+Widget Routes - Schema-driven widget rendering
+"""
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import HTMLResponse
+
+from app.models.widget_models import (
+    ENHANCED_TICKER_SCHEMA,
+    SMOOTH_TICKER_SCHEMA,
+    CANVAS_TICKER_SCHEMA,
+    ROTATING_FINANCIAL_NEWS_SCHEMA,
+)
+from app.services.preset_service import preset_registry
+from app.services.widget_service import widget_render_service
+
+router = APIRouter()
+
+@router.get("/widgets/enhanced-ticker", response_class=HTMLResponse)
+async def enhanced_ticker_widget(request: Request):
+    return await widget_render_service.render_response_async(ENHANCED_TICKER_SCHEMA, request)
+
+@router.get("/widgets/smooth-ticker", response_class=HTMLResponse)
+async def smooth_ticker_widget(request: Request):
+    return await widget_render_service.render_response_async(SMOOTH_TICKER_SCHEMA, request)
+
+@router.get("/widgets/canvas-ticker", response_class=HTMLResponse)
+async def canvas_ticker_widget(request: Request):
+    return await widget_render_service.render_response_async(CANVAS_TICKER_SCHEMA, request)
+
+@router.get("/widgets/rotating-financial-news", response_class=HTMLResponse)
+async def rotating_financial_news_widget(request: Request):
+    """Rotating widget combining Financial Juice news and Forex Factory calendar"""
+    return await widget_render_service.render_response_async(ROTATING_FINANCIAL_NEWS_SCHEMA, request)
+
+@router.get("/api/presets")
+async def list_presets():
+    """List available ticker presets (use with ?preset=<name> on widget URLs)"""
+    presets = preset_registry.get_presets()
+    return {
+        "success": True,
+        "data": [
+            {"id": preset_id, "name": preset.get("name", preset_id), "description": preset.get("description", "")}
+            for preset_id, preset in presets.items()
+        ],
+        "count": len(presets)
+    }
+
+@router.get("/api/presets/{preset_id}")
+async def get_preset(preset_id: str):
+    """Get a single ticker preset"""
+    preset = preset_registry.get_preset(preset_id)
+    if not preset:
+        raise HTTPException(status_code=404, detail="Preset not found")
+    return {"success": True, "data": {"id": preset_id, **preset}}
@@ -1,19 +1,294 @@
-from diskcache import Cache
+"""
+Cache Service for WidgetForge
+
+``cache`` is a two-tier cache shared by the services and the pollers:
+
+* L1: a bounded in-process LRU with TTLs, so a hot key read hundreds of times
+  per second costs a dict lookup instead of a SQLite query and an unpickle.
+  Limits (entries, approximate bytes, TTL) are set per namespace - the key
+  prefix, see ``namespace_of``.
+* L2: the ``diskcache.Cache`` in ``CACHE_DIR``, shared by every process. It
+  stays the source of truth; every write goes through to it.
+
+Other processes write to L2 behind our back, so each namespace has a version
+stamp in L2 that every write increments. A process compares the stamps of the
+namespaces it holds at most every ``VERSION_CHECK_INTERVAL`` seconds and drops
+a namespace from L1 when it moved, which bounds cross-process staleness to that
+interval. Namespaces whose L1 TTL is not longer than the interval (prices,
+written many times a second by the market poller) skip the stamps: the TTL
+bounds their staleness just as well without an extra write per update.
+
+Values in L1 are shared between callers: treat cached values as read-only and
+``set`` a new value instead of mutating one in place. Methods other than
+get/set/incr/delete/clear are passed through to L2 and bypass L1.
+"""
 import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
 
-# Define cache location relative to project
+from diskcache import Cache
+
+from app.models.price_models import PriceRecord, as_price_record, pack_records, unpack_records
+
+# Define cache location relative to project (overridable for tests/benchmarks)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CACHE_DIR = os.path.abspath(os.path.join(BASE_DIR, "../../../.cache"))
-cache = Cache(CACHE_DIR)
+CACHE_DIR = os.environ.get("WIDGETFORGE_CACHE_DIR") or os.path.abspath(os.path.join(BASE_DIR, "../../../.cache"))
+
+# Seconds between version stamp checks (upper bound on cross-process staleness)
+VERSION_CHECK_INTERVAL = 0.25
+VERSION_KEY = "l1:version:{}"
+
+@dataclass(frozen=True)
+class NamespaceLimits:
+    max_entries: int = 256
+    max_bytes: int = 8 * 1024 * 1024
+    ttl: float = 60.0
+
+NAMESPACE_LIMITS: Dict[str, NamespaceLimits] = {
+    "price": NamespaceLimits(max_entries=2048, max_bytes=2 * 1024 * 1024, ttl=VERSION_CHECK_INTERVAL),
+    "account": NamespaceLimits(max_entries=256, max_bytes=2 * 1024 * 1024, ttl=5.0),
+    "metrics": NamespaceLimits(max_entries=64, max_bytes=4 * 1024 * 1024, ttl=5.0),
+    "rss": NamespaceLimits(max_entries=64, max_bytes=8 * 1024 * 1024, ttl=60.0),
+    "calendar": NamespaceLimits(max_entries=128, max_bytes=8 * 1024 * 1024, ttl=300.0),
+    "default": NamespaceLimits(),
+}
+
+# Key prefix -> namespace (first match wins)
+NAMESPACE_PREFIXES: Tuple[Tuple[str, str], ...] = (
+    ("price:", "price"),
+    ("account:", "account"),
+    ("metrics:", "metrics"),
+    ("rss", "rss"),
+    ("ff_", "calendar"),
+)
+
+def namespace_of(key) -> str:
+    if isinstance(key, str):
+        for prefix, namespace in NAMESPACE_PREFIXES:
+            if key.startswith(prefix):
+                return namespace
+    return "default"
+
+def approximate_size(value, _depth: int = 0) -> int:
+    """Rough in-memory size of a cached value (containers are walked a few levels deep)"""
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        return size + sum(approximate_size(k, _depth + 1) + approximate_size(v, _depth + 1) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approximate_size(item, _depth + 1) for item in value)
+    return size
+
+class _Namespace:
+    __slots__ = ("name", "limits", "entries", "bytes", "version", "stamped", "stats")
+
+    def __init__(self, name: str, limits: NamespaceLimits):
+        self.name = name
+        self.limits = limits
+        self.entries: "OrderedDict[Any, Tuple[Any, float, int]]" = OrderedDict()  # key -> (value, expires_at, size)
+        self.bytes = 0
+        self.version: Optional[int] = None
+        self.stamped = limits.ttl > VERSION_CHECK_INTERVAL
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[2]
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+class TieredCache:
+    def __init__(self, disk: Cache, limits: Optional[Dict[str, NamespaceLimits]] = None):
+        self.disk = disk
+        self.limits = dict(NAMESPACE_LIMITS if limits is None else limits)
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+
+    def __getattr__(self, name):
+        # Anything else (volume, transact, memoize, ...) goes straight to L2
+        return getattr(self.disk, name)
 
-# 🔐 PRICE CACHE
-def set_price(symbol: str, data: dict, expire: int = 10):
-    cache.set(f"price:{symbol.upper()}", data, expire=expire)
+    def _namespace(self, key) -> _Namespace:
+        name = namespace_of(key)
+        namespace = self._namespaces.get(name)
+        if namespace is None:
+            limits = self.limits.get(name) or self.limits.get("default") or NamespaceLimits()
+            namespace = self._namespaces.setdefault(name, _Namespace(name, limits))
+        return namespace
+
+    # Cross-process invalidation
+    def _check_versions(self, now: float):
+        if now < self._next_check:
+            return
+        self._next_check = now + VERSION_CHECK_INTERVAL
+        for namespace in list(self._namespaces.values()):
+            if not namespace.stamped:
+                continue
+            if not namespace.entries:
+                # Nothing to invalidate; the next fill reads a fresh stamp
+                namespace.version = None
+                continue
+            version = self.disk.get(VERSION_KEY.format(namespace.name), 0)
+            with self._lock:
+                if version != namespace.version:
+                    namespace.stats["invalidations"] += 1
+                    namespace.clear()
+                    namespace.version = version
+
+    def _bump_version(self, namespace: _Namespace):
+        if not namespace.stamped:
+            return
+        version = self.disk.incr(VERSION_KEY.format(namespace.name))
+        with self._lock:
+            if namespace.version is not None and version == namespace.version + 1:
+                namespace.version = version
+            else:
+                # Someone else wrote to this namespace since we last looked
+                if namespace.entries:
+                    namespace.stats["invalidations"] += 1
+                namespace.clear()
+                namespace.version = version
+
+    def _store(self, namespace: _Namespace, key, value, expire: Optional[float], now: float):
+        ttl = namespace.limits.ttl if expire is None else min(namespace.limits.ttl, expire)
+        if ttl <= 0:
+            return
+        size = approximate_size(value)
+        if size > namespace.limits.max_bytes:
+            return
+        with self._lock:
+            namespace.drop(key)
+            namespace.entries[key] = (value, now + ttl, size)
+            namespace.bytes += size
+            while len(namespace.entries) > namespace.limits.max_entries or namespace.bytes > namespace.limits.max_bytes:
+                _, (_, _, evicted_size) = namespace.entries.popitem(last=False)
+                namespace.bytes -= evicted_size
+                namespace.stats["evictions"] += 1
+
+    # Cache API (diskcache-compatible subset)
+    def get(self, key, default=None):
+        namespace = self._namespace(key)
+        now = time.monotonic()
+        self._check_versions(now)
+        with self._lock:
+            entry = namespace.entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    namespace.entries.move_to_end(key)
+                    namespace.stats["l1_hits"] += 1
+                    return entry[0]
+                namespace.drop(key)
+                namespace.stats["expired"] += 1
+
+        if namespace.stamped and namespace.version is None:
+            # First fill of this namespace: remember the stamp the data belongs to
+            namespace.version = self.disk.get(VERSION_KEY.format(namespace.name), 0)
+        value, expire_time = self.disk.get(key, default=None, expire_time=True)
+        if value is None:
+            with self._lock:
+                namespace.stats["misses"] += 1
+            return default
+        with self._lock:
+            namespace.stats["l2_hits"] += 1
+        self._store(namespace, key, value, None if expire_time is None else expire_time - time.time(), now)
+        return value
+
+    def set(self, key, value, expire: Optional[float] = None, **kwargs) -> bool:
+        result = self.disk.set(key, value, expire=expire, **kwargs)
+        namespace = self._namespace(key)
+        self._bump_version(namespace)
+        self._store(namespace, key, value, expire, time.monotonic())
+        return result
+
+    def incr(self, key, delta: int = 1, default: int = 0, **kwargs) -> int:
+        value = self.disk.incr(key, delta, default, **kwargs)
+        namespace = self._namespace(key)
+        self._bump_version(namespace)
+        self._store(namespace, key, value, None, time.monotonic())
+        return value
+
+    def delete(self, key, **kwargs) -> bool:
+        result = self.disk.delete(key, **kwargs)
+        namespace = self._namespace(key)
+        with self._lock:
+            namespace.drop(key)
+        self._bump_version(namespace)
+        return result
+
+    def clear(self, **kwargs) -> int:
+        with self._lock:
+            for namespace in self._namespaces.values():
+                namespace.clear()
+                namespace.version = None
+        return self.disk.clear(**kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Per-namespace L1 statistics (hits by tier, misses, evictions, size)"""
+        with self._lock:
+            return {
+                name: {**namespace.stats, "entries": len(namespace.entries), "bytes": namespace.bytes}
+                for name, namespace in sorted(self._namespaces.items())
+            }
+
+cache = TieredCache(Cache(CACHE_DIR))
+
+# 🔐 PRICE CACHE (PriceRecords are stored packed, legacy dicts as they are)
+# key -> (packed bytes, record): L1 hits return the same bytes object, so each tick is decoded once
+_decoded_prices: Dict[str, Tuple[bytes, PriceRecord]] = {}
+
+# Seconds a quote is served after the poller wrote it; older quotes count as missing
+PRICE_EXPIRE = 10
+
+def set_price(symbol: str, data, expire: int = PRICE_EXPIRE):
+    cache.set(f"price:{symbol.upper()}", data.pack() if isinstance(data, PriceRecord) else data, expire=expire)
 
 def get_price(symbol: str):
-    return cache.get(f"price:{symbol.upper()}")
+    key = f"price:{symbol.upper()}"
+    data = cache.get(key)
+    if not isinstance(data, bytes):
+        return data
+    decoded = _decoded_prices.get(key)
+    if decoded is not None and decoded[0] is data:
+        return decoded[1]
+    record = as_price_record(data)
+    _decoded_prices[key] = (data, record)
+    return record
+
+# All records of the latest poll pass under one key, so a multi-symbol read is one cache read
+PRICE_SNAPSHOT_KEY = "price:*"
+_decoded_snapshot: Tuple[Optional[bytes], Dict[str, PriceRecord]] = (None, {})
+
+def set_price_snapshot(records, expire: int = PRICE_EXPIRE):
+    cache.set(PRICE_SNAPSHOT_KEY, pack_records(records), expire=expire)
+
+def get_price_snapshot() -> Dict[str, PriceRecord]:
+    """symbol (upper case) -> PriceRecord from the latest poll pass (empty if none)"""
+    global _decoded_snapshot
+    data = cache.get(PRICE_SNAPSHOT_KEY)
+    if not isinstance(data, bytes):
+        return {}
+    if _decoded_snapshot[0] is not data:
+        _decoded_snapshot = (data, {record.symbol.upper(): record for record in unpack_records(data)})
+    return _decoded_snapshot[1]
+
+
+# 👤 TRADER ACCOUNT CACHE
+def set_account(account_id: str, data: dict, expire: int = 30):
+    cache.set(f"account:{account_id}", data, expire=expire)
+
+def get_account(account_id: str):
+    return cache.get(f"account:{account_id}")
 
 
 # 🧹 UTILS
 def clear_all_cache():
-    cache.clear()
\ No newline at end of file
+    cache.clear()
@@ -0,0 +1,127 @@
+"""
+Calendar Diff Engine for WidgetForge
+
+Event-level diffs between two Forex Factory calendars. Events are keyed by
+title + country + date. A removed and an added event with the same title and
+country are paired up as a reschedule. Diffs carry the full new event, so
+applying one is idempotent.
+
+The poller (``CalendarStore.save``) appends one entry per calendar change to
+``calendar_changes.jsonl``:
+
+    {"seq": 12, "at": "...", "from": "<sha256>", "to": "<sha256>", "diff": {...}}
+
+``ForexFactoryService`` reads the entries it has not seen and applies them to
+its in-memory index instead of re-reading the whole calendar.
+"""
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+CHANGES_FILE = "calendar_changes.jsonl"
+
+# Fields whose change is reported as an update of an existing event
+TRACKED_FIELDS = ("forecast", "previous", "actual", "impact")
+
+def event_key(event: Dict) -> str:
+    return f"{event.get('title', '')}|{event.get('country', '')}|{event.get('date', '')}"
+
+def empty_diff() -> Dict:
+    return {"added": [], "removed": [], "rescheduled": [], "changed": []}
+
+def is_empty(diff: Dict) -> bool:
+    return not any(diff.get(kind) for kind in ("added", "removed", "rescheduled", "changed"))
+
+def diff_calendars(old: Iterable[Dict], new: Iterable[Dict]) -> Dict:
+    """
+    Keyed diff from ``old`` to ``new``
+
+    * added / removed: full events
+    * rescheduled: ``{"key", "new_key", "from", "to", "event"}``
+    * changed: ``{"key", "fields": {name: [old, new]}, "event"}``
+    """
+    old_by_key = {event_key(event): event for event in old}
+    new_by_key = {event_key(event): event for event in new}
+    diff = empty_diff()
+
+    removed = [old_by_key[key] for key in old_by_key if key not in new_by_key]
+    added = [new_by_key[key] for key in new_by_key if key not in old_by_key]
+
+    # Pair removals and additions of the same title/country (in date order) as reschedules
+    unmatched_added = defaultdict(list)
+    for event in sorted(added, key=lambda e: e.get("date", "")):
+        unmatched_added[(event.get("title", ""), event.get("country", ""))].append(event)
+    for event in sorted(removed, key=lambda e: e.get("date", "")):
+        candidates = unmatched_added.get((event.get("title", ""), event.get("country", "")))
+        if candidates:
+            moved = candidates.pop(0)
+            diff["rescheduled"].append({
+                "key": event_key(event),
+                "new_key": event_key(moved),
+                "from": event.get("date", ""),
+                "to": moved.get("date", ""),
+                "event": moved,
+            })
+        else:
+            diff["removed"].append(event)
+    diff["added"] = [event for events in unmatched_added.values() for event in events]
+
+    for key, new_event in new_by_key.items():
+        old_event = old_by_key.get(key)
+        if old_event is None or old_event == new_event:
+            continue
+        fields = {
+            name: [old_event.get(name, ""), new_event.get(name, "")]
+            for name in TRACKED_FIELDS
+            if old_event.get(name, "") != new_event.get(name, "")
+        }
+        # Untracked fields (e.g. a URL) still count as a change of the event
+        diff["changed"].append({"key": key, "fields": fields, "event": new_event})
+    return diff
+
+def apply_diff(index: Dict[str, Dict], diff: Dict) -> Dict[str, Dict]:
+    """Apply a diff in place to a ``{event_key: event}`` index"""
+    for event in diff.get("removed", []):
+        index.pop(event_key(event), None)
+    for move in diff.get("rescheduled", []):
+        index.pop(move["key"], None)
+        index[move["new_key"]] = move["event"]
+    for event in diff.get("added", []):
+        index[event_key(event)] = event
+    for change in diff.get("changed", []):
+        index[change["key"]] = change["event"]
+    return index
+
+def summarize(diff: Dict) -> Dict[str, int]:
+    return {kind: len(diff.get(kind, [])) for kind in ("added", "removed", "rescheduled", "changed")}
+
+def read_changes(path: str, after_seq: int = 0) -> List[Dict]:
+    """Change log entries with ``seq`` greater than ``after_seq``, oldest first"""
+    entries = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A partially appended last line; it is complete on the next read
+                    continue
+                if entry.get("seq", 0) > after_seq:
+                    entries.append(entry)
+    except FileNotFoundError:
+        pass
+    return entries
+
+def latest_seq(path: str) -> int:
+    entries = read_changes(path)
+    return entries[-1]["seq"] if entries else 0
+
+def changes_path(data_dir: str) -> str:
+    return os.path.join(data_dir, CHANGES_FILE)
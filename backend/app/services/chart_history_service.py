@@ -0,0 +1,123 @@
+"""
+Chart History Service for WidgetForge
+
+Read access to ``chart_history.db`` (written by the chart collector) for the
+chart endpoints. A small pool of read-only connections is kept open instead of
+connecting per request, so a request skips the open and schema parse, and
+concurrent requests from the threadpool each query on their own connection.
+The pool is refilled when the database file is replaced (e.g. by
+``reset-chart-db.py``).
+
+Settings: ``CHART_DB_POOL_SIZE`` (default 4), idle connections kept open.
+"""
+import logging
+import os
+import pathlib
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+from .cache_service import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+def _connect(path: str) -> sqlite3.Connection:
+    # Read-only: the chart collector is the only writer. Pooled connections move
+    # between threadpool threads, one request at a time.
+    uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+class ChartHistoryDB:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._idle: List[sqlite3.Connection] = []
+        self._file_key: Optional[Tuple] = None
+
+    @property
+    def pool_size(self) -> int:
+        return int(os.environ.get("CHART_DB_POOL_SIZE", "4"))
+
+    @staticmethod
+    def candidate_paths() -> List[str]:
+        """Where the chart database is looked for: the cache dir, then ./.cache"""
+        return [os.path.join(CACHE_DIR, "chart_history.db"), os.path.join(os.getcwd(), ".cache", "chart_history.db")]
+
+    def find_path(self) -> Optional[str]:
+        """Location of the chart database, or None if missing"""
+        for path in self.candidate_paths():
+            if os.path.exists(path):
+                return path
+        return None
+
+    @staticmethod
+    def _file_key_of(path: str) -> Tuple:
+        stat = os.stat(path)
+        return (path, stat.st_ino, stat.st_dev)
+
+    def _close_idle(self):
+        # Caller holds the lock
+        for conn in self._idle:
+            conn.close()
+        self._idle = []
+
+    @contextmanager
+    def _connection(self, path: str) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection to ``path`` (a new one if none is idle)"""
+        file_key = self._file_key_of(path)
+        conn = None
+        with self._lock:
+            if self._file_key != file_key:
+                # The file was replaced: connections to the old one are stale
+                self._close_idle()
+                self._file_key = file_key
+            elif self._idle:
+                conn = self._idle.pop()
+        if conn is None:
+            conn = _connect(path)
+        try:
+            yield conn
+        finally:
+            with self._lock:
+                keep = self._file_key == file_key and len(self._idle) < self.pool_size
+                if keep:
+                    self._idle.append(conn)
+            if not keep:
+                conn.close()
+
+    def open(self) -> bool:
+        """Fill the pool and load the schema ahead of the first requests"""
+        path = self.find_path()
+        if path is None:
+            return False
+        file_key = self._file_key_of(path)
+        connections = [_connect(path) for _ in range(self.pool_size)]
+        for conn in connections:
+            conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        with self._lock:
+            if self._file_key != file_key:
+                self._close_idle()
+                self._file_key = file_key
+            room = max(self.pool_size - len(self._idle), 0)
+            self._idle.extend(connections[:room])
+        for conn in connections[room:]:
+            conn.close()
+        return True
+
+    def query_history(self, path: str, symbol: str, cutoff: int) -> List[Tuple]:
+        """(timestamp, price) rows for a symbol newer than ``cutoff``, oldest first"""
+        with self._connection(path) as conn:
+            return conn.execute('''
+                SELECT timestamp, price
+                FROM price_history
+                WHERE symbol = ? AND timestamp > ?
+                ORDER BY timestamp
+            ''', (symbol, cutoff)).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._close_idle()
+            self._file_key = None
+
+# Global instance
+chart_history_db = ChartHistoryDB()
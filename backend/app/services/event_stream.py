@@ -0,0 +1,132 @@
+"""
+Event Stream Service for WidgetForge
+
+Server-Sent Events fan-out for widgets that used to poll. Each stream topic
+(e.g. rotation data for one news/events count) has a single refresh loop that
+runs while at least one client is connected: it rebuilds the payload every
+``interval`` seconds in a worker thread and, only when the content changed,
+formats one SSE message and hands the same bytes to every subscriber. N open
+widgets therefore cost one computation per refresh instead of N per poll.
+
+Subscribers only ever need the newest snapshot, so each one holds at most one
+pending message; a slow client skips intermediate updates instead of growing
+a queue.
+"""
+import asyncio
+import hashlib
+import logging
+from typing import AsyncIterator, Callable, Dict, Optional, Set
+
+from .json_service import dumps
+from .metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_INTERVAL = 15.0
+HEARTBEAT_MESSAGE = b": keep-alive\n\n"
+
+STREAM_CLIENTS = metrics.gauge("widgetforge_sse_clients", "Connected Server-Sent Events clients", ["topic"])
+STREAM_REFRESHES = metrics.counter(
+    "widgetforge_sse_refreshes_total", "Stream payload rebuilds by outcome", ["topic", "result"]
+)
+
+def format_sse(event: str, payload, event_id: Optional[int] = None) -> bytes:
+    """Encode one SSE message (payload serialised as a single JSON data line)"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    return ("\n".join(lines) + "\ndata: ").encode("utf-8") + dumps(payload) + b"\n\n"
+
+def default_fingerprint(payload) -> str:
+    return hashlib.sha1(dumps(payload, sort_keys=True)).hexdigest()
+
+class _Topic:
+    def __init__(self, name: str, event: str, producer: Callable[[], Dict], interval: float,
+                 fingerprint: Callable[[Dict], str]):
+        self.name = name
+        self.event = event
+        self.producer = producer
+        self.interval = interval
+        self.fingerprint = fingerprint
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.latest: Optional[bytes] = None
+        self.digest: Optional[str] = None
+        self.seq = 0
+        self.task: Optional[asyncio.Task] = None
+
+    def offer(self, queue: asyncio.Queue, message: bytes):
+        # Keep only the newest message for a subscriber that has not caught up
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(message)
+
+    async def run(self):
+        while self.subscribers:
+            try:
+                payload = await asyncio.to_thread(self.producer)
+                digest = self.fingerprint(payload)
+                if digest != self.digest:
+                    self.digest = digest
+                    self.seq += 1
+                    self.latest = format_sse(self.event, payload, self.seq)
+                    for queue in list(self.subscribers):
+                        self.offer(queue, self.latest)
+                    STREAM_REFRESHES.labels(self.name, "changed").inc()
+                else:
+                    STREAM_REFRESHES.labels(self.name, "unchanged").inc()
+            except Exception as e:
+                STREAM_REFRESHES.labels(self.name, "error").inc()
+                logger.error(f"Error refreshing stream {self.name}: {e}")
+            await asyncio.sleep(self.interval)
+
+class EventStreamHub:
+    def __init__(self):
+        self._topics: Dict[str, _Topic] = {}
+
+    async def stream(self, name: str, event: str, producer: Callable[[], Dict], interval: float,
+                     fingerprint: Callable[[Dict], str] = default_fingerprint,
+                     heartbeat: float = HEARTBEAT_INTERVAL) -> AsyncIterator[bytes]:
+        """
+        Yield SSE messages for ``name`` until the client disconnects
+
+        The latest snapshot is sent immediately when one exists; heartbeat
+        comments keep proxies from closing an idle connection.
+        """
+        topic = self._topics.get(name)
+        if topic is None:
+            topic = self._topics[name] = _Topic(name, event, producer, interval, fingerprint)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        topic.subscribers.add(queue)
+        STREAM_CLIENTS.labels(name).inc()
+        if topic.latest is not None:
+            queue.put_nowait(topic.latest)
+        if topic.task is None or topic.task.done():
+            topic.task = asyncio.create_task(topic.run(), name=f"sse:{name}")
+
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    message = HEARTBEAT_MESSAGE
+                yield message
+        finally:
+            topic.subscribers.discard(queue)
+            STREAM_CLIENTS.labels(name).dec()
+            if not topic.subscribers and topic.task is not None:
+                topic.task.cancel()
+                topic.task = None
+
+    def get_status(self) -> Dict:
+        return {
+            name: {"subscribers": len(topic.subscribers), "seq": topic.seq, "running": topic.task is not None}
+            for name, topic in self._topics.items()
+        }
+
+# Global instance
+event_stream_hub = EventStreamHub()
@@ -1,17 +1,34 @@
 import json
 import logging
-from typing import List, Dict, Optional
+import threading
+from typing import Callable, List, Dict, Optional
 from datetime import datetime, timezone, timedelta
 import os
 from .cache_service import cache
+from .calendar_diff import apply_diff, changes_path, diff_calendars, event_key, is_empty, latest_seq, read_changes
+from .metrics_service import metrics, record_cache_lookup
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+CALENDAR_INDEX_UPDATES = metrics.counter(
+    "widgetforge_calendar_index_updates_total", "Calendar index refreshes by mode", ["mode"]
+)
+
+events_flight = SingleFlight("forex_factory")
+
 class ForexFactoryService:
     def __init__(self):
         self.cache_ttl = 3600  # 1 hour cache for calendar data
         self.data_dir = os.path.join(os.path.dirname(__file__), "..", "..", "data")
         os.makedirs(self.data_dir, exist_ok=True)
+
+        # In-memory calendar (event key -> event), advanced by the poller's change log
+        self._index: Optional[Dict[str, Dict]] = None
+        self._index_version = None
+        self._index_seq = 0
+        self._index_lock = threading.Lock()
+        self._subscribers: List[Callable[[Dict], None]] = []
     
     def load_latest_calendar_data(self) -> Optional[List[Dict]]:
         """Load the most recent Forex Factory calendar JSON file"""
@@ -25,7 +42,8 @@ class ForexFactoryService:
                 return data
             
             # Fallback: Look for the most recent JSON file in data directory
-            json_files = [f for f in os.listdir(self.data_dir) if f.startswith('ff_calendar') and f.endswith('.json')]
+            json_files = [f for f in os.listdir(self.data_dir)
+                          if f.startswith('ff_calendar') and f.endswith('.json') and f != 'ff_calendar_metadata.json']
             
             if not json_files:
                 logger.warning("No Forex Factory calendar files found in data directory")
@@ -47,6 +65,99 @@ class ForexFactoryService:
             logger.error(f"Failed to load calendar data: {e}")
             return None
     
+    def calendar_version(self) -> str:
+        """Version stamp of the calendar file in use; changes whenever the poller rewrites it"""
+        current_file = os.path.join(self.data_dir, 'ff_calendar_current.json')
+        try:
+            stat = os.stat(current_file)
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+        except OSError:
+            pass
+
+        # Fallback files are only used while the current file is missing
+        try:
+            json_files = [f for f in os.listdir(self.data_dir)
+                          if f.startswith('ff_calendar') and f.endswith('.json') and f != 'ff_calendar_metadata.json']
+        except OSError:
+            return "none"
+        if not json_files:
+            return "none"
+        latest_file = max(json_files, key=lambda x: os.path.getctime(os.path.join(self.data_dir, x)))
+        stat = os.stat(os.path.join(self.data_dir, latest_file))
+        return f"{latest_file}-{stat.st_mtime_ns}-{stat.st_size}"
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> Callable[[], None]:
+        """
+        Call ``callback(diff)`` whenever the calendar index changes (see calendar_diff);
+        returns a function that unsubscribes
+
+        Extension point: nothing in the app subscribes yet (the rotation snapshot
+        already keys on ``calendar_version``). Callbacks run in the thread that
+        refreshed the index, which happens lazily on the next calendar read.
+        """
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+    def _notify(self, diff: Dict):
+        for callback in list(self._subscribers):
+            try:
+                callback(diff)
+            except Exception as e:
+                logger.error(f"Calendar subscriber failed: {e}")
+
+    def refresh_index(self) -> Dict[str, Dict]:
+        """
+        Bring the in-memory calendar up to date with the file on disk
+
+        New change log entries are applied as diffs (cost proportional to the
+        changes); a full reload only happens on first use, when entries are
+        missing, or when the file was written by something other than the poller.
+
+        Readers use the index without the lock, so a refresh never modifies it:
+        diffs are applied to a copy that replaces it in one assignment.
+        """
+        version = (self.data_dir, self.calendar_version())
+        if self._index is not None and version == self._index_version:
+            return self._index
+
+        diffs = []
+        with self._index_lock:
+            if self._index is not None and version == self._index_version:
+                return self._index
+
+            log_path = changes_path(self.data_dir)
+            entries = read_changes(log_path, self._index_seq) if self._index is not None else []
+            if entries and entries[0]["seq"] == self._index_seq + 1 and version[0] == self._index_version[0]:
+                index = dict(self._index)
+                for entry in entries:
+                    apply_diff(index, entry["diff"])
+                    diffs.append(entry["diff"])
+                self._index = index
+                self._index_seq = entries[-1]["seq"]
+                CALENDAR_INDEX_UPDATES.labels("incremental").inc()
+            else:
+                events = self.load_latest_calendar_data() or []
+                if self._index is not None:
+                    diff = diff_calendars(self._index.values(), events)
+                    if not is_empty(diff):
+                        diffs.append(diff)
+                self._index = {event_key(event): event for event in events}
+                self._index_seq = latest_seq(log_path)
+                CALENDAR_INDEX_UPDATES.labels("full").inc()
+            self._index_version = version
+
+        for diff in diffs:
+            self._notify(diff)
+        return self._index
+
+    def get_calendar_events(self) -> List[Dict]:
+        """Current calendar events (from the in-memory index)"""
+        return list(self.refresh_index().values())
+
+    def get_changes(self, since_seq: int = 0) -> List[Dict]:
+        """Change log entries newer than ``since_seq``"""
+        return read_changes(changes_path(self.data_dir), since_seq)
+
     def parse_event_date(self, date_str: str) -> Optional[datetime]:
         """Parse ISO date string to datetime object"""
         try:
@@ -100,16 +211,20 @@ class ForexFactoryService:
     
     def get_upcoming_events(self, max_events: int = 20, impact_filter: Optional[str] = None) -> List[Dict]:
         """Get upcoming economic calendar events"""
-        cache_key = f"ff_upcoming_events_{max_events}_{impact_filter}"
+        cache_key = f"ff_upcoming_events_{max_events}_{impact_filter}_{self.calendar_version()}"
+        
+        # Try cache first
+        cached_data = record_cache_lookup("forex_factory", "upcoming_events", cache.get(cache_key))
+        if cached_data:
+            return cached_data
         
+        # Concurrent misses (cache expiry, new calendar version) share one computation
+        return events_flight.do(cache_key, lambda: cache.get(cache_key) or self._build_upcoming_events(max_events, impact_filter, cache_key))
+    
+    def _build_upcoming_events(self, max_events: int, impact_filter: Optional[str], cache_key: str) -> List[Dict]:
         try:
-            # Try cache first
-            cached_data = cache.get(cache_key)
-            if cached_data:
-                return cached_data
-            
             # Load calendar data
-            calendar_data = self.load_latest_calendar_data()
+            calendar_data = self.get_calendar_events()
             if not calendar_data:
                 return []
             
@@ -165,47 +280,64 @@ class ForexFactoryService:
         """Get upcoming high-impact events specifically"""
         return self.get_upcoming_events(max_events=max_events, impact_filter="High")
     
+    def match_actual(self, event: Dict, news_items: List[Dict]) -> Optional[Dict]:
+        """Actual-result fields for an event from the first matching news item, or None"""
+        event_title = event.get('title', '').lower()
+        event_country = event.get('country', '').lower()
+        for news_item in news_items:
+            news_title = news_item.get('title', '').lower()
+
+            # Check if this news item matches this economic event (more specific matching)
+            if self._is_specific_news_event_match(news_title, event_title, event_country):
+                # Try to get extracted actual value first (from archive)
+                actual_result = news_item.get('extracted_actual')
+
+                # If not found in archive, try to extract from title
+                if not actual_result:
+                    actual_result = self._extract_actual_from_news_title(news_item.get('title', ''))
+
+                if actual_result:
+                    fields = {
+                        'actual': actual_result,
+                        'actual_source': 'Archived RSS' if 'archived_at' in news_item else 'RSS',
+                        'matched_news': news_item.get('title', ''),  # For debugging
+                    }
+                    if 'archived_at' in news_item:
+                        fields['archived_at'] = news_item['archived_at']
+                    return fields
+        return None
+
+    def extract_actuals(self, events: List[Dict], news_items: List[Dict]) -> Dict[str, Dict]:
+        """Actual-result fields keyed by event (see calendar_diff.event_key) for events still without one"""
+        actuals = {}
+        for event in events:
+            if (event.get('actual') or '').strip():
+                continue
+            fields = self.match_actual(event, news_items)
+            if fields:
+                actuals[event_key(event)] = fields
+                logger.info(f"Matched {event.get('title', '')} actual: {fields['actual']} from {fields['actual_source']}")
+        return actuals
+
     def enhance_events_with_rss_results(self, events: List[Dict], rss_news: List[Dict]) -> List[Dict]:
-        """Enhance Forex Factory events with actual results from RSS news and archived data"""
-        enhanced_events = []
+        """
+        Enhance Forex Factory events with actual results from RSS news and archived data
 
+        The Forex Factory poller now stores matched actuals in the calendar
+        (``update_actual_results``); this on-demand variant is kept for tools.
+        """
         # Import RSS service to get archived data
         from .rss_service import rss_service
         
-        # Get archived economic data from the last 7 days
-        archived_data = rss_service.get_archived_economic_data(days_back=7)
-        logger.info(f"Retrieved {len(archived_data)} archived economic data items")
-        
-        # Combine current RSS news with archived data
-        all_news_sources = list(rss_news) + archived_data
+        # Combine current RSS news with archived data from the last 7 days
+        all_news_sources = list(rss_news) + rss_service.get_archived_economic_data(days_back=7)
 
+        enhanced_events = []
         for event in events:
             enhanced_event = event.copy()
             # Only look for RSS results if we don't already have an actual value
             if not enhanced_event.get('actual', '').strip():
-                # Look for matching news in all news sources (current + archived)
-                for news_item in all_news_sources:
-                    news_title = news_item.get('title', '').lower()
-                    event_title = event.get('title', '').lower()
-                    event_country = event.get('country', '').lower()
-                    
-                    # Check if this news item matches this economic event (more specific matching)
-                    if self._is_specific_news_event_match(news_title, event_title, event_country):
-                        # Try to get extracted actual value first (from archive)
-                        actual_result = news_item.get('extracted_actual')
-                        
-                        # If not found in archive, try to extract from title
-                        if not actual_result:
-                            actual_result = self._extract_actual_from_news_title(news_item.get('title', ''))
-                        
-                        if actual_result:
-                            enhanced_event['actual'] = actual_result
-                            enhanced_event['actual_source'] = 'Archived RSS' if 'archived_at' in news_item else 'RSS'
-                            enhanced_event['matched_news'] = news_item.get('title', '')  # For debugging
-                            if 'archived_at' in news_item:
-                                enhanced_event['archived_at'] = news_item['archived_at']
-                            logger.info(f"Enhanced {event_title} with actual: {actual_result} from {enhanced_event['actual_source']}")
-                            break
+                enhanced_event.update(self.match_actual(event, all_news_sources) or {})
             else:
                 # Mark that we already had the actual value from the original data
                 enhanced_event['actual_source'] = 'Calendar'
@@ -462,16 +594,16 @@ class ForexFactoryService:
 
     def get_recent_past_events(self, max_events: int = 10, impact_filter: Optional[str] = None) -> List[Dict]:
         """Get recent past events that have already occurred with actual results"""
-        cache_key = f"ff_recent_past_events_{max_events}_{impact_filter}"
+        cache_key = f"ff_recent_past_events_{max_events}_{impact_filter}_{self.calendar_version()}"
         
         try:
             # Try cache first
-            cached_data = cache.get(cache_key)
+            cached_data = record_cache_lookup("forex_factory", "recent_past_events", cache.get(cache_key))
             if cached_data:
                 return cached_data
             
             # Load calendar data
-            calendar_data = self.load_latest_calendar_data()
+            calendar_data = self.get_calendar_events()
             if not calendar_data:
                 return []
             
@@ -504,6 +636,8 @@ class ForexFactoryService:
                         'forecast': event.get('forecast', ''),
                         'previous': event.get('previous', ''),
                         'actual': event.get('actual', ''),  # Show actual results if available
+                        # Matched from RSS by the Forex Factory poller, or shipped with the calendar
+                        **({'actual_source': event.get('actual_source', 'Calendar')} if event.get('actual') else {}),
                         'time_until': self.calculate_time_until(event_date),
                         'timestamp': int(event_utc.timestamp()),
                         'status': 'completed'  # Mark as completed event
@@ -528,16 +662,16 @@ class ForexFactoryService:
     
     def get_todays_events(self, impact_filter: Optional[str] = None) -> List[Dict]:
         """Get today's economic events"""
-        cache_key = f"ff_todays_events_{impact_filter}"
+        cache_key = f"ff_todays_events_{impact_filter}_{self.calendar_version()}"
         
         try:
             # Try cache first
-            cached_data = cache.get(cache_key)
+            cached_data = record_cache_lookup("forex_factory", "todays_events", cache.get(cache_key))
             if cached_data:
                 return cached_data
             
             # Load calendar data
-            calendar_data = self.load_latest_calendar_data()
+            calendar_data = self.get_calendar_events()
             if not calendar_data:
                 return []
             
@@ -588,16 +722,16 @@ class ForexFactoryService:
     
     def get_recent_high_impact_event(self) -> Optional[Dict]:
         """Get the most recent high-impact event from today (for pinned display)"""
-        cache_key = "ff_recent_high_impact"
+        cache_key = f"ff_recent_high_impact_{self.calendar_version()}"
         
         try:
             # Try cache first
-            cached_data = cache.get(cache_key)
+            cached_data = record_cache_lookup("forex_factory", "recent_high_impact", cache.get(cache_key))
             if cached_data:
                 return cached_data
             
             # Load calendar data
-            calendar_data = self.load_latest_calendar_data()
+            calendar_data = self.get_calendar_events()
             if not calendar_data:
                 return None
             
@@ -650,7 +784,7 @@ class ForexFactoryService:
     def get_calendar_summary(self) -> Dict:
         """Get summary statistics of the calendar data"""
         try:
-            calendar_data = self.load_latest_calendar_data()
+            calendar_data = self.get_calendar_events()
             if not calendar_data:
                 return {"error": "No calendar data available"}
             
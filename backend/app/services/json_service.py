@@ -0,0 +1,65 @@
+"""
+JSON Service for WidgetForge
+
+One serialisation path for HTTP responses, WebSocket frames and SSE messages.
+Uses orjson when installed (several times faster than stdlib ``json`` and
+encodes datetimes natively) and falls back to stdlib ``json`` with the same
+output for the types WidgetForge emits.
+
+Endpoints on hot paths return ``FastJSONResponse`` directly: FastAPI skips its
+``jsonable_encoder`` walk for returned Response objects, so the payload is
+encoded in a single pass. Services should hand out JSON-ready values
+(ISO strings / epoch numbers rather than ``datetime``) so both paths agree.
+"""
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _default(value: Any):
+    # Mirrors orjson / FastAPI: datetimes as ISO 8601, anything else unknown as str
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    # Model objects with a JSON form (e.g. PriceRecord)
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumps(data: Any, sort_keys: bool = False) -> bytes:
+        """Serialise to compact UTF-8 JSON bytes"""
+        option = _ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else _ORJSON_OPTIONS
+        return orjson.dumps(data, default=_default, option=option)
+
+    loads = orjson.loads
+else:
+    def dumps(data: Any, sort_keys: bool = False) -> bytes:
+        """Serialise to compact UTF-8 JSON bytes"""
+        return json.dumps(
+            data, default=_default, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys
+        ).encode("utf-8")
+
+    loads = json.loads
+
+def dumps_str(data: Any) -> str:
+    return dumps(data).decode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with ``dumps`` (orjson when available)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+async def send_json(websocket, data: Any):
+    """Send ``data`` as a JSON text frame (drop-in for ``websocket.send_json``)"""
+    await websocket.send_text(dumps_str(data))
@@ -0,0 +1,311 @@
+"""
+Metrics Service for WidgetForge
+
+A small in-process metrics registry (counters, gauges, histograms) rendered in
+the Prometheus text exposition format at ``/metrics``. Recording a sample is a
+dict lookup plus a locked add, cheap enough for the price stream and poll loops.
+
+The pollers run in their own processes, so they publish their rendered metric
+families to the shared diskcache (``publish``); the API process merges those
+snapshots into its own output (``render_all``).
+"""
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Sequence, Tuple
+
+from .cache_service import cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Default lifetime of a published snapshot, so a stopped poller's metrics disappear
+SNAPSHOT_TTL = 60
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_string(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Get the child series for a label set (created on first use)"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def has_samples(self) -> bool:
+        return bool(self._children)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(child.samples(self.name, self.labelnames, key))
+        return "\n".join(lines) + "\n"
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labelnames, labelvalues):
+        yield f"{name}{_label_string(labelnames, labelvalues)} {_format_value(self.value)}"
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of a block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self, name, labelnames, labelvalues):
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            yield f"{name}_bucket{_label_string(labelnames, labelvalues, le)} {cumulative}"
+        labels = _label_string(labelnames, labelvalues)
+        yield f"{name}_sum{labels} {_format_value(self.sum)}"
+        yield f"{name}_count{labels} {self.count}"
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._last_publish: Dict[str, float] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render_families(self) -> Dict[str, str]:
+        """Rendered text per metric family (only families with samples)"""
+        return {
+            name: metric.render()
+            for name, metric in sorted(self._metrics.items())
+            if metric.has_samples()
+        }
+
+    def publish(self, component: str, interval: float = 5.0, force: bool = False, ttl: int = SNAPSHOT_TTL):
+        """Share this process's metrics with the API process via the cache (throttled)"""
+        now = time.monotonic()
+        if not force and now - self._last_publish.get(component, 0.0) < interval:
+            return
+        self._last_publish[component] = now
+
+        try:
+            cache.set(f"metrics:{component}", self.render_families(), expire=ttl)
+            components = cache.get("metrics:components") or set()
+            if component not in components:
+                cache.set("metrics:components", components | {component})
+        except Exception as e:
+            logger.warning(f"Failed to publish metrics for {component}: {e}")
+
+    def render_all(self) -> str:
+        """Local metrics plus families published by other processes"""
+        update_process_metrics()
+        update_cache_metrics()
+        families = self.render_families()
+
+        for component in sorted(cache.get("metrics:components") or ()):
+            snapshot = cache.get(f"metrics:{component}") or {}
+            for name, text in snapshot.items():
+                # A family recorded in this process wins (e.g. pollers run in-process)
+                families.setdefault(name, text)
+
+        return "".join(families[name] for name in sorted(families))
+
+# Global registry
+metrics = MetricsRegistry()
+
+# HTTP / WebSocket
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "widgetforge_http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"]
+)
+# Server-Sent Event streams stay open for minutes to hours; kept apart so they do not skew request latency
+HTTP_STREAM_DURATION = metrics.histogram(
+    "widgetforge_http_stream_duration_seconds", "Lifetime of streaming (text/event-stream) responses by route",
+    ["method", "route"], buckets=(1.0, 10.0, 60.0, 300.0, 900.0, 3600.0, 14400.0, 86400.0)
+)
+WS_CLIENTS = metrics.gauge("widgetforge_ws_clients", "Connected WebSocket clients", ["stream"])
+WS_SEND_DURATION = metrics.histogram(
+    "widgetforge_ws_send_duration_seconds", "Time to build and send one WebSocket frame", ["stream"],
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+)
+WS_MESSAGES = metrics.counter("widgetforge_ws_messages_total", "WebSocket frames sent", ["stream"])
+
+# Service caches
+CACHE_LOOKUPS = metrics.counter(
+    "widgetforge_cache_lookups_total", "Service cache lookups by result", ["service", "cache", "result"]
+)
+# Mirrored from cache.stats() when rendering (cumulative per process)
+CACHE_TIER_EVENTS = metrics.gauge(
+    "widgetforge_cache_tier_events", "Two-tier cache L1/L2 hits, misses, evictions and invalidations", ["namespace", "event"]
+)
+CACHE_L1_BYTES = metrics.gauge("widgetforge_cache_l1_bytes", "Approximate size of the in-process cache", ["namespace"])
+CACHE_L1_ENTRIES = metrics.gauge("widgetforge_cache_l1_entries", "Entries in the in-process cache", ["namespace"])
+
+# Pollers
+MT5_POLL_CYCLE = metrics.histogram(
+    "widgetforge_mt5_poll_cycle_seconds", "Duration of one market poller pass over all symbols"
+)
+MT5_POLL_ERRORS = metrics.counter("widgetforge_mt5_poll_errors_total", "Symbols that failed to poll")
+MT5_POLL_SYMBOLS = metrics.gauge("widgetforge_mt5_poll_symbols", "Symbols polled per pass")
+TICK_JOURNAL_TICKS = metrics.counter("widgetforge_tick_journal_ticks_total", "Ticks appended to the tick journal")
+CHART_WRITE_DURATION = metrics.histogram(
+    "widgetforge_chart_collector_write_seconds", "Chart history database write latency", ["operation"]
+)
+
+# Process
+PROCESS_RSS = metrics.gauge("widgetforge_process_resident_memory_bytes", "Resident memory of the API process")
+PROCESS_UPTIME = metrics.gauge("widgetforge_process_uptime_seconds", "Seconds since the API process started")
+
+_STARTED_AT = time.time()
+
+try:
+    import psutil
+    _process = psutil.Process(os.getpid())
+except ImportError:
+    _process = None
+
+def update_process_metrics():
+    PROCESS_UPTIME.set(round(time.time() - _STARTED_AT, 3))
+    if _process is not None:
+        PROCESS_RSS.set(_process.memory_info().rss)
+
+def update_cache_metrics():
+    for namespace, stats in cache.stats().items():
+        for event in ("l1_hits", "l2_hits", "misses", "evictions", "expired", "invalidations"):
+            CACHE_TIER_EVENTS.labels(namespace, event).set(stats[event])
+        CACHE_L1_BYTES.labels(namespace).set(stats["bytes"])
+        CACHE_L1_ENTRIES.labels(namespace).set(stats["entries"])
+
+def record_cache_lookup(service: str, cache_name: str, data):
+    """Count a service cache lookup as a hit or miss and pass the data through"""
+    CACHE_LOOKUPS.labels(service, cache_name, "hit" if data else "miss").inc()
+    return data
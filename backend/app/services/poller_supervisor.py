@@ -0,0 +1,193 @@
+"""
+Poller Supervisor for WidgetForge
+
+Optional in-process mode (POLLER_MODE=supervised) that runs the market poller,
+chart collector and Forex Factory poller as asyncio tasks inside the FastAPI
+lifespan instead of as separate processes (account terminals still get one
+worker process each, managed from here). All MetaTrader5 calls go through a
+single dedicated executor thread (the MT5 package binds one terminal per process
+and is not thread-safe); each market poll pass is published straight to the
+in-memory PriceHub, so price stream clients are woken as soon as it lands.
+
+Crashed tasks are restarted with exponential backoff. The default
+POLLER_MODE=external keeps the multi-process layout of start-all-services.bat.
+"""
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Optional
+
+from .price_hub import price_hub
+
+logger = logging.getLogger(__name__)
+
+MAX_RESTART_BACKOFF = 60.0
+
+class PollerSupervisor:
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._status: Dict[str, Dict] = {}
+        self._mt5_executor: Optional[ThreadPoolExecutor] = None
+        self._stopping = False
+
+    @property
+    def enabled(self) -> bool:
+        # Read lazily so values from .env (loaded after imports) are honoured
+        return os.getenv("POLLER_MODE", "external").lower() == "supervised"
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def run_mt5(self, fn: Callable, *args):
+        """Run a blocking MetaTrader5 call on the dedicated MT5 thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._mt5_executor, fn, *args)
+
+    async def start(self):
+        """Start all pollers as supervised tasks (no-op unless POLLER_MODE=supervised)"""
+        if not self.enabled or self.running:
+            return
+
+        logger.info("Starting pollers in supervised (in-process) mode")
+        self._stopping = False
+        self._mt5_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5")
+        price_hub.attach(asyncio.get_running_loop())
+
+        pollers = {
+            "market_poller": self._run_market_poller,
+            "chart_collector": self._run_chart_collector,
+            "forex_factory_poller": self._run_forex_factory_poller,
+            "terminal_pool": self._run_terminal_pool,
+        }
+        disabled = {name.strip() for name in os.getenv("SUPERVISED_POLLERS_DISABLED", "").split(",") if name.strip()}
+        for name, runner in pollers.items():
+            if name in disabled:
+                logger.info(f"Supervised poller disabled by config: {name}")
+                continue
+            self._status[name] = {"state": "starting", "restarts": 0, "last_error": None}
+            self._tasks[name] = asyncio.create_task(self._supervise(name, runner), name=name)
+
+    async def stop(self):
+        """Cancel all poller tasks and release the MT5 thread"""
+        if not self.running:
+            return
+
+        logger.info("Stopping supervised pollers")
+        self._stopping = True
+        for task in self._tasks.values():
+            task.cancel()
+        await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        self._tasks.clear()
+        price_hub.detach()
+
+        if self._mt5_executor is not None:
+            try:
+                from app.pollers.mt5_source import load_mt5
+                await self.run_mt5(load_mt5().shutdown)
+            except Exception as e:
+                logger.warning(f"MT5 shutdown failed: {e}")
+            self._mt5_executor.shutdown(wait=False)
+            self._mt5_executor = None
+
+    async def _supervise(self, name: str, runner: Callable[[], Awaitable]):
+        backoff = 1.0
+        while not self._stopping:
+            status = self._status[name]
+            started = time.monotonic()
+            try:
+                status["state"] = "running"
+                await runner()
+                return
+            except asyncio.CancelledError:
+                status["state"] = "stopped"
+                raise
+            except Exception as e:
+                status["state"] = "restarting"
+                status["restarts"] += 1
+                status["last_error"] = str(e)
+                # A task that ran for a while before failing starts over with a short backoff
+                if time.monotonic() - started > MAX_RESTART_BACKOFF:
+                    backoff = 1.0
+                logger.error(f"Supervised poller {name} failed: {e}; restarting in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MAX_RESTART_BACKOFF)
+
+    # Pollers
+    async def _run_market_poller(self):
+        from app.pollers import poller_market
+        from app.pollers.mt5_source import load_symbols
+        from .metrics_service import MT5_POLL_SYMBOLS
+
+        await self.run_mt5(poller_market.connect_mt5)
+        symbols = load_symbols(poller_market.get_symbols_file())
+        MT5_POLL_SYMBOLS.set(len(symbols))
+
+        while True:
+            results = await self.run_mt5(poller_market.poll_symbols, symbols, False)
+            price_hub.publish_many(results)
+            await asyncio.sleep(poller_market.POLL_INTERVAL)
+
+    async def _run_chart_collector(self):
+        from app.pollers.chart_collector import ChartDataCollector
+        from .metrics_service import CHART_WRITE_DURATION
+
+        collector = await self.run_mt5(ChartDataCollector)
+        await self.run_mt5(collector.connect_mt5)
+
+        with CHART_WRITE_DURATION.labels("initial_history").time():
+            await self.run_mt5(collector.collect_initial_history)
+
+        update_interval = 3 * 60
+        cleanup_counter = 0
+        while True:
+            await asyncio.sleep(update_interval)
+            with CHART_WRITE_DURATION.labels("update").time():
+                await self.run_mt5(collector.update_prices)
+
+            # Cleanup does not touch MT5, keep it off the MT5 thread
+            cleanup_counter += 1
+            if cleanup_counter >= 20:
+                with CHART_WRITE_DURATION.labels("cleanup").time():
+                    await asyncio.to_thread(collector.cleanup_old_data)
+                cleanup_counter = 0
+
+    async def _run_forex_factory_poller(self):
+        from app.pollers.forex_factory_poller import ForexFactoryPoller
+
+        poller = await asyncio.to_thread(ForexFactoryPoller)
+        while True:
+            if poller.should_update_weekly():
+                success = await asyncio.to_thread(poller.update_calendar_structure)
+            else:
+                success = await asyncio.to_thread(poller.update_actual_results)
+            await asyncio.sleep(poller.actual_update_interval if success else poller.retry_interval)
+
+    async def _run_terminal_pool(self):
+        # Account terminals need one process each (MT5 binds one terminal per process)
+        from app.pollers.terminal_pool import TerminalPool
+
+        pool = TerminalPool()
+        if not pool.terminal_ids:
+            return
+
+        await asyncio.to_thread(pool.start)
+        try:
+            while True:
+                await asyncio.sleep(5)
+                await asyncio.to_thread(pool.check)
+        finally:
+            await asyncio.to_thread(pool.stop)
+
+    def get_status(self) -> Dict:
+        """Mode and per-poller state for diagnostics"""
+        return {
+            "mode": "supervised" if self.enabled else "external",
+            "running": self.running,
+            "pollers": {name: dict(status) for name, status in self._status.items()},
+        }
+
+# Global instance
+poller_supervisor = PollerSupervisor()
@@ -0,0 +1,161 @@
+"""
+Preset Registry for WidgetForge
+
+Loads ticker presets (ticker_presets.json) and the symbol list (pollers/symbols.txt)
+once and serves them from memory. File mtimes are re-checked at most every
+``check_interval`` seconds and changed files are reloaded in place, so request
+handlers never read the filesystem themselves.
+
+Preset configs are written in the ticker's camelCase (``updateAnimation``)
+while some widget params use other query names (``update_animation``). On load
+each config key is mapped onto the widget schemas' query names, comparing
+names without case and underscores, so every preset value reaches its param.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Set
+
+from app.models.widget_models import WIDGET_SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+def _normalise(name: str) -> str:
+    return name.replace("_", "").replace("-", "").lower()
+
+def _query_names() -> Dict[str, Set[str]]:
+    """Normalised name -> query names of every widget schema param"""
+    names: Dict[str, Set[str]] = {}
+    for schema in WIDGET_SCHEMAS.values():
+        for param in schema.params:
+            names.setdefault(_normalise(param.query), set()).add(param.query)
+    return names
+
+def preset_query_params(name: str, config: Mapping) -> Dict[str, str]:
+    """A preset config keyed by widget query names, with string values like a query string"""
+    query_names = _query_names()
+    known = set().union(*query_names.values())
+    params = {key: value for key, value in config.items() if key in known}
+    for key, value in config.items():
+        if key in known:
+            continue
+        aliases = query_names.get(_normalise(key))
+        if not aliases:
+            logger.warning(f"Preset {name}: {key!r} is not a widget parameter")
+            params[key] = value
+            continue
+        for alias in aliases:
+            # A key spelled exactly like the query name wins
+            params.setdefault(alias, value)
+    return {key: _query_value(value) for key, value in params.items()}
+
+def _query_value(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value if isinstance(value, str) else str(value)
+
+class PresetRegistry:
+    def __init__(self, presets_file: str = None, symbols_file: str = None, check_interval: float = 2.0):
+        self.presets_file = presets_file or os.path.join(APP_DIR, "ticker_presets.json")
+        self.symbols_file = symbols_file or os.path.join(APP_DIR, "pollers", "symbols.txt")
+        self.check_interval = check_interval
+
+        self._presets: Dict[str, Dict] = {}
+        self._preset_params: Dict[str, Dict[str, str]] = {}
+        self._symbols: List[str] = []
+        self._versions: Dict[str, Optional[tuple]] = {}
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _file_version(self, path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _load_presets(self):
+        try:
+            with open(self.presets_file, 'r', encoding='utf-8') as f:
+                self._presets = json.load(f).get("presets", {})
+            self._preset_params = {
+                name: preset_query_params(name, preset.get("config", {})) for name, preset in self._presets.items()
+            }
+            logger.info(f"Loaded {len(self._presets)} ticker presets")
+        except FileNotFoundError:
+            logger.warning(f"Preset file not found: {self.presets_file}")
+            self._presets = {}
+            self._preset_params = {}
+        except Exception as e:
+            # Keep the previous presets if the file is mid-edit or invalid
+            logger.error(f"Error loading ticker presets: {e}")
+
+    def _load_symbols(self):
+        try:
+            with open(self.symbols_file, 'r') as f:
+                self._symbols = [line.strip() for line in f if line.strip()]
+            logger.info(f"Loaded {len(self._symbols)} symbols from symbols.txt")
+        except FileNotFoundError:
+            logger.warning(f"Symbols file not found: {self.symbols_file}")
+            self._symbols = []
+        except Exception as e:
+            logger.error(f"Error reading symbols.txt: {e}")
+
+    def reload_if_changed(self, force: bool = False):
+        """Reload any file whose mtime/size changed since the last load"""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return
+
+        with self._lock:
+            if not force and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+
+            for path, loader in ((self.presets_file, self._load_presets), (self.symbols_file, self._load_symbols)):
+                version = self._file_version(path)
+                if force or path not in self._versions or version != self._versions[path]:
+                    loader()
+                    self._versions[path] = version
+
+    # Read API (returned objects are shared; callers must not mutate them)
+    def get_symbols(self) -> List[str]:
+        """Get the configured symbol list"""
+        self.reload_if_changed()
+        return self._symbols
+
+    def get_presets(self) -> Dict[str, Dict]:
+        """Get all presets keyed by name"""
+        self.reload_if_changed()
+        return self._presets
+
+    def get_preset(self, name: str) -> Optional[Dict]:
+        """Get a single preset by name"""
+        return self.get_presets().get(name)
+
+    def apply_preset(self, query_params: Mapping[str, str]) -> Mapping[str, str]:
+        """
+        Overlay explicit query params on top of the preset named by ``?preset=``
+
+        Returns the original params unchanged when no (known) preset is referenced.
+        """
+        name = query_params.get("preset")
+        if not name:
+            return query_params
+
+        self.reload_if_changed()
+        preset_params = self._preset_params.get(name)
+        if preset_params is None:
+            logger.debug(f"Unknown ticker preset requested: {name}")
+            return query_params
+
+        merged = dict(preset_params)
+        merged.update(query_params)
+        return merged
+
+# Global registry instance
+preset_registry = PresetRegistry()
@@ -0,0 +1,222 @@
+"""
+Price Bus for WidgetForge
+
+Local pub/sub link between the external market poller and every uvicorn worker
+(POLLER_MODE=external with ``--workers N``). Without it each worker polls the
+shared diskcache once per second for each of its WebSocket clients. With the bus
+enabled the poller publishes each poll pass once over a local socket, and every
+worker feeds it into its in-memory PriceHub, so price streams wake as soon as a
+batch lands and read it from memory. No external broker is involved.
+
+Enable with ``PRICE_BUS``:
+
+* ``off`` (default): no bus, workers read the diskcache as before
+* ``on``: a Unix domain socket at ``<cache dir>/price_bus.sock``. On platforms
+  without ``AF_UNIX`` (Windows Python) it uses TCP on ``127.0.0.1:8799``.
+* ``unix:/path/to/socket`` or ``tcp:host:port``: an explicit address
+
+Messages are length-prefixed JSON (4-byte big-endian length, then
+``{"seq": n, "prices": {symbol: data}}``, price records in their ``to_dict()``
+form, rebuilt into ``PriceRecord`` objects by the subscriber). A newly connected worker first gets
+the full latest snapshot. If the poller goes away, workers detach the hub and
+fall back to the diskcache until they reconnect. The diskcache stays the source
+of truth either way.
+"""
+import asyncio
+import logging
+import os
+import socket
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.models.price_models import as_price_record
+
+from .cache_service import CACHE_DIR
+from .json_service import dumps, loads
+from .metrics_service import metrics
+from .price_hub import price_hub
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TCP_ADDRESS = "tcp:127.0.0.1:8799"
+SOCKET_NAME = "price_bus.sock"
+
+FRAME_HEADER = struct.Struct(">I")
+# A subscriber that cannot take a batch within this many seconds is dropped
+SEND_TIMEOUT = 0.5
+MAX_RECONNECT_BACKOFF = 5.0
+
+BUS_SUBSCRIBERS = metrics.gauge("widgetforge_price_bus_subscribers", "Workers connected to the price bus")
+BUS_MESSAGES = metrics.counter("widgetforge_price_bus_messages_total", "Price bus batches by side", ["side"])
+
+def bus_address() -> Optional[str]:
+    """Configured bus address, or None when the bus is disabled"""
+    # Read lazily so values from .env (loaded after imports) are honoured
+    value = os.getenv("PRICE_BUS", "off").strip()
+    if value.lower() in ("", "off", "0", "false", "no"):
+        return None
+    if value.lower() in ("on", "1", "true", "yes"):
+        if hasattr(socket, "AF_UNIX"):
+            return "unix:" + os.path.join(CACHE_DIR, SOCKET_NAME)
+        return DEFAULT_TCP_ADDRESS
+    return value
+
+def parse_address(address: str) -> Tuple[int, object]:
+    """``unix:/path`` or ``tcp:host:port`` -> (socket family, address)"""
+    scheme, _, rest = address.partition(":")
+    if scheme == "unix":
+        if not hasattr(socket, "AF_UNIX"):
+            raise ValueError("Unix domain sockets are not available on this platform, use tcp:host:port")
+        return socket.AF_UNIX, rest
+    if scheme == "tcp":
+        host, _, port = rest.rpartition(":")
+        return socket.AF_INET, (host or "127.0.0.1", int(port))
+    raise ValueError(f"Invalid PRICE_BUS address: {address}")
+
+def encode_frame(seq: int, prices: Dict[str, Dict]) -> bytes:
+    body = dumps({"seq": seq, "prices": prices})
+    return FRAME_HEADER.pack(len(body)) + body
+
+class PriceBusPublisher:
+    """Socket server run by the market poller; broadcasts each poll pass to all workers"""
+
+    def __init__(self, address: str):
+        self.address = address
+        self.seq = 0
+        self._server: Optional[socket.socket] = None
+        self._clients: List[socket.socket] = []
+        self._latest: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def start(self):
+        family, address = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(address):
+            # Left behind by a poller that did not shut down cleanly
+            os.unlink(address)
+        server = socket.socket(family, socket.SOCK_STREAM)
+        if family != getattr(socket, "AF_UNIX", None):
+            server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(address)
+        server.listen(64)
+        self._server = server
+        threading.Thread(target=self._accept_loop, name="price-bus-accept", daemon=True).start()
+        logger.info(f"Price bus listening on {self.address}")
+
+    def _accept_loop(self):
+        while self._server is not None:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return
+            conn.settimeout(SEND_TIMEOUT)
+            with self._lock:
+                # Hold the lock so the snapshot and the next publish arrive in order
+                try:
+                    if self._latest:
+                        conn.sendall(encode_frame(self.seq, self._latest))
+                except OSError:
+                    conn.close()
+                    continue
+                self._clients.append(conn)
+                BUS_SUBSCRIBERS.set(len(self._clients))
+
+    def publish(self, prices: Dict[str, Dict]):
+        """Send one batch to every connected worker (disconnected or stalled workers are dropped)"""
+        if not prices:
+            return
+        with self._lock:
+            self.seq += 1
+            self._latest.update(prices)
+            frame = encode_frame(self.seq, prices)
+            alive = []
+            for conn in self._clients:
+                try:
+                    conn.sendall(frame)
+                    alive.append(conn)
+                except OSError:
+                    conn.close()
+            self._clients = alive
+            BUS_SUBSCRIBERS.set(len(alive))
+        BUS_MESSAGES.labels("published").inc()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._clients)
+
+    def stop(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        with self._lock:
+            for conn in self._clients:
+                conn.close()
+            self._clients = []
+            BUS_SUBSCRIBERS.set(0)
+        family, address = parse_address(self.address)
+        if family == getattr(socket, "AF_UNIX", None) and os.path.exists(address):
+            os.unlink(address)
+
+class PriceBusSubscriber:
+    """Per-worker client that feeds published batches into the PriceHub"""
+
+    def __init__(self):
+        self.address: Optional[str] = None
+        self.connected = False
+        self.last_seq = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the subscriber task (no-op unless PRICE_BUS is set)"""
+        self.address = bus_address()
+        if self.address is None or self._task is not None:
+            return
+        parse_address(self.address)
+        self._task = asyncio.create_task(self._run(), name="price_bus")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _connect(self):
+        family, address = parse_address(self.address)
+        if family == getattr(socket, "AF_UNIX", None):
+            return await asyncio.open_unix_connection(address)
+        return await asyncio.open_connection(*address)
+
+    async def _run(self):
+        backoff = 0.5
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                price_hub.attach(asyncio.get_running_loop())
+                self.connected = True
+                backoff = 0.5
+                logger.info(f"Connected to price bus at {self.address}")
+                while True:
+                    (length,) = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                    message = loads(await reader.readexactly(length))
+                    self.last_seq = message["seq"]
+                    price_hub.publish_many({symbol: as_price_record(data) for symbol, data in message["prices"].items()})
+                    BUS_MESSAGES.labels("received").inc()
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                if self.connected:
+                    logger.warning(f"Price bus connection lost: {e}; falling back to cache")
+            finally:
+                if self.connected:
+                    self.connected = False
+                    price_hub.detach()
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_RECONNECT_BACKOFF)
+
+    def get_status(self) -> Dict:
+        return {"address": self.address, "connected": self.connected, "last_seq": self.last_seq}
+
+# Global instance
+price_bus_subscriber = PriceBusSubscriber()
@@ -0,0 +1,137 @@
+"""
+Price Hub for WidgetForge
+
+In-memory latest-price store used when the pollers run inside the API process
+(POLLER_MODE=supervised) or push to the workers over the price bus (PRICE_BUS).
+Each poll pass is published as one batch with a sequence number, and WebSocket
+handlers are woken the moment it lands instead of sleeping on a fixed interval.
+Otherwise the hub is inactive and readers fall back to the shared diskcache.
+
+Like the diskcache entries, a symbol's price expires ``PRICE_EXPIRE`` seconds
+after it was last published, so a stalled poller or a symbol that stopped
+quoting is reported as missing instead of being served as current.
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .cache_service import PRICE_EXPIRE, get_price, get_price_snapshot
+
+class PriceHub:
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.active = False
+        self.seq = 0
+        self._prices: Dict[str, Dict] = {}
+        # symbol -> clock time it was last published
+        self._received: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+        self._wake_pending = False
+
+    def attach(self, loop: asyncio.AbstractEventLoop):
+        """Bind the hub to the server's event loop and start serving from memory"""
+        self._loop = loop
+        self._event = asyncio.Event()
+        self.active = True
+
+    def detach(self):
+        self.active = False
+        self._loop = None
+        self._event = None
+
+    def publish_many(self, prices: Dict[str, Dict]):
+        """Store a batch of symbol -> price dicts and wake waiters (callable from any thread)"""
+        if not prices:
+            return
+        now = self._clock()
+        with self._lock:
+            for symbol, data in prices.items():
+                symbol = symbol.upper()
+                self._prices[symbol] = data
+                self._received[symbol] = now
+            self.seq += 1
+            loop = self._loop
+            if loop is None or self._wake_pending:
+                return
+            self._wake_pending = True
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._wake()
+        else:
+            loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        # Swap in a fresh event so every current waiter is released exactly once
+        with self._lock:
+            self._wake_pending = False
+        event, self._event = self._event, asyncio.Event()
+        if event is not None:
+            event.set()
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Latest price of a symbol, None if it was never published or has expired"""
+        symbol = symbol.upper()
+        received = self._received.get(symbol)
+        if received is None or self._clock() - received > PRICE_EXPIRE:
+            return None
+        return self._prices.get(symbol)
+
+    def prices(self) -> Dict[str, Dict]:
+        """Copy of every unexpired price, taken under the publish lock (one consistent batch)"""
+        oldest = self._clock() - PRICE_EXPIRE
+        with self._lock:
+            received = self._received
+            return {symbol: data for symbol, data in self._prices.items() if received[symbol] >= oldest}
+
+    def snapshot(self, symbols: Iterable[str]) -> List[Optional[Dict]]:
+        return [self.get(symbol) for symbol in symbols]
+
+    async def wait_for_update(self, last_seq: int, timeout: float) -> int:
+        """Wait until a batch newer than ``last_seq`` is published (or timeout); returns the current seq"""
+        if self.seq != last_seq or self._event is None:
+            return self.seq
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.seq
+
+def get_latest_price(symbol: str) -> Optional[Dict]:
+    """Latest price from memory when the hub is fed, otherwise (or once expired there) from the shared cache"""
+    if price_hub.active:
+        data = price_hub.get(symbol)
+        if data is not None:
+            return data
+    return get_price(symbol)
+
+def get_latest_prices(symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+    """
+    Latest prices (symbol -> price) from one read of the price store
+
+    The hub when it is fed, otherwise the poller's snapshot in the shared cache.
+    ``symbols=None`` returns every symbol; requested symbols without a price
+    are left out. Without a snapshot (an older poller) requested symbols are
+    read one by one.
+    """
+    prices = price_hub.prices() if price_hub.active else {}
+    if not prices:
+        prices = get_price_snapshot()
+    if symbols is None:
+        return dict(prices)
+
+    result = {}
+    for symbol in symbols:
+        data = prices.get(symbol.upper()) if prices else get_price(symbol)
+        if data is not None:
+            result[symbol] = data
+    return result
+
+# Global instance
+price_hub = PriceHub()
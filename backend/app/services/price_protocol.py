@@ -0,0 +1,95 @@
+"""
+Packed Price Protocol for WidgetForge
+
+Opt-in compact encoding for ``/ws/price-stream`` (``?format=packed`` or the
+``widgetforge.packed.v2`` subprotocol). The JSON protocol repeats every key for
+every symbol every second; the packed protocol sends:
+
+* a symbol dictionary as a JSON text frame, once per connection and again
+  whenever the symbol list changes::
+
+      {"type": "symbols", "version": 3, "symbols": ["EURUSD", "GBPUSD", ...]}
+
+* binary price frames, little-endian::
+
+      header  B frame type (1 = full snapshot, 2 = changes only)
+              B dictionary version (mod 256)
+              H record count
+      record  H symbol index, d price, d change_pct, d spread   (26 bytes)
+
+Missing values are NaN. All values are float64 so they decode to exactly what
+the JSON protocol sends (a float32 spread loses 5-digit pairs' last digit). After the first full snapshot only symbols whose values
+changed are sent, so a quiet market costs a 4-byte frame. The matching decoder
+is ``app/static/js/packed_price_decoder.js``.
+"""
+import math
+import struct
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from .json_service import dumps_str
+
+SUBPROTOCOL = "widgetforge.packed.v2"
+
+FRAME_FULL = 1
+FRAME_DELTA = 2
+
+HEADER = struct.Struct("<BBH")
+RECORD = struct.Struct("<Hddd")
+
+def _number(value) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+def wants_packed(query_format: Optional[str], subprotocols: Iterable[str]) -> Tuple[bool, Optional[str]]:
+    """Whether a client asked for the packed protocol, and the subprotocol to accept"""
+    if SUBPROTOCOL in subprotocols:
+        return True, SUBPROTOCOL
+    return (query_format or "").lower() == "packed", None
+
+class PackedPriceEncoder:
+    """Per-connection encoder; remembers what the client has already been sent"""
+
+    def __init__(self):
+        self.version = 0
+        self._symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._sent: Dict[int, bytes] = {}
+
+    def _dictionary_frame(self, symbols: List[str]) -> str:
+        self.version = (self.version + 1) % 256
+        self._symbols = list(symbols)
+        self._index = {symbol: i for i, symbol in enumerate(self._symbols)}
+        self._sent = {}
+        return dumps_str({"type": "symbols", "version": self.version, "symbols": self._symbols})
+
+    def encode(self, symbols: List[str], prices: Dict[str, Dict]) -> List[Union[str, bytes]]:
+        """
+        Frames to send for one stream cycle
+
+        ``prices`` maps symbol -> latest price dict (missing symbols are skipped).
+        Returns an optional dictionary text frame followed by one binary frame.
+        """
+        frames: List[Union[str, bytes]] = []
+        if symbols != self._symbols:
+            frames.append(self._dictionary_frame(symbols))
+
+        full = not self._sent
+        records = []
+        for symbol, data in prices.items():
+            index = self._index.get(symbol)
+            if index is None or not data:
+                continue
+            record = RECORD.pack(index, _number(data.get("price")), _number(data.get("change_pct")),
+                                 _number(data.get("spread")))
+            # Compare packed bytes (NaN never equals itself as a float)
+            if not full and self._sent.get(index) == record:
+                continue
+            self._sent[index] = record
+            records.append(record)
+
+        frames.append(HEADER.pack(FRAME_FULL if full else FRAME_DELTA, self.version, len(records)) + b"".join(records))
+        return frames
@@ -0,0 +1,177 @@
+"""
+Profiler Service for WidgetForge
+
+Two ways to see where the live API process spends its time without restarting:
+
+* ``SamplingProfiler`` - a background thread snapshots every thread's stack via
+  ``sys._current_frames()`` at a fixed interval for N seconds and aggregates the
+  result as collapsed stacks (``frame;frame;frame count``), the input format of
+  flamegraph.pl and speedscope. Overhead is one stack walk per thread per sample.
+* ``RequestProfiler`` - runs cProfile around a single request (enabled per
+  request by header) and keeps the last few results for download. cProfile only
+  sees the event-loop thread, so sync endpoints running in the threadpool are
+  better diagnosed with the sampler. It also records everything else the loop
+  runs during the request (other coroutines interleave at each ``await``), so a
+  report is only request-specific on an otherwise idle process.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+MAX_SAMPLE_SECONDS = 60.0
+MIN_SAMPLE_INTERVAL = 0.001
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profiling session is already running"""
+
+def _frame_label(code) -> str:
+    filename = code.co_filename
+    if filename.startswith(BACKEND_DIR):
+        filename = os.path.relpath(filename, BACKEND_DIR)
+    else:
+        # Trim interpreter/site-packages prefixes down to the module path
+        index = filename.rfind("site-packages" + os.sep)
+        if index != -1:
+            filename = filename[index + len("site-packages" + os.sep):]
+        else:
+            index = filename.rfind(os.sep + "python3")
+            if index != -1:
+                filename = filename[filename.find(os.sep, index + 1) + 1:]
+    label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+    return label.replace(";", ":").replace(" ", "_")
+
+class SamplingProfiler:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def _collect(self, seconds: float, interval: float) -> Dict:
+        own_thread = threading.get_ident()
+        thread_names = {t.ident: t.name for t in threading.enumerate()}
+        stacks: Counter = Counter()
+        labels: Dict = {}
+        samples = 0
+
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    parts.append(label)
+                    frame = frame.f_back
+                parts.append(thread_names.get(thread_id, f"thread-{thread_id}").replace(" ", "_"))
+                parts.reverse()
+                stacks[";".join(parts)] += 1
+            samples += 1
+            time.sleep(interval)
+
+        return {"samples": samples, "stacks": stacks}
+
+    def sample(self, seconds: float = 10.0, interval: float = 0.005) -> Dict:
+        """
+        Sample all threads for ``seconds`` (blocking; run it off the event loop)
+
+        Returns collapsed stacks plus the hottest leaf frames.
+        """
+        seconds = min(max(seconds, 0.1), MAX_SAMPLE_SECONDS)
+        interval = max(interval, MIN_SAMPLE_INTERVAL)
+
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A sampling session is already running")
+        try:
+            started = time.time()
+            result = self._collect(seconds, interval)
+        finally:
+            self._lock.release()
+
+        stacks: Counter = result["stacks"]
+        leaves: Counter = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+
+        return {
+            "started_at": started,
+            "duration": seconds,
+            "interval": interval,
+            "samples": result["samples"],
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()),
+            "top_frames": [{"frame": frame, "samples": count} for frame, count in leaves.most_common(25)],
+        }
+
+# Prepended to every report so it is not read as the handler's own cost
+REPORT_NOTE = (
+    "Event-loop thread from request start to finish: includes other coroutines that ran "
+    "meanwhile; excludes threadpool work.\n"
+)
+
+class RequestProfiler:
+    def __init__(self, max_results: int = 20):
+        self.max_results = max_results
+        self._results: "OrderedDict[str, Dict]" = OrderedDict()
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+
+    def start(self) -> Optional[cProfile.Profile]:
+        """Start a cProfile session, or None if another request is being profiled"""
+        if not self._active.acquire(blocking=False):
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) owns the hook
+            self._active.release()
+            return None
+        return profile
+
+    @staticmethod
+    def new_id() -> str:
+        return uuid.uuid4().hex[:12]
+
+    def finish(self, profile: cProfile.Profile, profile_id: str, method: str, path: str, elapsed: float):
+        """Stop the session and store the formatted result under ``profile_id``"""
+        profile.disable()
+        self._active.release()
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        stats.sort_stats("cumulative").print_stats(40)
+
+        with self._lock:
+            self._results[profile_id] = {
+                "id": profile_id,
+                "method": method,
+                "path": path,
+                "elapsed_ms": round(elapsed * 1000, 3),
+                "created_at": time.time(),
+                "report": REPORT_NOTE + stream.getvalue(),
+            }
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict]:
+        return self._results.get(profile_id)
+
+    def list(self) -> List[Dict]:
+        """Stored profiles without their reports, newest first"""
+        with self._lock:
+            results = list(self._results.values())
+        return [{k: v for k, v in r.items() if k != "report"} for r in reversed(results)]
+
+# Global instances
+sampling_profiler = SamplingProfiler()
+request_profiler = RequestProfiler()
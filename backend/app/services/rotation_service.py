@@ -0,0 +1,168 @@
+"""
+Rotation Service for WidgetForge
+
+Builds the combined news + calendar payload shown by the rotating financial
+news widget. Served by ``/api/combined/rotation-data`` and pushed to connected
+widgets by ``/api/combined/rotation-stream``.
+
+The expensive part (fetching news, loading calendar events, cross-referencing)
+runs once into a ``RotationSnapshot`` at the maximum counts. Actual results
+come with the calendar events: the Forex Factory poller matches them from RSS
+and stores them (``update_actual_results``), so no enrichment happens here.
+It is rebuilt only when one of its inputs changes:
+
+* the news generation (bumped whenever a feed is re-fetched),
+* the calendar file version (mtime/size of the file the poller writes),
+* the minute, since relative times ("in 5m", "3m ago") are baked into items.
+
+Each ``news_count``/``events_count`` view is sliced from the snapshot and
+serialised once, so repeat requests are served as pre-encoded bytes.
+"""
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from .event_stream import default_fingerprint
+from .forex_factory_service import forex_factory_service
+from .json_service import dumps
+from .rss_service import rss_service
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for the per-widget counts; the snapshot is built at these sizes
+MAX_ROTATION_ITEMS = 50
+
+def _clamp(count: int) -> int:
+    return max(0, min(count, MAX_ROTATION_ITEMS))
+
+class RotationSnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (inputs, parts, serialised views) swapped as one object so readers never mix generations
+        self._snapshot: Optional[Tuple[Tuple, Dict, Dict[Tuple[int, int], bytes]]] = None
+        self.builds = 0
+
+    @staticmethod
+    def _current_inputs() -> Tuple:
+        return (rss_service.get_news_generation(), forex_factory_service.calendar_version(), int(time.time() // 60))
+
+    def _fresh_snapshot(self):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] == self._current_inputs():
+            return snapshot
+        return None
+
+    def is_fresh(self) -> bool:
+        return self._fresh_snapshot() is not None
+
+    def _rebuild(self):
+        minute = int(time.time() // 60)
+        calendar_version = forex_factory_service.calendar_version()
+
+        # Get news data from all sources (fetch more to find relevant items, then limit display)
+        all_news_items = rss_service.fetch_all_economic_news(MAX_ROTATION_ITEMS)
+
+        # Get ONLY Forex Factory high-impact events (past and upcoming)
+        recent_past_events = forex_factory_service.get_recent_past_events(MAX_ROTATION_ITEMS, "High")
+        upcoming_events = forex_factory_service.get_upcoming_events(MAX_ROTATION_ITEMS, "High")
+
+        # Cross-reference news with calendar events (but keep chronological order)
+        all_events = forex_factory_service.get_todays_events() + upcoming_events
+        enhanced_news = rss_service.cross_reference_with_calendar(all_news_items, all_events)
+
+        parts = {
+            "news": enhanced_news,
+            "pinned_news": rss_service.get_recent_high_impact_news(),
+            "upcoming": upcoming_events,
+            "past": recent_past_events,
+            "last_updated": datetime.now().isoformat(),
+        }
+        # Read the generation after fetching so our own re-fetches do not invalidate the result
+        inputs = (rss_service.get_news_generation(), calendar_version, minute)
+        self._snapshot = (inputs, parts, {})
+        self.builds += 1
+        return self._snapshot
+
+    def _ensure_fresh(self):
+        snapshot = self._fresh_snapshot()
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            return self._fresh_snapshot() or self._rebuild()
+
+    @staticmethod
+    def _assemble(parts: Dict, news_count: int, events_count: int) -> Dict:
+        enhanced_upcoming_events = parts["upcoming"][:events_count]
+        enhanced_past_events = parts["past"][:events_count]
+
+        # Combine events with priority for upcoming events (ensure USD PPI and other future events show)
+        # Prioritize upcoming events, then fill remaining slots with past events
+        max_upcoming = max(6, events_count // 2)  # Ensure at least 6 upcoming events or half the total
+        max_past = events_count - len(enhanced_upcoming_events[:max_upcoming])
+
+        calendar_display_events = enhanced_upcoming_events[:max_upcoming] + enhanced_past_events[:max_past]
+
+        # Remove duplicates based on title and country
+        seen_events = set()
+        deduplicated_events = []
+        for event in calendar_display_events:
+            event_key = (event.get('title', ''), event.get('country', ''))
+            if event_key not in seen_events:
+                seen_events.add(event_key)
+                deduplicated_events.append(event)
+
+        # Sort combined events by timestamp for proper chronological order
+        deduplicated_events.sort(key=lambda x: x.get('timestamp', 0))
+
+        return {
+            "news_feed": {
+                "items": parts["news"][:news_count],
+                "pinned": parts["pinned_news"]
+            },
+            "calendar_feed": {
+                "items": deduplicated_events,
+                "pinned": None  # Disable pinned event since we show recent events in main list
+            },
+            "rotation_ready": True,
+            "last_updated": parts["last_updated"]
+        }
+
+    def get_data(self, news_count: int = 8, events_count: int = 8) -> Dict:
+        """Rotation payload for one widget configuration (rebuilds the snapshot if stale)"""
+        _, parts, _ = self._ensure_fresh()
+        return self._assemble(parts, _clamp(news_count), _clamp(events_count))
+
+    def get_response_bytes(self, news_count: int = 8, events_count: int = 8) -> bytes:
+        """Serialised ``{"success": true, "data": ...}`` body, encoded once per view and snapshot"""
+        return self._view_bytes(self._ensure_fresh(), _clamp(news_count), _clamp(events_count))
+
+    def peek_response_bytes(self, news_count: int = 8, events_count: int = 8) -> Optional[bytes]:
+        """Serialised body if the snapshot is fresh, else None (never rebuilds)"""
+        snapshot = self._fresh_snapshot()
+        if snapshot is None:
+            return None
+        return self._view_bytes(snapshot, _clamp(news_count), _clamp(events_count))
+
+    def _view_bytes(self, snapshot, news_count: int, events_count: int) -> bytes:
+        _, parts, views = snapshot
+        key = (news_count, events_count)
+        body = views.get(key)
+        if body is None:
+            payload = {"success": True, "data": self._assemble(parts, news_count, events_count)}
+            body = dumps(payload)
+            views[key] = body
+        return body
+
+def build_rotation_data(news_count: int = 8, events_count: int = 8) -> Dict:
+    """Get data for rotating widget display with cross-referenced news"""
+    return rotation_snapshot.get_data(news_count, events_count)
+
+def rotation_fingerprint(payload: Dict) -> str:
+    """Content hash of a rotation payload, ignoring its generation time"""
+    data = {key: value for key, value in payload.get("data", {}).items() if key != "last_updated"}
+    return default_fingerprint({"success": payload.get("success"), "data": data})
+
+# Global instance
+rotation_snapshot = RotationSnapshot()
@@ -2,12 +2,21 @@ import asyncio
 import logging
 from typing import List, Dict, Optional
 from datetime import datetime, timezone
-import feedparser
-import requests
 from .cache_service import cache
+from .metrics_service import record_cache_lookup
+from .single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# feedparser and requests are imported inside the fetch methods: together they add
+# roughly 90 ms to worker start-up and are only needed when a feed is re-fetched
+
+# Incremented whenever a feed fetch stores fresh items (see get_news_generation)
+NEWS_GENERATION_KEY = "rss:generation"
+
+# One download per feed and expiry, however many requests miss the cache at once
+feed_flight = SingleFlight("rss")
+
 class RSSService:
     """Service for fetching and parsing RSS feeds with caching"""
     
@@ -37,10 +46,17 @@ class RSSService:
         cache_key = f"financial_juice_news_{max_items}"
         
         # Try to get from cache first
-        cached_data = cache.get(cache_key)
+        cached_data = record_cache_lookup("rss", "financial_juice_news", cache.get(cache_key))
         if cached_data:
             return cached_data
-            
+        
+        # Concurrent misses wait for one download (re-checking the cache a finished one filled)
+        return feed_flight.do(cache_key, lambda: cache.get(cache_key) or self._download_financial_juice_news(max_items, cache_key))
+    
+    def _download_financial_juice_news(self, max_items: int, cache_key: str) -> List[Dict]:
+        import feedparser
+        import requests
+
         try:
             logger.info(f"Fetching Financial Juice RSS feed: {self.financial_juice_url}")
             
@@ -62,7 +78,7 @@ class RSSService:
                     'title': title,
                     'link': entry.get('link', ''),
                     'description': entry.get('description', ''),
-                    'published': self._parse_date(entry.get('published', '')),
+                    **self._published_fields(entry.get('published', '')),
                     'published_raw': entry.get('published', ''),
                     'guid': entry.get('guid', ''),
                     'author': 'Financial Juice',
@@ -74,6 +90,7 @@ class RSSService:
                 
             # Cache the results
             cache.set(cache_key, news_items, expire=self.cache_ttl)
+            self._mark_news_updated()
             
             # Archive economic data releases for longer storage
             self._archive_economic_data_releases(news_items)
@@ -101,10 +118,16 @@ class RSSService:
         cache_key = f"myfxbook_economic_calendar_{max_items}"
         
         # Try to get from cache first
-        cached_data = cache.get(cache_key)
+        cached_data = record_cache_lookup("rss", "myfxbook_economic_calendar", cache.get(cache_key))
         if cached_data:
             return cached_data
-            
+        
+        return feed_flight.do(cache_key, lambda: cache.get(cache_key) or self._download_myfxbook_economic_calendar(max_items, cache_key))
+    
+    def _download_myfxbook_economic_calendar(self, max_items: int, cache_key: str) -> List[Dict]:
+        import feedparser
+        import requests
+
         try:
             logger.info(f"Fetching MyFXBook economic calendar: {self.myfxbook_url}")
             
@@ -124,7 +147,7 @@ class RSSService:
                     'title': title,
                     'link': entry.get('link', ''),
                     'description': entry.get('description', ''),
-                    'published': self._parse_date(entry.get('published', '')),
+                    **self._published_fields(entry.get('published', '')),
                     'published_raw': entry.get('published', ''),
                     'guid': entry.get('guid', ''),
                     'author': 'MyFXBook',
@@ -137,6 +160,7 @@ class RSSService:
                 
             # Cache the results
             cache.set(cache_key, calendar_events, expire=self.cache_ttl)
+            self._mark_news_updated()
             
             # Archive economic data releases for longer storage
             self._archive_economic_data_releases(calendar_events)
@@ -179,10 +203,28 @@ class RSSService:
         all_news = self._remove_duplicate_news(all_news)
         
         # Sort by publication date (most recent first)
-        all_news.sort(key=lambda x: x.get('published') or datetime.min.replace(tzinfo=timezone.utc), reverse=True)
+        all_news.sort(key=lambda x: x.get('published_ts') or 0, reverse=True)
         
         return all_news[:max_items]
     
+    def get_news_generation(self) -> int:
+        """Counter that changes whenever any feed was re-fetched (shared across processes)"""
+        return cache.get(NEWS_GENERATION_KEY, 0)
+
+    def _mark_news_updated(self) -> None:
+        try:
+            cache.incr(NEWS_GENERATION_KEY)
+        except Exception as e:
+            logger.warning(f"Failed to bump news generation: {e}")
+
+    def _published_fields(self, date_str: str) -> Dict:
+        """JSON-ready publication time: ISO 8601 string plus epoch seconds for sorting"""
+        published = self._parse_date(date_str)
+        return {
+            'published': published.isoformat() if published else None,
+            'published_ts': published.timestamp() if published else None,
+        }
+
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse RSS date string to datetime object"""
         if not date_str:
@@ -247,7 +289,7 @@ class RSSService:
         cache_key = "recent_high_impact_news"
         
         # Try cache first (shorter TTL for pinned news)
-        cached_data = cache.get(cache_key)
+        cached_data = record_cache_lookup("rss", "recent_high_impact_news", cache.get(cache_key))
         if cached_data:
             return cached_data
             
@@ -290,7 +332,7 @@ class RSSService:
         cache_key = "todays_high_impact_summary"
         
         # Try cache first
-        cached_data = cache.get(cache_key)
+        cached_data = record_cache_lookup("rss", "todays_high_impact_summary", cache.get(cache_key))
         if cached_data:
             return cached_data
             
@@ -502,8 +544,8 @@ class RSSService:
             today = date.today().isoformat()
             archive_key = f"rss_archive_{today}"
             
-            # Get existing archive for today
-            existing_archive = cache.get(archive_key) or []
+            # Get existing archive for today (a copy: cached values are shared)
+            existing_archive = list(cache.get(archive_key) or [])
             
             # Find new economic data releases
             new_economic_news = []
@@ -579,55 +621,64 @@ class RSSService:
                 cache_key = f"additional_rss_{source_name}_{items_per_source}"
                 
                 # Try cache first
-                cached_data = cache.get(cache_key)
+                cached_data = record_cache_lookup("rss", "additional_sources", cache.get(cache_key))
                 if cached_data:
                     all_additional_news.extend(cached_data)
                     continue
                 
-                logger.info(f"Fetching {source_name} RSS feed: {url}")
-                
-                # Fetch RSS feed with proper headers
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                response = requests.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
-                
-                # Parse RSS feed
-                import feedparser
-                feed = feedparser.parse(response.content)
-                
-                source_news = []
-                for entry in feed.entries[:items_per_source]:
-                    # Filter for economic relevance
-                    title = entry.get('title', '')
-                    if self._is_economic_relevant(title):
-                        news_item = {
-                            'title': title,
-                            'link': entry.get('link', ''),
-                            'description': entry.get('description', entry.get('summary', '')),
-                            'published': self._parse_date(entry.get('published', '')),
-                            'published_raw': entry.get('published', ''),
-                            'guid': entry.get('guid', ''),
-                            'author': source_name,
-                            'source': source_name,
-                            'is_high_impact': self._is_high_impact_news(title),
-                            'time_ago': self._get_time_ago(entry.get('published', ''))
-                        }
-                        source_news.append(news_item)
-                
-                # Cache the results
-                cache.set(cache_key, source_news, expire=self.cache_ttl)
+                source_news = feed_flight.do(
+                    cache_key,
+                    lambda: cache.get(cache_key) or self._download_additional_source(source_name, url, items_per_source, cache_key)
+                )
                 all_additional_news.extend(source_news)
                 
-                logger.info(f"Successfully fetched {len(source_news)} economic items from {source_name}")
-                
             except Exception as e:
                 logger.warning(f"Failed to fetch from {source_name}: {e}")
                 continue
         
         return all_additional_news[:max_items]
 
+    def _download_additional_source(self, source_name: str, url: str, items_per_source: int, cache_key: str) -> List[Dict]:
+        import feedparser
+        import requests
+
+        logger.info(f"Fetching {source_name} RSS feed: {url}")
+        
+        # Fetch RSS feed with proper headers
+        headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        }
+        response = requests.get(url, headers=headers, timeout=10)
+        response.raise_for_status()
+        
+        # Parse RSS feed
+        feed = feedparser.parse(response.content)
+        
+        source_news = []
+        for entry in feed.entries[:items_per_source]:
+            # Filter for economic relevance
+            title = entry.get('title', '')
+            if self._is_economic_relevant(title):
+                news_item = {
+                    'title': title,
+                    'link': entry.get('link', ''),
+                    'description': entry.get('description', entry.get('summary', '')),
+                    **self._published_fields(entry.get('published', '')),
+                    'published_raw': entry.get('published', ''),
+                    'guid': entry.get('guid', ''),
+                    'author': source_name,
+                    'source': source_name,
+                    'is_high_impact': self._is_high_impact_news(title),
+                    'time_ago': self._get_time_ago(entry.get('published', ''))
+                }
+                source_news.append(news_item)
+        
+        # Cache the results
+        cache.set(cache_key, source_news, expire=self.cache_ttl)
+        self._mark_news_updated()
+        logger.info(f"Successfully fetched {len(source_news)} economic items from {source_name}")
+        return source_news
+
     def _is_economic_relevant(self, title: str) -> bool:
         """
         Check if a news title is economically relevant
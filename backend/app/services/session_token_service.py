@@ -0,0 +1,218 @@
+"""
+Session Token Service for WidgetForge
+
+Optional stateless session mode (AUTH_SESSION_MODE=signed). Session cookies carry
+an HMAC-signed payload with the user id, role, expiry and the user's revocation
+generation, so they can be verified in memory by any uvicorn worker. The database
+is only read to refresh the per-user revocation generations.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from app.models.auth_models import auth_db, User
+
+logger = logging.getLogger(__name__)
+
+# Length of a generated signing secret
+SECRET_BYTES = 32
+
+@dataclass
+class SessionClaims:
+    user_id: int
+    role: str
+    expires_at: int
+    generation: int
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+class SessionTokenService:
+    def __init__(self):
+        self._mode = None
+        self._secret = None
+        self._generations: Dict[int, int] = {}
+        self._generations_loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def signed_mode(self) -> bool:
+        """Whether new sessions are issued as signed tokens"""
+        if self._mode is None:
+            # Read lazily so values from .env (loaded after imports) are honoured
+            self._mode = os.getenv("AUTH_SESSION_MODE", "db").lower()
+            if self._mode == "signed":
+                logger.info("Signed session tokens enabled")
+        return self._mode == "signed"
+
+    @property
+    def generation_refresh_interval(self) -> float:
+        """Seconds between revocation generation refreshes from the database"""
+        return float(os.getenv("SESSION_GENERATION_REFRESH", "30"))
+
+    def _get_secret(self) -> bytes:
+        """Load the signing secret (env var, or a key file shared by all workers)"""
+        if self._secret is None:
+            env_secret = os.getenv("SESSION_SECRET")
+            if env_secret:
+                self._secret = env_secret.encode()
+            else:
+                key_file = os.path.join(os.path.dirname(auth_db.db_path), "session_secret.key")
+                self._secret = self._load_key_file(key_file)
+        return self._secret
+
+    @staticmethod
+    def _load_key_file(key_file: str) -> bytes:
+        """Read the key file, creating it first if needed"""
+        if not os.path.exists(key_file):
+            # Write the whole secret to a temp file, then link it into place: the key
+            # file never exists half-written, and link() fails if another worker won
+            fd, temp_file = tempfile.mkstemp(dir=os.path.dirname(key_file), prefix=".session_secret.")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(secrets.token_bytes(SECRET_BYTES))
+                    f.flush()
+                    os.fsync(f.fileno())
+                try:
+                    os.link(temp_file, key_file)
+                except FileExistsError:
+                    pass
+            finally:
+                os.unlink(temp_file)
+        with open(key_file, 'rb') as f:
+            secret = f.read()
+        if len(secret) < SECRET_BYTES:
+            # Never sign with a short (e.g. empty) key: anyone could forge tokens
+            raise RuntimeError(f"Session secret {key_file} is {len(secret)} bytes, expected {SECRET_BYTES}; "
+                               f"delete it or set SESSION_SECRET")
+        return secret
+
+    def _sign(self, body: str) -> str:
+        return _b64encode(hmac.new(self._get_secret(), body.encode("ascii"), hashlib.sha256).digest())
+
+    @staticmethod
+    def is_signed_token(session_token: str) -> bool:
+        """Signed tokens contain a '.', DB tokens (token_urlsafe) never do"""
+        return "." in session_token
+
+    # Revocation generations
+    def _refresh_generations(self, force: bool = False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._generations_loaded_at < self.generation_refresh_interval:
+                return
+            self._generations = auth_db.get_session_generations()
+            self._generations_loaded_at = now
+
+    def get_generation(self, user_id: int) -> Optional[int]:
+        """Get the current revocation generation of a user (None if unknown)"""
+        self._refresh_generations()
+        generation = self._generations.get(user_id)
+        if generation is None:
+            # User may have been created after the last refresh
+            self._refresh_generations(force=True)
+            generation = self._generations.get(user_id)
+        return generation
+
+    def revoke_user(self, user_id: int) -> bool:
+        """Invalidate every signed session issued to a user"""
+        generation = auth_db.bump_session_generation(user_id)
+        if generation is None:
+            return False
+        with self._lock:
+            self._generations[user_id] = generation
+        return True
+
+    # Token issue / verification
+    def issue(self, user: User, expires_hours: int = 24) -> str:
+        """Issue a signed session token for a user"""
+        payload = {
+            "uid": user.id,
+            "role": user.role,
+            "exp": int(time.time()) + expires_hours * 60 * 60,
+            "gen": self.get_generation(user.id) or 0,
+        }
+        body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        return f"{body}.{self._sign(body)}"
+
+    def verify(self, session_token: str) -> Optional[SessionClaims]:
+        """Verify a signed session token without touching the session table"""
+        try:
+            body, signature = session_token.split(".")
+            if not hmac.compare_digest(signature, self._sign(body)):
+                return None
+            payload = json.loads(_b64decode(body))
+            claims = SessionClaims(
+                user_id=int(payload["uid"]),
+                role=payload["role"],
+                expires_at=int(payload["exp"]),
+                generation=int(payload["gen"])
+            )
+        except Exception:
+            return None
+
+        if claims.expires_at <= time.time():
+            return None
+        if claims.generation != self.get_generation(claims.user_id):
+            return None
+        return claims
+
+    # Session lifecycle used by routes and middleware
+    def create_session(self, user: User, expires_hours: int = 24) -> str:
+        """Create a session in the configured mode and return its cookie value"""
+        if self.signed_mode:
+            return self.issue(user, expires_hours)
+        return auth_db.create_session(user.id, expires_hours)
+
+    def end_session(self, session_token: str) -> bool:
+        """End a session (logout)"""
+        if self.is_signed_token(session_token):
+            claims = self.verify(session_token)
+            # Signed tokens cannot be deleted individually, so revoke the user's generation
+            return self.revoke_user(claims.user_id) if claims else False
+        return auth_db.delete_session(session_token)
+
+    def get_session_user(self, session_token: str, full_profile: bool = True) -> Optional[User]:
+        """
+        Resolve a session cookie to a user
+
+        Args:
+            session_token: Cookie value (signed token or DB session token)
+            full_profile: Load the full user row for signed tokens. When False only
+                id and role are populated and no database access is needed.
+        """
+        if self.is_signed_token(session_token):
+            if not self.signed_mode:
+                return None
+            claims = self.verify(session_token)
+            if not claims:
+                return None
+            if not full_profile:
+                return User(id=claims.user_id, role=claims.role)
+            return auth_db.get_user_by_id(claims.user_id)
+
+        # DB-backed sessions (also accepted in signed mode until they expire)
+        auth_db.cleanup_expired_sessions()
+        return auth_db.get_session_user(session_token)
+
+    def load_profile(self, user: User) -> Optional[User]:
+        """Full user row for a user from get_session_user(full_profile=False)"""
+        if user.password_hash:
+            # DB sessions already loaded the row
+            return user
+        return auth_db.get_user_by_id(user.id)
+
+# Global token service instance
+session_token_service = SessionTokenService()
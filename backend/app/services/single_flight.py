@@ -0,0 +1,107 @@
+"""
+Single-Flight Request Coalescing for WidgetForge
+
+The services follow "check the cache, on a miss compute and store". When a hot
+key expires, every request arriving before the first one has stored the new
+value would also compute it: N identical feed downloads or DB queries instead
+of one. A ``SingleFlight`` group lets only the first caller for a key (the
+leader) run the computation; callers arriving while it is in flight wait for
+it and receive the same result (or exception).
+
+* ``do(key, fn)`` for blocking code (route handlers run in the thread pool,
+  pollers, ``asyncio.to_thread``),
+* ``await do_async(key, fn)`` for coroutines on the event loop. The work runs
+  as its own task, so a cancelled caller (client gone) does not cancel it for
+  the others.
+
+Coalesced callers share the result object; treat it as read-only, like any
+cached value. Coalescing is per process: each API worker still computes once
+per expiry, which is what the shared diskcache is for.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from .metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+FLIGHT_CALLS = metrics.counter(
+    "widgetforge_single_flight_calls_total",
+    "Cache-miss computations by role (leader computes, waiter is coalesced onto it)",
+    ["flight", "role"],
+)
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Run ``fn`` once for concurrent callers with the same key (blocking)"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            FLIGHT_CALLS.labels(self.name, "waiter").inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        FLIGHT_CALLS.labels(self.name, "leader").inc()
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            if call.waiters:
+                logger.debug(f"{self.name}: {call.waiters} callers coalesced onto {key!r}")
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()`` once for concurrent callers with the same key on this event loop"""
+        task_key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            FLIGHT_CALLS.labels(self.name, "leader").inc()
+            task = asyncio.ensure_future(fn())
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda done: self._finished(task_key, done))
+        else:
+            FLIGHT_CALLS.labels(self.name, "waiter").inc()
+        # shield: one caller being cancelled must not cancel the shared work
+        return await asyncio.shield(task)
+
+    def _finished(self, task_key: Tuple[int, Hashable], task: asyncio.Task):
+        if self._tasks.get(task_key) is task:
+            del self._tasks[task_key]
+        # Mark the exception retrieved even if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._tasks)
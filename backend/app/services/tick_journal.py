@@ -0,0 +1,344 @@
+"""
+Tick Journal for WidgetForge
+
+The price cache only keeps the latest quote (for 10 seconds) and the chart
+collector samples every few minutes, so ticks were thrown away. The market
+poller now appends every new quote to an append-only binary journal, which is
+enough to rebuild bars, replay a session or serve high-resolution history
+without a database.
+
+Layout: one file per symbol and UTC day, ``<TICK_JOURNAL_DIR>/YYYYMMDD/SYMBOL.ticks``
+(default ``CACHE_DIR/ticks``)::
+
+    header  4s magic "WFTK", H version, H digits, 8 reserved     (16 bytes)
+    record  q time_ms, Q seq, d bid, d ask                        (32 bytes)
+
+Times are UTC epoch ms (the poller converts MT5 server time, see
+``mt5_source.ServerClock``), so day files split at UTC midnight and ranges
+line up with the API's clock.
+
+Records are fixed width and appended in time order, so record ``i`` is at
+``16 + 32 * i`` and a time range is found by binary search, without an index.
+A quote is journaled when its sequence number moves (an unchanged quote keeps
+its ``seq``, see ``poller_market.fetch_price``).
+
+``tick_journal`` (the writer) lives in the poller process and flushes after
+each pass. ``tick_journal_reader`` memory-maps the files: a scan reads only
+the pages of the requested range, and closed days are mapped once. A partial
+record at the end of a file (poller killed mid-write) is ignored by readers
+and cut off when the writer reopens the file.
+
+Settings (read on first use): ``TICK_JOURNAL_DIR``, ``TICK_JOURNAL_ENABLED``
+(default on) and ``TICK_JOURNAL_RETENTION_DAYS`` (default 7, 0 keeps all).
+"""
+import heapq
+import logging
+import mmap
+import os
+import shutil
+import struct
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .cache_service import CACHE_DIR
+from .metrics_service import TICK_JOURNAL_TICKS
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"WFTK"
+VERSION = 1
+HEADER = struct.Struct("<4sHH8x")
+RECORD = struct.Struct("<qQdd")
+
+# Memory maps kept open by a reader (one per symbol-day)
+MAX_OPEN_MAPS = 64
+
+class Tick(NamedTuple):
+    time_ms: int
+    seq: int
+    bid: float
+    ask: float
+
+def journal_dir() -> str:
+    return os.environ.get("TICK_JOURNAL_DIR") or os.path.join(CACHE_DIR, "ticks")
+
+def day_of(time_ms: int) -> str:
+    return datetime.fromtimestamp(time_ms / 1000, tz=timezone.utc).strftime("%Y%m%d")
+
+def retention_days() -> int:
+    return int(os.environ.get("TICK_JOURNAL_RETENTION_DAYS", "7"))
+
+def retention_cutoff(today: str, days: int) -> str:
+    """First day kept when ``today`` is the current day"""
+    return (datetime.strptime(today, "%Y%m%d") - timedelta(days=days)).strftime("%Y%m%d")
+
+def journal_path(root: str, symbol: str, day: str) -> str:
+    return os.path.join(root, day, f"{symbol.upper()}.ticks")
+
+def _days_between(start_ms: int, end_ms: int) -> List[str]:
+    day = datetime.fromtimestamp(start_ms / 1000, tz=timezone.utc).date()
+    last = datetime.fromtimestamp(end_ms / 1000, tz=timezone.utc).date()
+    days = []
+    while day <= last:
+        days.append(day.strftime("%Y%m%d"))
+        day += timedelta(days=1)
+    return days
+
+class _OpenDay:
+    __slots__ = ("day", "file", "last_seq", "last_time_ms")
+
+    def __init__(self, day: str, file, last_seq: Optional[int], last_time_ms: int):
+        self.day = day
+        self.file = file
+        self.last_seq = last_seq
+        self.last_time_ms = last_time_ms
+
+class TickJournal:
+    """Appends ticks to the day files (one writer process per journal directory)"""
+
+    def __init__(self, root: Optional[str] = None):
+        self._root = root
+        self._enabled: Optional[bool] = None
+        self._retention_days: Optional[int] = None
+        self._open: Dict[str, _OpenDay] = {}
+        self._pruned_day: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._root = journal_dir()
+        return self._root
+
+    @property
+    def enabled(self) -> bool:
+        if self._enabled is None:
+            self._enabled = os.environ.get("TICK_JOURNAL_ENABLED", "1").lower() not in ("0", "false", "no")
+        return self._enabled
+
+    @property
+    def retention_days(self) -> int:
+        if self._retention_days is None:
+            self._retention_days = retention_days()
+        return self._retention_days
+
+    def _open_day(self, symbol: str, day: str, digits: int) -> _OpenDay:
+        path = journal_path(self.root, symbol, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        file = open(path, "a+b")
+        size = file.seek(0, os.SEEK_END)
+        last_seq, last_time_ms = None, 0
+        if size < HEADER.size:
+            file.truncate(0)
+            file.write(HEADER.pack(MAGIC, VERSION, digits))
+        else:
+            # Drop a partial record left by an interrupted write
+            whole = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+            if whole != size:
+                logger.warning(f"Tick journal {path}: dropping {size - whole} bytes of a partial record")
+                file.truncate(whole)
+            if whole > HEADER.size:
+                file.seek(whole - RECORD.size)
+                last_time_ms, last_seq, _, _ = RECORD.unpack(file.read(RECORD.size))
+            file.seek(0, os.SEEK_END)
+        return _OpenDay(day, file, last_seq, last_time_ms)
+
+    def append(self, record) -> bool:
+        """Journal one PriceRecord; False if it is not a new tick (same seq, or older than the last one)"""
+        symbol = record.symbol.upper()
+        day = day_of(record.time_ms)
+        current = self._open.get(symbol)
+        if current is None or current.day != day:
+            if current is not None:
+                current.file.close()
+            current = self._open[symbol] = self._open_day(symbol, day, record.digits)
+            self._prune(day)
+        if record.seq == current.last_seq or record.time_ms < current.last_time_ms:
+            return False
+        current.file.write(RECORD.pack(record.time_ms, record.seq, record.bid, record.ask))
+        current.last_seq = record.seq
+        current.last_time_ms = record.time_ms
+        return True
+
+    def append_many(self, records: Iterable) -> int:
+        """Journal one poll pass and flush it; returns the number of new ticks"""
+        if not self.enabled:
+            return 0
+        written = 0
+        with self._lock:
+            try:
+                for record in records:
+                    written += self.append(record)
+                for current in self._open.values():
+                    current.file.flush()
+            except OSError as e:
+                # The journal is a by-product; never fail a poll pass over it
+                logger.warning(f"Tick journal write failed: {e}")
+        TICK_JOURNAL_TICKS.inc(written)
+        return written
+
+    def _prune(self, today: str):
+        if self._pruned_day == today or self.retention_days <= 0:
+            return
+        self._pruned_day = today
+        cutoff = retention_cutoff(today, self.retention_days)
+        failed = []
+
+        def removal_failed(function, path, exc_info):
+            failed.append(f"{path}: {exc_info[1]}")
+
+        for day in sorted(os.listdir(self.root)):
+            if len(day) == 8 and day.isdigit() and day < cutoff:
+                shutil.rmtree(os.path.join(self.root, day), onerror=removal_failed)
+                if os.path.exists(os.path.join(self.root, day)):
+                    # e.g. Windows refuses to delete files a reader still has mapped; retried on the next day change
+                    logger.warning(f"Tick journal: could not remove {day}: {'; '.join(failed) or 'still present'}")
+                else:
+                    logger.info(f"Tick journal: removed {day} (older than {self.retention_days} days)")
+                failed.clear()
+
+    def close(self):
+        with self._lock:
+            for current in self._open.values():
+                current.file.close()
+            self._open.clear()
+
+class _MappedDay:
+    __slots__ = ("map", "size", "digits", "count")
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.size = os.fstat(file.fileno()).st_size
+            self.map = mmap.mmap(file.fileno(), self.size, access=mmap.ACCESS_READ)
+        magic, version, self.digits = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {VERSION} tick journal")
+        self.count = (self.size - HEADER.size) // RECORD.size
+
+    def time_at(self, index: int) -> int:
+        return struct.unpack_from("<q", self.map, HEADER.size + index * RECORD.size)[0]
+
+    def bisect(self, time_ms: int) -> int:
+        """Index of the first record at or after ``time_ms``"""
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.time_at(middle) < time_ms:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def ticks(self, start_ms: int, end_ms: int) -> Iterator[Tick]:
+        first, last = self.bisect(start_ms), self.bisect(end_ms)
+        data = self.map[HEADER.size + first * RECORD.size:HEADER.size + last * RECORD.size]
+        return map(Tick._make, RECORD.iter_unpack(data))
+
+class TickJournalReader:
+    """Range scans, bar rebuilds and replay over the journal files (any process)"""
+
+    def __init__(self, root: Optional[str] = None):
+        self._root = root
+        self._maps: "OrderedDict[str, _MappedDay]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._today: Optional[str] = None
+        self._cutoff = ""
+
+    @property
+    def root(self) -> str:
+        if self._root is None:
+            self._root = journal_dir()
+        return self._root
+
+    def _mapped(self, path: str) -> Optional[_MappedDay]:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return None
+        if size <= HEADER.size:
+            return None
+        with self._lock:
+            if os.path.basename(os.path.dirname(path)) < self._retention_cutoff():
+                # Past retention: not kept mapped, so the writer can delete it
+                return _MappedDay(path)
+            mapped = self._maps.get(path)
+            if mapped is not None and mapped.size == size:
+                self._maps.move_to_end(path)
+                return mapped
+            # New file, or today's file grew since it was mapped. The old map
+            # is left to the garbage collector: a running scan may still use it.
+            mapped = self._maps[path] = _MappedDay(path)
+            while len(self._maps) > MAX_OPEN_MAPS:
+                self._maps.popitem(last=False)
+            return mapped
+
+    def _retention_cutoff(self) -> str:
+        """
+        First day within retention ("" keeps all). Maps of days that fall out of
+        retention are dropped, since Windows cannot delete a mapped file.
+        """
+        today = day_of(int(time.time() * 1000))
+        if today != self._today:
+            self._today = today
+            days = retention_days()
+            self._cutoff = retention_cutoff(today, days) if days > 0 else ""
+            for path in [path for path in self._maps if os.path.basename(os.path.dirname(path)) < self._cutoff]:
+                # Unmapped once no running scan holds it
+                del self._maps[path]
+        return self._cutoff
+
+    def digits(self, symbol: str, time_ms: int) -> Optional[int]:
+        mapped = self._mapped(journal_path(self.root, symbol, day_of(time_ms)))
+        return mapped.digits if mapped is not None else None
+
+    def ticks(self, symbol: str, start_ms: int, end_ms: int) -> Iterator[Tick]:
+        """Ticks of a symbol with ``start_ms <= time_ms < end_ms``, oldest first"""
+        for day in _days_between(start_ms, end_ms - 1):
+            mapped = self._mapped(journal_path(self.root, symbol, day))
+            if mapped is not None:
+                yield from mapped.ticks(start_ms, end_ms)
+
+    def bars(self, symbol: str, start_ms: int, end_ms: int, timeframe_s: int) -> List[Dict]:
+        """OHLC bars of the mid price (``time`` is the bar's open, epoch seconds); empty periods are skipped"""
+        bars = []
+        bar_ms = timeframe_s * 1000
+        digits = None
+        current, bucket = None, None
+        for tick in self.ticks(symbol, start_ms, end_ms):
+            if digits is None:
+                digits = self.digits(symbol, tick.time_ms) or 5
+            price = round((tick.bid + tick.ask) / 2, digits)
+            tick_bucket = tick.time_ms - tick.time_ms % bar_ms
+            if tick_bucket != bucket:
+                bucket = tick_bucket
+                current = {"time": bucket // 1000, "open": price, "high": price, "low": price, "close": price, "ticks": 0}
+                bars.append(current)
+            if price > current["high"]:
+                current["high"] = price
+            elif price < current["low"]:
+                current["low"] = price
+            current["close"] = price
+            current["ticks"] += 1
+        return bars
+
+    def replay(self, symbols: Iterable[str], start_ms: int, end_ms: int) -> Iterator[Tuple[str, Tick]]:
+        """(symbol, tick) for several symbols merged in time order, e.g. to re-run a session"""
+        streams = [self._keyed(symbol, start_ms, end_ms) for symbol in dict.fromkeys(symbol.upper() for symbol in symbols)]
+        for _, symbol, tick in heapq.merge(*streams):
+            yield symbol, tick
+
+    def _keyed(self, symbol: str, start_ms: int, end_ms: int) -> Iterator[Tuple[int, str, Tick]]:
+        for tick in self.ticks(symbol, start_ms, end_ms):
+            yield tick.time_ms, symbol, tick
+
+    def close(self):
+        with self._lock:
+            self._maps.clear()
+
+# Global instances
+tick_journal = TickJournal()
+tick_journal_reader = TickJournalReader()
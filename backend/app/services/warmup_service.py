@@ -0,0 +1,104 @@
+"""
+Warm-up Service for WidgetForge
+
+Start-up stage run from the FastAPI lifespan so the first widget requests after
+a restart do not pay for cold work (auth DB open, calendar parsing, news fetch,
+chart DB open, template compilation). Steps run one after another in a worker
+thread while the server is already accepting connections:
+
+* ``/ping`` is liveness and answers immediately,
+* ``/ready`` answers 503 until every step has finished (or failed / timed out),
+  so a load balancer only routes traffic to warm workers.
+
+A failed step is reported in ``/ready`` but does not keep the worker out of
+rotation; the request path still does the work on demand. Disable with
+``WARMUP_ENABLED=false``; ``WARMUP_STEP_TIMEOUT`` bounds each step (seconds).
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics_service import metrics
+
+logger = logging.getLogger(__name__)
+
+WARMUP_DURATION = metrics.gauge("widgetforge_warmup_seconds", "Duration of the last start-up warm-up step", ["step"])
+
+class WarmupService:
+    def __init__(self):
+        self.state = "pending"  # pending -> warming -> ready
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._steps: List[Tuple[str, Callable]] = []
+        self._results: Dict[str, Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        # Read lazily so values from .env (loaded after imports) are honoured
+        return os.getenv("WARMUP_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+
+    @property
+    def step_timeout(self) -> float:
+        return float(os.getenv("WARMUP_STEP_TIMEOUT", "30"))
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def register(self, name: str, step: Callable):
+        """Add a blocking warm-up step (runs in a worker thread, in registration order)"""
+        self._steps.append((name, step))
+
+    async def start(self):
+        """Begin warming in the background (marks the worker ready at once when disabled)"""
+        if self._task is not None:
+            return
+        self.started_at = time.time()
+        if not self.enabled:
+            self.state = "ready"
+            self.finished_at = self.started_at
+            return
+        self.state = "warming"
+        self._task = asyncio.create_task(self._run(), name="warmup")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        for name, step in self._steps:
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(asyncio.to_thread(step), self.step_timeout)
+                self._results[name] = {"status": "ok", "result": result}
+            except asyncio.TimeoutError:
+                # The thread keeps going; the worker just stops waiting for it
+                self._results[name] = {"status": "timeout"}
+                logger.warning(f"Warm-up step {name} timed out after {self.step_timeout:.0f}s")
+            except Exception as e:
+                self._results[name] = {"status": "error", "error": str(e)}
+                logger.warning(f"Warm-up step {name} failed: {e}")
+            duration = time.perf_counter() - started
+            self._results[name]["seconds"] = round(duration, 3)
+            WARMUP_DURATION.labels(name).set(duration)
+
+        self.state = "ready"
+        self.finished_at = time.time()
+        logger.info(f"Warm-up finished in {self.finished_at - self.started_at:.2f}s")
+
+    def get_status(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "seconds": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            "steps": {name: dict(self._results.get(name, {"status": "pending"})) for name, _ in self._steps},
+        }
+
+# Global instance
+warmup_service = WarmupService()
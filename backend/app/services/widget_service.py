@@ -0,0 +1,255 @@
+"""
+Widget Render Service for WidgetForge
+
+Renders widget templates from a WidgetSchema and keeps the rendered HTML in a
+bounded in-memory LRU keyed by the canonical parameter set, so repeat loads of
+the same OBS browser-source URL never re-render the template. Cached entries
+carry a strong ETag and lazily built gzip/brotli bodies, so reloads are answered
+with a 304 or a precompressed body.
+
+Async routes use ``render_response_async``: a cache hit whose body is already
+encoded is answered on the event loop, while first renders and compression
+run in a worker thread.
+"""
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import Request
+from fastapi.responses import HTMLResponse, Response
+from fastapi.templating import Jinja2Templates
+
+from app.models.widget_models import WIDGET_SCHEMAS, WidgetSchema
+from app.services.preset_service import preset_registry
+
+try:
+    import brotli  # Optional: enables Content-Encoding: br
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
+
+# Brotli quality 11 costs ~10x the CPU of 9 for a few percent on HTML this size
+BROTLI_QUALITY = 9
+
+class RenderedWidget:
+    __slots__ = ("html", "template", "etag", "_bodies")
+
+    def __init__(self, html: str, template, etag: str):
+        self.html = html
+        self.template = template
+        self.etag = etag
+        self._bodies = {None: html.encode("utf-8")}
+
+    def body(self, encoding: Optional[str] = None) -> bytes:
+        """Get the response body for a content encoding, compressing once on first use"""
+        data = self._bodies.get(encoding)
+        if data is None:
+            raw = self._bodies[None]
+            if encoding == "br":
+                data = brotli.compress(raw, quality=BROTLI_QUALITY)
+            else:
+                data = gzip.compress(raw, compresslevel=9, mtime=0)
+            self._bodies[encoding] = data
+        return data
+
+    def has_body(self, encoding: Optional[str] = None) -> bool:
+        return encoding in self._bodies
+
+    def etag_for(self, encoding: Optional[str] = None) -> str:
+        """Strong ETag of an encoded variant (each encoding is a distinct representation)"""
+        if encoding is None:
+            return f'"{self.etag}"'
+        return f'"{self.etag}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Check an If-None-Match header against any variant of this widget"""
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            tag = tag.strip('"')
+            if tag == self.etag or tag.startswith(f"{self.etag}-"):
+                return True
+        return False
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported content encoding from an Accept-Encoding header"""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+class WidgetRenderService:
+    def __init__(self, max_entries: int = None):
+        self.templates = Jinja2Templates(directory=TEMPLATES_DIR)
+        self.max_entries = max_entries or int(os.getenv("WIDGET_RENDER_CACHE_SIZE", "256"))
+        self._cache: "OrderedDict[Tuple, RenderedWidget]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def build_context(self, schema: WidgetSchema, request: Request) -> Tuple[Tuple, Dict]:
+        """Resolve a request into (cache key, template context)"""
+        # ?preset=name supplies server-side defaults beneath the explicit params
+        context = schema.resolve(preset_registry.apply_preset(request.query_params))
+        extra = schema.request_context(request) if schema.request_context else {}
+        context.update(extra)
+
+        # url_for() in templates renders absolute URLs, so the base URL is part of the key
+        cache_key = (
+            schema.name,
+            str(request.base_url),
+            schema.canonical_key(context),
+            tuple(sorted(extra.items())),
+        )
+        return cache_key, context
+
+    def _lookup(self, cache_key: Tuple) -> Optional[RenderedWidget]:
+        with self._lock:
+            entry = self._cache.get(cache_key)
+            if entry is None:
+                return None
+            if not entry.template.is_up_to_date:
+                # Template file changed on disk, re-render
+                del self._cache[cache_key]
+                return None
+            self._cache.move_to_end(cache_key)
+            return entry
+
+    def _store(self, cache_key: Tuple, entry: RenderedWidget):
+        with self._lock:
+            self._cache[cache_key] = entry
+            self._cache.move_to_end(cache_key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def render(self, schema: WidgetSchema, request: Request) -> RenderedWidget:
+        """Render a widget, serving identical parameter sets from memory"""
+        cache_key, context = self.build_context(schema, request)
+
+        entry = self._lookup(cache_key)
+        if entry is not None:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        template = self.templates.get_template(schema.template)
+        html = template.render({**context, "request": request})
+
+        # ETag derives from the template version and the canonical parameters
+        template_version = os.stat(template.filename).st_mtime_ns if template.filename else 0
+        etag = hashlib.sha1(repr((template_version, cache_key)).encode("utf-8")).hexdigest()
+
+        entry = RenderedWidget(html, template, etag)
+        self._store(cache_key, entry)
+        return entry
+
+    def cached(self, schema: WidgetSchema, request: Request) -> Optional[RenderedWidget]:
+        """Rendered widget for a request if it is in the cache (no rendering)"""
+        entry = self._lookup(self.build_context(schema, request)[0])
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def render_response(self, schema: WidgetSchema, request: Request) -> Response:
+        """Render a widget as an HTML response honouring If-None-Match and Accept-Encoding"""
+        entry = self.render(schema, request)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        return self._response(entry, request, encoding)
+
+    async def render_response_async(self, schema: WidgetSchema, request: Request) -> Response:
+        """render_response() for async routes, keeping rendering and compression off the event loop"""
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        entry = self.cached(schema, request)
+        if entry is None:
+            return await asyncio.to_thread(self.render_response, schema, request)
+        if not entry.has_body(encoding):
+            await asyncio.to_thread(entry.body, encoding)
+        return self._response(entry, request, encoding)
+
+    def _response(self, entry: RenderedWidget, request: Request, encoding: Optional[str]) -> Response:
+        headers = {
+            "ETag": entry.etag_for(encoding),
+            "Vary": "Accept-Encoding",
+            # Browsers may keep the page but must revalidate (cheap 304) on reload
+            "Cache-Control": "no-cache",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and entry.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return HTMLResponse(entry.body(encoding), headers=headers)
+
+    def warm(self, app=None, base_url: Optional[str] = None) -> int:
+        """
+        Compile the widget templates and, given the public base URL, pre-render
+        each widget's default and preset configurations; returns pages rendered
+        """
+        for schema in WIDGET_SCHEMAS.values():
+            self.templates.get_template(schema.template)
+        if app is None or not base_url:
+            return 0
+
+        url = urlsplit(base_url)
+        queries = [""] + [f"preset={name}" for name in preset_registry.get_presets()]
+        rendered = 0
+        for schema in WIDGET_SCHEMAS.values():
+            for query in queries:
+                request = Request({
+                    "type": "http",
+                    "method": "GET",
+                    "scheme": url.scheme or "http",
+                    "path": f"/widgets/{schema.name}",
+                    "root_path": url.path.rstrip("/"),
+                    "query_string": query.encode("ascii"),
+                    "headers": [(b"host", url.netloc.encode("ascii"))],
+                    "app": app,
+                    "router": app.router,
+                })
+                self.render(schema, request)
+                rendered += 1
+        return rendered
+
+    def clear(self):
+        """Drop all rendered widgets"""
+        with self._lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict:
+        """Get render cache statistics"""
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+# Global instance
+widget_render_service = WidgetRenderService()
@@ -0,0 +1,75 @@
+/**
+ * Decoder for the packed /ws/price-stream protocol (see app/services/price_protocol.py).
+ *
+ * Usage:
+ *   const decoder = new PackedPriceDecoder();
+ *   ws.binaryType = 'arraybuffer';
+ *   ws.onmessage = (event) => {
+ *     const prices = decoder.decode(event.data);   // null for dictionary frames
+ *     if (prices) updatePrices(prices);
+ *   };
+ *
+ * decode() returns the full current list in the JSON protocol's shape
+ * ([{symbol, price, change_pct, spread}, ...]) so widgets need no other changes.
+ */
+(function (global) {
+  const FRAME_FULL = 1;
+  const HEADER_SIZE = 4;
+  const RECORD_SIZE = 26;
+
+  function orNull(value) {
+    return Number.isNaN(value) ? null : value;
+  }
+
+  class PackedPriceDecoder {
+    constructor() {
+      this.version = null;
+      this.symbols = [];
+      this.prices = new Map();
+    }
+
+    static streamUrl(url) {
+      return url + (url.includes('?') ? '&' : '?') + 'format=packed';
+    }
+
+    decode(data) {
+      if (typeof data === 'string') {
+        const message = JSON.parse(data);
+        if (message.type === 'symbols') {
+          this.version = message.version;
+          this.symbols = message.symbols;
+          this.prices = new Map();
+        }
+        return null;
+      }
+
+      const view = new DataView(data);
+      const frameType = view.getUint8(0);
+      const version = view.getUint8(1);
+      const count = view.getUint16(2, true);
+      if (version !== this.version) {
+        // Frame for a dictionary we have not seen; the server resends the dictionary first
+        return null;
+      }
+      if (frameType === FRAME_FULL) {
+        this.prices = new Map();
+      }
+
+      for (let i = 0; i < count; i++) {
+        const offset = HEADER_SIZE + i * RECORD_SIZE;
+        const symbol = this.symbols[view.getUint16(offset, true)];
+        if (symbol === undefined) continue;
+        this.prices.set(symbol, {
+          symbol: symbol,
+          price: orNull(view.getFloat64(offset + 2, true)),
+          change_pct: orNull(view.getFloat64(offset + 10, true)),
+          spread: orNull(view.getFloat64(offset + 18, true))
+        });
+      }
+
+      return Array.from(this.prices.values());
+    }
+  }
+
+  global.PackedPriceDecoder = PackedPriceDecoder;
+})(window);
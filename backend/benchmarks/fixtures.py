@@ -0,0 +1,107 @@
+"""
+Offline fixtures for WidgetForge benchmarks
+
+Serves canned RSS feeds in place of the live Financial Juice / MyFXBook /
+additional sources and writes a Forex Factory calendar whose dates are shifted
+around "now", so the rotation endpoint sees both past and upcoming events.
+"""
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, List
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEADLINES = [
+    "US CPI (YoY) Actual 3.1% Forecast 3.0% Previous 3.2%",
+    "ECB's Lagarde: Inflation outlook remains uncertain",
+    "UK GDP (MoM) Actual 0.2% Forecast 0.1%",
+    "Fed's Powell says rate cuts not imminent",
+    "US Initial Jobless Claims Actual 215K Forecast 220K",
+    "Oil prices rise as inventories draw",
+    "BoJ keeps policy rate unchanged",
+    "German PMI Actual 45.4 Forecast 44.8",
+    "US Retail Sales (MoM) Actual 0.6% Forecast 0.4%",
+    "Gold hits record high on central bank demand",
+]
+
+def build_rss(source: str, items: int = 50, now: datetime = None) -> bytes:
+    """Build an RSS 2.0 document with ``items`` entries spaced a few minutes apart"""
+    now = now or datetime.now(timezone.utc)
+    entries = []
+    for i in range(items):
+        title = HEADLINES[i % len(HEADLINES)]
+        if source == "Financial Juice":
+            title = f"FinancialJuice: {title}"
+        published = format_datetime(now - timedelta(minutes=3 * i))
+        entries.append(
+            "<item>"
+            f"<title>{title}</title>"
+            f"<link>https://example.com/{source.replace(' ', '').lower()}/{i}</link>"
+            f"<description>{title}</description>"
+            f"<pubDate>{published}</pubDate>"
+            f"<guid>{source}-{i}</guid>"
+            "</item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        f'<rss version="2.0"><channel><title>{source}</title>'
+        + "".join(entries)
+        + "</channel></rss>"
+    ).encode("utf-8")
+
+class FixtureResponse:
+    """Minimal stand-in for requests.Response"""
+    status_code = 200
+
+    def __init__(self, content: bytes):
+        self.content = content
+        self.text = content.decode("utf-8")
+
+    def raise_for_status(self):
+        pass
+
+class FixtureFeeds:
+    """Callable replacing requests.get for the RSS service's feed URLs"""
+
+    def __init__(self, rss_service, items: int = 50):
+        self.feeds: Dict[str, bytes] = {
+            rss_service.financial_juice_url: build_rss("Financial Juice", items),
+            rss_service.myfxbook_url: build_rss("MyFXBook", items),
+        }
+        for source_name, url in rss_service.additional_sources.items():
+            self.feeds[url] = build_rss(source_name, items)
+        self.calls = 0
+
+    def __call__(self, url, *args, **kwargs):
+        self.calls += 1
+        return FixtureResponse(self.feeds[url])
+
+def shifted_calendar(source_file: str = None) -> List[Dict]:
+    """Load the checked-in calendar and move it so its midpoint lands on now"""
+    source_file = source_file or os.path.join(BACKEND_DIR, "data", "ff_calendar_current.json")
+    with open(source_file, 'r', encoding='utf-8') as f:
+        events = json.load(f)
+
+    dates = [datetime.fromisoformat(e["date"]) for e in events if e.get("date")]
+    if not dates:
+        return events
+    midpoint = min(dates) + (max(dates) - min(dates)) / 2
+    offset = datetime.now(timezone.utc) - midpoint
+
+    shifted = []
+    for event in events:
+        event = dict(event)
+        if event.get("date"):
+            event["date"] = (datetime.fromisoformat(event["date"]) + offset).isoformat()
+        shifted.append(event)
+    return shifted
+
+def write_calendar(data_dir: str) -> str:
+    """Write a time-shifted ff_calendar_current.json into ``data_dir``"""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, "ff_calendar_current.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(shifted_calendar(), f)
+    return path
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+WidgetForge Benchmark Suite
+
+Runs the hot paths of the backend in-process against synthetic data, so results
+are reproducible without MT5, network access or a running server:
+
+  price_cache    get_price() reads from the shared diskcache
+  poller         one market poller pass (fetch + set_price) over 500 simulated symbols
+  ws_fanout      /ws/price-stream frames delivered to N concurrent clients
+  chart_history  /api/mt5/chart-history latency for several database sizes
+  rotation_data  /api/combined/rotation-data cold (empty cache) and warm
+  auth           middleware overhead: public route vs DB vs signed sessions
+  startup        cold import of app.main and first /ping, one fresh process per sample
+
+Usage (from the backend directory):
+  python benchmarks/run_benchmarks.py
+  python benchmarks/run_benchmarks.py --quick --only price_cache,ws_fanout
+  python benchmarks/run_benchmarks.py --compare benchmarks/results/<previous>.json
+
+Results are written to benchmarks/results/<timestamp>.json.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCH_DIR.parent
+
+# Isolate all cache/database writes and make cwd-relative paths in app.main resolve
+WORK_DIR = tempfile.mkdtemp(prefix="widgetforge-bench-")
+os.environ["WIDGETFORGE_CACHE_DIR"] = os.path.join(WORK_DIR, "cache")
+os.chdir(BACKEND_DIR)
+sys.path.insert(0, str(BACKEND_DIR))
+
+from fixtures import FixtureFeeds, write_calendar
+from tick_generator import TickGenerator
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def summarize(samples, total_seconds=None, unit_count=None):
+    """Latency statistics in milliseconds plus throughput"""
+    ordered = sorted(samples)
+    n = len(ordered)
+
+    def pct(p):
+        return ordered[min(n - 1, max(0, math.ceil(p / 100 * n) - 1))] * 1000
+
+    total = total_seconds if total_seconds is not None else sum(ordered)
+    return {
+        "count": n,
+        "mean_ms": round(sum(ordered) / n * 1000, 4),
+        "p50_ms": round(pct(50), 4),
+        "p95_ms": round(pct(95), 4),
+        "p99_ms": round(pct(99), 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+        "ops_per_sec": round((unit_count or n) / total, 1) if total else None,
+    }
+
+def measure(fn, iterations, warmup=5):
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def seed_prices(symbols, seed=42):
+    from app.services.cache_service import set_price
+    generator = TickGenerator(symbols, seed=seed)
+    for tick in generator.ticks(len(symbols)):
+        set_price(tick["symbol"], tick, expire=3600)
+
+def environment_info():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, timeout=10
+        ).stdout.strip() or None
+    except Exception:
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": commit,
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_price_cache(quick):
+    from app.services.cache_service import get_price, set_price
+
+    symbols = TickGenerator().symbols
+    seed_prices(symbols)
+    iterations = 2000 if quick else 20000
+    results = {}
+
+    state = {"i": 0}
+    def read():
+        get_price(symbols[state["i"] % len(symbols)])
+        state["i"] += 1
+    results["get_price"] = measure(read, iterations)
+
+    generator = TickGenerator(symbols, seed=7)
+    ticks = iter(generator.ticks(iterations + 10))
+    def write():
+        tick = next(ticks)
+        set_price(tick["symbol"], tick)
+    results["set_price"] = measure(write, iterations)
+    return results
+
+def bench_poller(quick):
+    # The pollers read their market data source from the environment on import
+    os.environ["MT5_BACKEND"] = "simulated"
+    os.environ.setdefault("MT5_SIM_SYMBOLS", "500")
+    from app.pollers import poller_market
+    from app.pollers.mt5_source import load_symbols
+
+    poller_market.mt5.initialize()
+    symbols = load_symbols(os.path.join(BACKEND_DIR, "app", "pollers", "symbols.txt"))
+    cycles = 3 if quick else 20
+
+    def cycle():
+        for symbol in symbols:
+            poller_market.set_price(symbol, poller_market.fetch_price(symbol))
+
+    samples = []
+    cycle()
+    for _ in range(cycles):
+        start = time.perf_counter()
+        cycle()
+        samples.append(time.perf_counter() - start)
+    return {"cycle": summarize(samples, unit_count=len(symbols) * cycles)}
+
+async def _ws_client(app, path, frames, latencies):
+    """Drive one websocket connection against the ASGI app in-process"""
+    inbox = asyncio.Queue()
+    outbox = asyncio.Queue()
+    await inbox.put({"type": "websocket.connect"})
+
+    scope = {
+        "type": "websocket", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "scheme": "ws", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80), "subprotocols": [],
+    }
+
+    async def receive():
+        return await inbox.get()
+
+    async def send(message):
+        outbox.put_nowait(message)
+
+    task = asyncio.create_task(app(scope, receive, send))
+    accepted = await outbox.get()
+    assert accepted["type"] == "websocket.accept", accepted
+
+    received = 0
+    last = time.perf_counter()
+    while received < frames:
+        message = await outbox.get()
+        if message["type"] != "websocket.send":
+            break
+        now = time.perf_counter()
+        latencies.append(now - last)
+        last = now
+        received += 1
+
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    return received
+
+def bench_ws_fanout(quick):
+    import app.main as main_module
+
+    seed_prices(main_module.preset_registry.get_symbols())
+    # Send frames back-to-back so the benchmark measures per-frame cost, not the sleep
+    original_interval = main_module.PRICE_STREAM_INTERVAL
+    main_module.PRICE_STREAM_INTERVAL = 0
+
+    frames = 20 if quick else 100
+    results = {}
+    try:
+        for clients in (1, 10, 50):
+            latencies = []
+
+            async def run():
+                return await asyncio.gather(*[
+                    _ws_client(main_module.app, "/ws/price-stream", frames, latencies)
+                    for _ in range(clients)
+                ])
+
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                delivered = sum(asyncio.run(run()))
+            elapsed = time.perf_counter() - start
+            results[f"clients_{clients}"] = summarize(latencies, elapsed, delivered)
+    finally:
+        main_module.PRICE_STREAM_INTERVAL = original_interval
+    return results
+
+def bench_chart_history(quick):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.cache_service import CACHE_DIR
+
+    db_path = os.path.join(CACHE_DIR, "chart_history.db")
+    client = TestClient(app)
+    iterations = 20 if quick else 100
+    sizes = (1_000, 10_000) if quick else (1_000, 10_000, 100_000)
+    results = {}
+
+    for size in sizes:
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        rows = TickGenerator(["EURUSD"]).history("EURUSD", size, int(time.time()))
+        with sqlite3.connect(db_path) as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS price_history (
+                    symbol TEXT,
+                    timestamp INTEGER,
+                    price REAL,
+                    PRIMARY KEY (symbol, timestamp)
+                )
+            ''')
+            conn.executemany(
+                "INSERT INTO price_history (symbol, timestamp, price) VALUES ('EURUSD', ?, ?)", rows
+            )
+
+        hours = size // 60 + 1
+        url = f"/api/mt5/chart-history/EURUSD?hours={hours}&max_points=180"
+
+        def request():
+            response = client.get(url)
+            assert response.status_code == 200, response.text
+
+        results[f"rows_{size}"] = measure(request, iterations, warmup=2)
+    return results
+
+def bench_rotation_data(quick):
+    import requests
+    from fastapi.testclient import TestClient
+    import app.services.rss_service as rss_module
+    from app.main import app
+    from app.services.cache_service import cache
+    from app.services.forex_factory_service import forex_factory_service
+
+    data_dir = os.path.join(WORK_DIR, "data")
+    write_calendar(data_dir)
+    original_data_dir = forex_factory_service.data_dir
+    forex_factory_service.data_dir = data_dir
+
+    feeds = FixtureFeeds(rss_module.rss_service)
+    # rss_service imports requests on first fetch, so patch the module itself
+    original_get = requests.get
+    requests.get = feeds
+
+    client = TestClient(app)
+    url = "/api/combined/rotation-data?news_count=8&events_count=8"
+    iterations = 10 if quick else 50
+    results = {}
+
+    def request():
+        response = client.get(url)
+        assert response.status_code == 200 and response.json()["success"], response.text
+
+    try:
+        def cold():
+            cache.clear()
+            request()
+        results["cold"] = measure(cold, iterations, warmup=1)
+        results["warm"] = measure(request, iterations * 5, warmup=2)
+    finally:
+        requests.get = original_get
+        forex_factory_service.data_dir = original_data_dir
+    return results
+
+def bench_auth(quick):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.models.auth_models import auth_db
+    from app.services.session_token_service import session_token_service
+
+    user = auth_db.get_user_by_email("bench@widgetforge.local") or auth_db.create_user(
+        "bench@widgetforge.local", "Benchmark", "benchmark-password", role="admin"
+    )
+    client = TestClient(app)
+    iterations = 200 if quick else 2000
+    results = {}
+
+    results["public_ping"] = measure(lambda: client.get("/ping"), iterations)
+
+    def authenticated(token):
+        def request():
+            response = client.get("/api/auth/current-user", headers={"cookie": f"session_token={token}"})
+            assert response.status_code == 200, response.text
+        return request
+
+    original_mode = os.environ.get("AUTH_SESSION_MODE")
+    try:
+        os.environ["AUTH_SESSION_MODE"] = "db"
+        session_token_service._mode = None
+        results["db_session"] = measure(authenticated(session_token_service.create_session(user)), iterations)
+
+        os.environ["AUTH_SESSION_MODE"] = "signed"
+        os.environ.setdefault("SESSION_SECRET", "benchmark-secret")
+        session_token_service._mode = None
+        results["signed_session"] = measure(authenticated(session_token_service.create_session(user)), iterations)
+    finally:
+        if original_mode is None:
+            os.environ.pop("AUTH_SESSION_MODE", None)
+        else:
+            os.environ["AUTH_SESSION_MODE"] = original_mode
+        session_token_service._mode = None
+    return results
+
+# Runs in a fresh interpreter per sample; prints import and first-request seconds
+STARTUP_PROBE = """
+import time
+import httpx
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+response = TestClient(app.main.app).get("/ping")
+assert response.status_code == 200, response.text
+print(imported - start, time.perf_counter() - imported)
+"""
+
+def bench_startup(quick):
+    runs = 3 if quick else 10
+    imports, first_requests, processes = [], [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True, timeout=120
+        ).stdout
+        processes.append(time.perf_counter() - start)
+        import_seconds, request_seconds = map(float, output.split()[-2:])
+        imports.append(import_seconds)
+        first_requests.append(request_seconds)
+    return {
+        "import_app_main": summarize(imports),
+        "first_ping": summarize(first_requests),
+        "process_total": summarize(processes),
+    }
+
+BENCHMARKS = {
+    "price_cache": bench_price_cache,
+    "poller": bench_poller,
+    "ws_fanout": bench_ws_fanout,
+    "chart_history": bench_chart_history,
+    "rotation_data": bench_rotation_data,
+    "auth": bench_auth,
+    "startup": bench_startup,
+}
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def print_results(results):
+    print(f"\n{'benchmark':<40} {'p50 ms':>10} {'p99 ms':>10} {'ops/s':>12}")
+    print("-" * 75)
+    for name, stats in results.items():
+        print(f"{name:<40} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f} {stats['ops_per_sec'] or 0:>12.1f}")
+
+def print_comparison(results, baseline_file):
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)["results"]
+
+    print(f"\nComparison against {baseline_file} (p50, negative is faster)")
+    print(f"{'benchmark':<40} {'before':>10} {'after':>10} {'change':>10}")
+    print("-" * 73)
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            print(f"{name:<40} {'-':>10} {stats['p50_ms']:>10.3f} {'new':>10}")
+            continue
+        before, after = previous["p50_ms"], stats["p50_ms"]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{name:<40} {before:>10.3f} {after:>10.3f} {change:>+9.1f}%")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the WidgetForge benchmark suite")
+    parser.add_argument("--only", help="Comma-separated benchmark names: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--quick", action="store_true", help="Fewer iterations (smoke run)")
+    parser.add_argument("--output", default=str(BENCH_DIR / "results"), help="Directory for result JSON")
+    parser.add_argument("--compare", help="Previous result JSON to compare against")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    results = {}
+    for name in selected:
+        print(f"Running {name}...")
+        for case, stats in BENCHMARKS[name](args.quick).items():
+            results[f"{name}.{case}"] = stats
+
+    print_results(results)
+
+    os.makedirs(args.output, exist_ok=True)
+    output_file = os.path.join(args.output, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({"environment": environment_info(), "quick": args.quick, "results": results}, f, indent=2)
+    print(f"\nResults written to {output_file}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Synthetic tick generator for WidgetForge benchmarks
+
+Produces deterministic random-walk quotes in the same shape the MT5 poller writes
+to the price cache (see app/pollers/poller_market.py::fetch_price), so benchmarks
+can run without a MetaTrader 5 terminal.
+"""
+import random
+from typing import Dict, Iterator, List
+
+from app.models.price_models import PriceRecord
+
+DEFAULT_SYMBOLS = ["EURUSD", "GBPUSD", "USDJPY", "XAUUSD", "US30", "NAS100", "BTCUSD", "USOIL"]
+
+# Rough price levels so digits/spreads look like real instruments
+BASE_PRICES = {
+    "EURUSD": (1.0850, 5),
+    "GBPUSD": (1.2700, 5),
+    "USDJPY": (151.20, 3),
+    "XAUUSD": (2350.0, 2),
+    "US30": (39000.0, 1),
+    "NAS100": (18000.0, 1),
+    "BTCUSD": (65000.0, 2),
+    "USOIL": (78.50, 3),
+}
+
+class TickGenerator:
+    def __init__(self, symbols: List[str] = None, seed: int = 42):
+        self.symbols = symbols or DEFAULT_SYMBOLS
+        self.random = random.Random(seed)
+        self.state: Dict[str, Dict] = {}
+        self.seq = 0
+        for symbol in self.symbols:
+            price, digits = BASE_PRICES.get(symbol, (100.0, 2))
+            self.state[symbol] = {"price": price, "prev_close": price, "digits": digits}
+
+    def next_tick(self, symbol: str) -> PriceRecord:
+        """Advance one symbol by a random step and return a cache-ready price record"""
+        state = self.state[symbol]
+        step = state["price"] * self.random.gauss(0, 0.0002)
+        state["price"] = max(state["price"] + step, 10 ** -state["digits"])
+
+        digits = state["digits"]
+        point = 10 ** -digits
+        spread = self.random.randint(1, 20)
+        bid = round(state["price"], digits)
+        ask = round(bid + spread * point, digits)
+        self.seq += 1
+
+        return PriceRecord(symbol, bid, ask, digits, state["prev_close"], seq=self.seq)
+
+    def ticks(self, count: int) -> Iterator[PriceRecord]:
+        """Yield ``count`` ticks round-robin across all symbols"""
+        for i in range(count):
+            yield self.next_tick(self.symbols[i % len(self.symbols)])
+
+    def history(self, symbol: str, points: int, end_ts: int, interval: int = 60) -> List[tuple]:
+        """Build (timestamp, price) rows for chart_history.db ending at ``end_ts``"""
+        rows = []
+        start = end_ts - points * interval
+        for i in range(points):
+            rows.append((start + i * interval, self.next_tick(symbol)["price"]))
+        return rows
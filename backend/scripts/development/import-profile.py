@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Import-Time Profile
+Reports which modules make `import app.main` (worker start-up) slow
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+def profile_imports(target: str):
+    """Run `python -X importtime -c "import <target>"` in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, env=os.environ.copy()
+    )
+    if result.returncode != 0:
+        print(result.stderr, file=sys.stderr)
+        sys.exit(result.returncode)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time report for the WidgetForge backend")
+    parser.add_argument("--module", default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    total_ms = max(cumulative for _, _, cumulative in rows) / 1000
+
+    print(f"⏱️  import {args.module}: {total_ms:.1f} ms")
+
+    print(f"\n📦 Slowest imports (cumulative, top {args.top})")
+    for name, _, cumulative in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    print(f"\n🔥 Most expensive modules on their own (self, top {args.top})")
+    for name, self_us, _ in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:8.1f} ms  {name}")
+
+    print("\n🧩 WidgetForge modules (cumulative)")
+    for name, _, cumulative in sorted((row for row in rows if row[0].startswith("app.")),
+                                      key=lambda row: row[2], reverse=True):
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+@echo off
+title WidgetForge Backend - Supervised Mode
+color 0A
+echo.
+echo =========================================
+echo  WidgetForge Backend - Supervised Mode
+echo =========================================
+echo.
+echo Running the API with all pollers in-process (POLLER_MODE=supervised).
+echo Do NOT start poller_market.py / chart_collector.py / forex_factory_poller.py separately.
+echo Use start-all-services.bat to go back to the multi-process layout.
+echo.
+
+REM Get the backend directory (two levels up from scripts\production)
+set "BACKEND_DIR=%~dp0..\.."
+cd /d "%BACKEND_DIR%"
+
+set POLLER_MODE=supervised
+
+REM Single worker: the pollers and the MT5 connection live in this process
+uvicorn app.main:app --host 0.0.0.0 --port 8000 --workers 1
+
+pause
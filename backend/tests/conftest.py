@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Make the backend package importable as `app` and keep tests away from the real .cache
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("WIDGETFORGE_CACHE_DIR", tempfile.mkdtemp(prefix="widgetforge-tests-"))
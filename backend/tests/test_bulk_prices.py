@@ -0,0 +1,77 @@
+import asyncio
+
+from app.models.price_models import PriceRecord, pack_records, unpack_records
+from app.services import price_hub as price_hub_module
+from app.services.cache_service import cache, get_price_snapshot, set_price, set_price_snapshot, PRICE_SNAPSHOT_KEY
+from app.services.json_service import loads
+from app.services.price_hub import PriceHub, get_latest_prices
+
+
+def _records(seq):
+    return [
+        PriceRecord("EURUSD", 1.08501, 1.08512, seq=seq),
+        PriceRecord("GBPUSD", 1.27001, 1.27012, seq=seq + 1),
+        PriceRecord("USDJPY", 151.203, 151.219, digits=3, seq=seq + 2),
+    ]
+
+
+def test_records_pack_into_one_value():
+    records = _records(10)
+    assert unpack_records(pack_records(records)) == records
+    assert unpack_records(b"") == []
+
+
+def test_latest_prices_come_from_one_snapshot(monkeypatch):
+    monkeypatch.setattr(price_hub_module, "price_hub", PriceHub())
+    records = _records(100)
+    set_price_snapshot(records)
+    # A per-symbol write after the pass does not leak into the batch
+    set_price("EURUSD", PriceRecord("EURUSD", 1.2, 1.2001, seq=500))
+
+    prices = get_latest_prices()
+    assert prices == {record.symbol: record for record in records}
+    assert get_price_snapshot() is get_price_snapshot()
+    assert get_latest_prices(["gbpusd", "XAUUSD"]) == {"gbpusd": records[1]}
+
+
+def test_latest_prices_prefer_the_hub(monkeypatch):
+    hub = PriceHub()
+    monkeypatch.setattr(price_hub_module, "price_hub", hub)
+
+    async def scenario():
+        hub.attach(asyncio.get_running_loop())
+        hub.publish_many({"eurusd": {"price": 1.1, "seq": 3}})
+        return get_latest_prices(), get_latest_prices(["EURUSD"])
+
+    set_price_snapshot(_records(100))
+    assert asyncio.run(scenario()) == ({"EURUSD": {"price": 1.1, "seq": 3}}, {"EURUSD": {"price": 1.1, "seq": 3}})
+
+
+def test_without_a_snapshot_symbols_are_read_one_by_one(monkeypatch):
+    monkeypatch.setattr(price_hub_module, "price_hub", PriceHub())
+    cache.delete(PRICE_SNAPSHOT_KEY)
+    set_price("AUDUSD", {"price": 0.65})
+    assert get_latest_prices(["AUDUSD"]) == {"AUDUSD": {"price": 0.65}}
+    assert get_latest_prices() == {}
+
+
+def test_bulk_endpoints_return_deltas_since_seq(monkeypatch):
+    from app import main
+
+    monkeypatch.setattr(price_hub_module, "price_hub", PriceHub())
+    set_price_snapshot(_records(100))
+
+    body = loads(main.get_prices("eurusd, USDJPY,XAUUSD").body)
+    assert body["count"] == 2 and body["seq"] == 102 and body["missing"] == ["XAUUSD"]
+    assert body["data"]["USDJPY"]["price"] == 151.211
+
+    delta = loads(main.get_all_prices(since_seq=100).body)
+    assert sorted(delta["data"]) == ["GBPUSD", "USDJPY"]
+    assert delta["seq"] == 102 and delta["since_seq"] == 100
+
+    # Nothing moved: empty delta, the cursor stays put
+    assert loads(main.get_all_prices(since_seq=102).body)["count"] == 0
+    assert loads(main.get_all_prices(since_seq=200).body)["seq"] == 200
+
+    paths = [getattr(route, "path", None) for route in main.app.routes]
+    assert paths.index("/price/all") < paths.index("/price/{symbol}")
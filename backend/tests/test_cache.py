@@ -1,4 +1,4 @@
-from backend.app.services.cache_service import (
+from app.services.cache_service import (
     set_price, get_price, set_account, get_account, clear_all_cache
 )
 
@@ -0,0 +1,95 @@
+from app.pollers.calendar_store import CalendarStore
+from app.services.calendar_diff import apply_diff, diff_calendars, event_key
+from app.services.forex_factory_service import ForexFactoryService
+
+
+def event(title, date, country="USD", **fields):
+    return {"title": title, "country": country, "date": date, "impact": "High", "forecast": "", **fields}
+
+
+def test_diff_detects_every_kind_of_change():
+    old = [
+        event("CPI m/m", "2025-07-22T08:30:00-04:00", forecast="0.2%"),
+        event("FOMC Statement", "2025-07-23T14:00:00-04:00"),
+        event("Bank Holiday", "2025-07-24T00:00:00-04:00", country="JPY"),
+    ]
+    new = [
+        event("CPI m/m", "2025-07-22T08:30:00-04:00", forecast="0.3%", actual="0.4%"),
+        event("FOMC Statement", "2025-07-24T14:00:00-04:00"),
+        event("GDP q/q", "2025-07-25T08:30:00-04:00"),
+    ]
+    diff = diff_calendars(old, new)
+
+    assert [e["title"] for e in diff["added"]] == ["GDP q/q"]
+    assert [e["title"] for e in diff["removed"]] == ["Bank Holiday"]
+    (move,) = diff["rescheduled"]
+    assert (move["from"], move["to"]) == ("2025-07-23T14:00:00-04:00", "2025-07-24T14:00:00-04:00")
+    (change,) = diff["changed"]
+    assert change["fields"] == {"forecast": ["0.2%", "0.3%"], "actual": ["", "0.4%"]}
+
+    index = {event_key(e): e for e in old}
+    assert apply_diff(index, diff) == {event_key(e): e for e in new}
+    # Applying the same diff again changes nothing
+    assert apply_diff(index, diff) == {event_key(e): e for e in new}
+
+
+def test_service_applies_change_log_incrementally(tmp_path):
+    store = CalendarStore(tmp_path)
+    service = ForexFactoryService()
+    service.data_dir = str(tmp_path)
+    notifications = []
+    service.subscribe(notifications.append)
+
+    first = [event("CPI m/m", "2099-07-22T08:30:00-04:00"), event("GDP q/q", "2099-07-25T08:30:00-04:00")]
+    store.save(first)
+    assert len(service.get_calendar_events()) == 2
+    assert notifications == []
+    before = service.refresh_index()
+    before_events = dict(before)
+
+    second = [event("CPI m/m", "2099-07-22T08:30:00-04:00", actual="0.4%"), first[1]]
+    store.save(second)
+    service.load_latest_calendar_data = None  # an incremental refresh must not re-read the file
+    events = {e["title"]: e for e in service.get_calendar_events()}
+    assert events["CPI m/m"]["actual"] == "0.4%"
+    assert notifications[-1]["changed"][0]["fields"] == {"actual": ["", "0.4%"]}
+    # Readers holding the previous index never see a partly applied diff
+    assert service.refresh_index() is not before and before == before_events
+
+    assert [entry["seq"] for entry in service.get_changes()] == [1, 2]
+    assert [entry["seq"] for entry in service.get_changes(1)] == [2]
+
+
+def test_poller_stores_actual_results_from_rss_once(tmp_path, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    from app.pollers.forex_factory_poller import ForexFactoryPoller
+    from app.services.rss_service import rss_service
+
+    poller = ForexFactoryPoller()
+    poller.data_dir = tmp_path
+    poller.store = CalendarStore(tmp_path)
+    released = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    upcoming = (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    poller.store.save([event("Consumer Price Index m/m", released), event("GDP q/q", upcoming)])
+
+    news = [{"guid": "n1", "title": "US consumer prices rise to 0.4%"}]
+    monkeypatch.setattr(rss_service, "fetch_all_economic_news", lambda limit=20: list(news))
+    monkeypatch.setattr(rss_service, "get_archived_economic_data", lambda days_back=7: [])
+
+    assert poller.update_actual_results()
+    cpi, gdp = poller.store.load_current()
+    assert (cpi["actual"], cpi["actual_source"]) == ("0.4%", "RSS")
+    assert "actual" not in gdp
+    (change,) = poller.store.last_diff["changed"]
+    assert change["fields"] == {"actual": ["", "0.4%"]}
+    assert poller.store.manifest["snapshots"] == poller.store.manifest["snapshots"][:1]
+
+    # The same feed item is not matched again
+    seq = poller.store.manifest["change_seq"]
+    assert poller.update_actual_results()
+    assert poller.store.manifest["change_seq"] == seq
+
+    # A weekly download without actuals keeps the stored one
+    kept = poller.carry_over_actuals([event("Consumer Price Index m/m", released), event("GDP q/q", upcoming)])
+    assert kept[0]["actual"] == "0.4%" and "actual" not in kept[1]
@@ -0,0 +1,56 @@
+import json
+
+from app.pollers.calendar_store import CalendarStore, content_hash
+
+
+def make_calendar(actual=""):
+    return [
+        {"title": "CPI m/m", "country": "USD", "date": "2025-07-22T08:30:00-04:00", "impact": "High", "actual": actual},
+        {"title": "Cash Rate", "country": "AUD", "date": "2025-07-23T00:30:00-04:00", "impact": "High"},
+    ]
+
+
+def test_save_is_compact_atomic_and_skips_unchanged(tmp_path):
+    store = CalendarStore(tmp_path, keep=10)
+    store.update_metadata(last_weekly_update="2025-07-20T18:00:00")
+
+    assert store.save(make_calendar(), source_url="https://example.com/ff.json")
+    raw = store.current_file.read_text(encoding="utf-8")
+    assert "\n" not in raw and json.loads(raw) == make_calendar()
+    assert not list(tmp_path.glob(".*.tmp"))
+
+    signature = store.current_file.stat().st_mtime_ns
+    # Same content with a different key order is still unchanged
+    reordered = [dict(reversed(list(event.items()))) for event in make_calendar()]
+    assert not store.save(reordered)
+    assert store.current_file.stat().st_mtime_ns == signature
+    assert len(store.manifest["snapshots"]) == 1
+
+    metadata = store.read_metadata()
+    # Saving calendar data no longer drops the weekly update time
+    assert metadata["last_weekly_update"] == "2025-07-20T18:00:00"
+    assert metadata["sha256"] == content_hash(make_calendar())
+    assert metadata["total_events"] == 2
+
+
+def test_retention_follows_manifest(tmp_path):
+    # Files from before the manifest existed are adopted into retention
+    for i in range(3):
+        (tmp_path / f"ff_calendar_2025010{i}_000000.json").write_text("[]")
+    store = CalendarStore(tmp_path, keep=2)
+    (tmp_path / "ff_calendar_current.json").write_text("[]")
+
+    backup = store.backup_current()
+    assert backup is not None and backup.exists()
+
+    store.save(make_calendar("0.3%"))
+    snapshots = [entry["file"] for entry in store.manifest["snapshots"]]
+    assert len(snapshots) == 2
+    assert sorted(path.name for path in tmp_path.glob("ff_calendar_2*.json")) == sorted(snapshots)
+
+    # A file written by the store is already kept as a snapshot: no extra backup
+    assert store.backup_current() is None
+
+    reloaded = CalendarStore(tmp_path, keep=2)
+    assert reloaded.current_hash() == content_hash(make_calendar("0.3%"))
+    assert not reloaded.save(make_calendar("0.3%"))
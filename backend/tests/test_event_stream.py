@@ -0,0 +1,47 @@
+import asyncio
+import json
+
+from app.services.event_stream import EventStreamHub, HEARTBEAT_MESSAGE
+
+
+def test_subscribers_share_one_computation_per_refresh():
+    calls = []
+
+    def produce():
+        calls.append(1)
+        return {"success": True, "data": ["same"]}
+
+    async def scenario():
+        hub = EventStreamHub()
+        first = hub.stream("topic", "news", produce, interval=0.05)
+        second = hub.stream("topic", "news", produce, interval=0.05)
+
+        message = await asyncio.wait_for(first.__anext__(), 2)
+        assert await asyncio.wait_for(second.__anext__(), 2) == message
+        await asyncio.sleep(0.2)
+
+        await first.aclose()
+        await second.aclose()
+        return message, hub.get_status()["topic"]
+
+    message, status = asyncio.run(scenario())
+
+    lines = message.decode().strip().split("\n")
+    assert lines[:2] == ["id: 1", "event: news"]
+    assert json.loads(lines[2][len("data: "):]) == {"success": True, "data": ["same"]}
+    # Unchanged payloads are recomputed once per interval but never re-sent
+    assert 2 <= len(calls) <= 6
+    assert status == {"subscribers": 0, "seq": 1, "running": False}
+
+
+def test_idle_stream_sends_heartbeat():
+    async def scenario():
+        hub = EventStreamHub()
+        messages = hub.stream("idle", "news", lambda: {"data": []}, interval=60, heartbeat=0.05)
+        received = [await messages.__anext__(), await messages.__anext__()]
+        await messages.aclose()
+        return received
+
+    received = asyncio.run(scenario())
+    assert received[0].startswith(b"id: 1")
+    assert received[1] == HEARTBEAT_MESSAGE
@@ -0,0 +1,22 @@
+import json
+from datetime import datetime, timezone
+
+from app.services.json_service import FastJSONResponse, dumps, loads
+
+
+def test_dumps_matches_fastapi_encoding():
+    published = datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc)
+    data = {"published": published, "price": 1.08765, "tags": {"fx"}, 1: None}
+
+    encoded = dumps(data)
+
+    assert isinstance(encoded, bytes)
+    assert loads(encoded) == {"published": "2024-05-01T12:30:00+00:00", "price": 1.08765, "tags": ["fx"], "1": None}
+
+
+def test_sorted_dumps_is_stable_and_response_renders_compact_json():
+    assert dumps({"b": 1, "a": 2}, sort_keys=True) == b'{"a":2,"b":1}'
+
+    response = FastJSONResponse({"success": True, "data": ["é"]})
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"success": True, "data": ["é"]}
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.services.metrics_service import HTTP_REQUEST_DURATION, HTTP_STREAM_DURATION, MetricsRegistry
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_latency_seconds", "Test latency", ["route"], buckets=(0.1, 1.0))
+    latency.labels("/ping").observe(0.05)
+    latency.labels("/ping").observe(0.5)
+    latency.labels("/ping").observe(5)
+
+    text = registry.render_families()["test_latency_seconds"]
+    assert '# TYPE test_latency_seconds histogram' in text
+    assert 'test_latency_seconds_bucket{route="/ping",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/ping",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{route="/ping",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="/ping"} 3' in text
+
+
+def test_untouched_metrics_are_not_rendered():
+    registry = MetricsRegistry()
+    registry.counter("test_unused_total", "Never incremented")
+    clients = registry.gauge("test_clients", "Clients", ["stream"])
+    clients.labels("price").inc()
+    clients.labels("price").dec()
+
+    families = registry.render_families()
+    assert "test_unused_total" not in families
+    assert 'test_clients{stream="price"} 0' in families["test_clients"]
+
+
+def test_event_streams_are_kept_out_of_request_latency():
+    async def endpoint(scope, receive, send):
+        scope["route"] = SimpleNamespace(path=scope["path"])
+        content_type = b"text/event-stream" if scope["path"].endswith("stream") else b"application/json"
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", content_type)]})
+        await send({"type": "http.response.body", "body": b"{}"})
+
+    async def call(path):
+        async def receive():
+            return {"type": "http.request"}
+
+        async def send(message):
+            pass
+
+        await MetricsMiddleware(endpoint)({"type": "http", "method": "GET", "path": path}, receive, send)
+
+    asyncio.run(call("/test/rotation-stream"))
+    asyncio.run(call("/test/rotation-data"))
+
+    assert HTTP_STREAM_DURATION.labels("GET", "/test/rotation-stream").count == 1
+    assert HTTP_REQUEST_DURATION.labels("GET", "/test/rotation-stream", 200).count == 0
+    assert HTTP_REQUEST_DURATION.labels("GET", "/test/rotation-data", 200).count == 1
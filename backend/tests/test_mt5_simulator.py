@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+
+from app.pollers.mt5_simulator import SimulatedMT5
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_simulator_is_deterministic_per_seed():
+    ticks = []
+    for _ in range(2):
+        clock = FakeClock()
+        mt5 = SimulatedMT5(seed=7, clock=clock)
+        mt5.initialize()
+        clock.now += 30
+        ticks.append(mt5.symbol_info_tick("EURUSD"))
+
+    assert ticks[0] == ticks[1]
+    assert ticks[0].ask > ticks[0].bid
+
+
+def test_simulator_bars_and_symbol_universe():
+    clock = FakeClock()
+    mt5 = SimulatedMT5(symbol_count=500, clock=clock)
+    mt5.initialize()
+
+    assert mt5.symbols_total() == 500
+    assert mt5.symbol_info_tick("SIM0499") is not None
+
+    bars = mt5.copy_rates_from_pos("EURUSD", mt5.TIMEFRAME_M15, 0, 96)
+    assert len(bars) == 96
+    assert all(b["low"] <= min(b["open"], b["close"]) and b["high"] >= max(b["open"], b["close"]) for b in bars)
+    assert [b["time"] for b in bars] == sorted(b["time"] for b in bars)
+
+    yesterday = datetime.fromtimestamp(clock.now - 86400, tz=timezone.utc)
+    assert len(mt5.copy_rates_from("EURUSD", mt5.TIMEFRAME_D1, yesterday, 1)) == 1
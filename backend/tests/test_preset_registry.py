@@ -0,0 +1,66 @@
+import json
+import os
+
+from app.models.widget_models import ENHANCED_TICKER_SCHEMA
+from app.services.preset_service import PresetRegistry, preset_registry
+
+
+def _write_presets(path, presets, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"presets": presets}, f)
+    os.utime(path, ns=(mtime, mtime))
+
+
+def _registry(tmp_path):
+    symbols = tmp_path / "symbols.txt"
+    symbols.write_text("EURUSD\nGBPUSD\n")
+    return PresetRegistry(str(tmp_path / "presets.json"), str(symbols), check_interval=0)
+
+
+def test_shipped_presets_reach_their_widget_params():
+    # updateAnimation in ticker_presets.json is the update_animation param
+    resolved = ENHANCED_TICKER_SCHEMA.resolve(preset_registry.apply_preset({"preset": "crypto-neon"}))
+    assert resolved["update_animation"] == "fade"
+    resolved = ENHANCED_TICKER_SCHEMA.resolve(preset_registry.apply_preset({"preset": "card-showcase"}))
+    assert resolved["update_animation"] == "slide"
+
+
+def test_query_params_override_preset_values(tmp_path):
+    registry = _registry(tmp_path)
+    _write_presets(registry.presets_file, {
+        "neon": {"name": "Neon", "config": {"fontColor": "#00ffff", "updateAnimation": "fade", "showLogo": True, "gridColumns": 4}},
+    }, 1_000_000_000)
+
+    merged = registry.apply_preset({"preset": "neon", "fontColor": "#ffffff"})
+    resolved = ENHANCED_TICKER_SCHEMA.resolve(merged)
+    assert resolved["font_color"] == "#ffffff"
+    assert (resolved["update_animation"], resolved["show_logo"], resolved["grid_columns"]) == ("fade", "true", "4")
+    resolved = ENHANCED_TICKER_SCHEMA.resolve(registry.apply_preset({"preset": "neon", "update_animation": "slide"}))
+    assert resolved["update_animation"] == "slide"
+
+
+def test_unknown_preset_leaves_params_unchanged(tmp_path):
+    registry = _registry(tmp_path)
+    _write_presets(registry.presets_file, {}, 1_000_000_000)
+    params = {"preset": "missing", "symbols": "EURUSD"}
+    assert registry.apply_preset(params) is params
+    assert registry.get_preset("missing") is None
+    assert registry.apply_preset({"symbols": "EURUSD"}) == {"symbols": "EURUSD"}
+
+
+def test_changed_files_are_reloaded(tmp_path):
+    registry = _registry(tmp_path)
+    _write_presets(registry.presets_file, {"dark": {"name": "Dark", "config": {"bgColor": "#000000"}}}, 1_000_000_000)
+    assert registry.apply_preset({"preset": "dark"})["bgColor"] == "#000000"
+    assert registry.get_symbols() == ["EURUSD", "GBPUSD"]
+
+    _write_presets(registry.presets_file, {"dark": {"name": "Dark", "config": {"bgColor": "#111111"}}}, 2_000_000_000)
+    (tmp_path / "symbols.txt").write_text("USDJPY\n")
+    assert registry.apply_preset({"preset": "dark"})["bgColor"] == "#111111"
+    assert registry.get_symbols() == ["USDJPY"]
+
+    # Invalid JSON mid-edit keeps the last good presets
+    with open(registry.presets_file, "w", encoding="utf-8") as f:
+        f.write("{")
+    os.utime(registry.presets_file, ns=(3_000_000_000, 3_000_000_000))
+    assert registry.apply_preset({"preset": "dark"})["bgColor"] == "#111111"
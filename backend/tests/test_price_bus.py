@@ -0,0 +1,61 @@
+import asyncio
+
+from app.services.price_bus import PriceBusPublisher, PriceBusSubscriber, bus_address, parse_address
+from app.services.price_hub import price_hub
+
+
+def test_bus_address_from_env(monkeypatch):
+    monkeypatch.delenv("PRICE_BUS", raising=False)
+    assert bus_address() is None
+    monkeypatch.setenv("PRICE_BUS", "on")
+    assert bus_address().endswith("price_bus.sock") or bus_address().startswith("tcp:")
+    monkeypatch.setenv("PRICE_BUS", "tcp:127.0.0.1:9000")
+    assert parse_address(bus_address())[1] == ("127.0.0.1", 9000)
+
+
+def test_workers_receive_snapshot_then_batches(monkeypatch, tmp_path):
+    address = f"unix:{tmp_path / 'bus.sock'}"
+    monkeypatch.setenv("PRICE_BUS", address)
+    publisher = PriceBusPublisher(address)
+    publisher.start()
+    publisher.publish({"EURUSD": {"price": 1.1}})
+
+    async def scenario():
+        subscribers = [PriceBusSubscriber(), PriceBusSubscriber()]
+        for subscriber in subscribers:
+            await subscriber.start()
+        try:
+            # A late joiner first gets the latest snapshot
+            for _ in range(100):
+                if price_hub.get("EURUSD") and publisher.subscriber_count == 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert price_hub.active
+            assert price_hub.get("EURUSD") == {"price": 1.1}
+
+            seq = price_hub.seq
+            await asyncio.to_thread(publisher.publish, {"EURUSD": {"price": 1.2}})
+            await price_hub.wait_for_update(seq, 1.0)
+            assert price_hub.get("EURUSD") == {"price": 1.2}
+            for _ in range(100):
+                if all(subscriber.last_seq == 2 for subscriber in subscribers):
+                    break
+                await asyncio.sleep(0.01)
+            assert [subscriber.last_seq for subscriber in subscribers] == [2, 2]
+
+            # Poller gone: workers fall back to the diskcache
+            await asyncio.to_thread(publisher.stop)
+            for _ in range(100):
+                if not any(subscriber.connected for subscriber in subscribers):
+                    break
+                await asyncio.sleep(0.01)
+            assert not price_hub.active
+        finally:
+            for subscriber in subscribers:
+                await subscriber.stop()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        publisher.stop()
+        price_hub.detach()
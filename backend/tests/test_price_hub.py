@@ -0,0 +1,54 @@
+import asyncio
+import threading
+
+from app.services.price_hub import PriceHub
+
+
+def test_price_hub_wakes_waiters_from_another_thread():
+    async def scenario():
+        hub = PriceHub()
+        hub.attach(asyncio.get_running_loop())
+        seq = hub.seq
+
+        waiter = asyncio.create_task(hub.wait_for_update(seq, timeout=5))
+        await asyncio.sleep(0)
+        threading.Thread(target=hub.publish_many, args=({"eurusd": {"price": 1.1}},)).start()
+
+        new_seq = await asyncio.wait_for(waiter, 2)
+        assert new_seq == seq + 1
+        assert hub.get("EURUSD") == {"price": 1.1}
+
+        # Nothing new published: the wait times out and returns the same seq
+        assert await hub.wait_for_update(new_seq, timeout=0.01) == new_seq
+
+    asyncio.run(scenario())
+
+
+def test_hub_prices_expire_like_the_cache(monkeypatch):
+    from app.services import price_hub as price_hub_module
+    from app.services.cache_service import PRICE_EXPIRE, cache, PRICE_SNAPSHOT_KEY
+
+    now = [1000.0]
+    hub = PriceHub(clock=lambda: now[0])
+    monkeypatch.setattr(price_hub_module, "price_hub", hub)
+    monkeypatch.setattr(price_hub_module, "get_price", lambda symbol: None)
+    cache.delete(PRICE_SNAPSHOT_KEY)
+
+    async def scenario():
+        hub.attach(asyncio.get_running_loop())
+        hub.publish_many({"EURUSD": {"price": 1.1}, "GBPUSD": {"price": 1.27}})
+        now[0] += PRICE_EXPIRE / 2
+        # Only EURUSD keeps quoting
+        hub.publish_many({"EURUSD": {"price": 1.2}})
+        assert price_hub_module.get_latest_prices() == {"EURUSD": {"price": 1.2}, "GBPUSD": {"price": 1.27}}
+
+        now[0] += PRICE_EXPIRE / 2 + 1
+        assert price_hub_module.get_latest_price("GBPUSD") is None
+        assert price_hub_module.get_latest_prices() == {"EURUSD": {"price": 1.2}}
+
+        # A stalled poller: nothing is served as current
+        now[0] += PRICE_EXPIRE
+        assert price_hub_module.get_latest_price("EURUSD") is None
+        assert price_hub_module.get_latest_prices(["EURUSD"]) == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,129 @@
+import importlib
+from types import SimpleNamespace
+
+from app.models.price_models import PriceRecord, as_price_record, stream_entry
+from app.pollers.mt5_simulator import SimulatedMT5
+from app.pollers.mt5_source import ServerClock
+from app.services.cache_service import get_price, set_price
+from app.services.json_service import dumps, loads
+
+
+def test_record_rounds_to_digits_and_round_trips():
+    record = PriceRecord("USDJPY", 151.2034, 151.2191, digits=3, prev_close=150.0, time_ms=1_700_000_000_123, seq=9)
+    assert (record.bid, record.ask, record.price, record.spread) == (151.203, 151.219, 151.211, 0.016)
+    assert record.change_pct == 0.81
+    assert record["price"] == record.get("price") == 151.211
+    assert record.get("timestamp", "n/a") == "n/a"
+
+    decoded = PriceRecord.unpack(record.pack())
+    assert decoded == record
+    assert decoded.to_dict() == record.to_dict()
+    assert as_price_record(record.to_dict()) == record
+
+    # Unknown previous close survives the struct as None
+    assert PriceRecord.unpack(PriceRecord("X", 1.0, 1.1, digits=1).pack()).change_pct is None
+
+
+def test_wire_forms_are_built_once_and_shared():
+    record = PriceRecord("EURUSD", 1.08501, 1.08512, prev_close=1.08)
+    assert record.to_json() is record.to_json()
+    assert loads(record.to_json())["time_ms"] == record.time_ms
+    assert loads(dumps({"prices": {"EURUSD": record}}))["prices"]["EURUSD"] == loads(record.to_json())
+    assert stream_entry("EURUSD", record) is record.stream_dict()
+    assert stream_entry("EURUSD", {"price": 1.1}) == {"symbol": "EURUSD", "price": 1.1, "change_pct": None, "spread": None}
+
+
+def test_price_cache_stores_packed_records():
+    record = PriceRecord("GBPUSD", 1.27001, 1.27012, prev_close=1.26)
+    set_price("gbpusd", record)
+    assert get_price("GBPUSD") == record
+    # Repeated reads of the same tick reuse the decoded record
+    assert get_price("GBPUSD") is get_price("GBPUSD")
+
+
+class FixedQuotes:
+    TIMEFRAME_D1 = 16408
+
+    def __init__(self):
+        self.bid, self.ask = 1.08501, 1.08512
+
+    def symbol_info_tick(self, symbol):
+        return SimpleNamespace(bid=self.bid, ask=self.ask, time_msc=1_700_000_000_000)
+
+    def symbol_info(self, symbol):
+        return SimpleNamespace(digits=5)
+
+    def copy_rates_from(self, symbol, timeframe, date_from, count):
+        return [{"close": 1.08}]
+
+
+def test_poller_keeps_sequence_for_unchanged_quotes(monkeypatch):
+    monkeypatch.setenv("MT5_BACKEND", "simulated")
+    poller_market = importlib.import_module("app.pollers.poller_market")
+    quotes = FixedQuotes()
+    monkeypatch.setattr(poller_market, "mt5", quotes)
+    monkeypatch.setattr(poller_market, "_last_records", {})
+    monkeypatch.setattr(poller_market, "_digits", {})
+    monkeypatch.setattr(poller_market, "server_clock", ServerClock("0"))
+
+    first = poller_market.fetch_price("EURUSD")
+    again = poller_market.fetch_price("EURUSD")
+    quotes.ask = 1.08515
+    moved = poller_market.fetch_price("EURUSD")
+
+    assert isinstance(first, PriceRecord) and first.time_ms == 1_700_000_000_000
+    assert again.seq == first.seq
+    assert moved.seq > first.seq and moved.spread == 0.00014
+
+
+class FakeClock:
+    def __init__(self, now=1_772_600_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _server_time_poller(monkeypatch, server_offset, clock):
+    monkeypatch.setenv("MT5_BACKEND", "simulated")
+    poller_market = importlib.import_module("app.pollers.poller_market")
+    simulator = SimulatedMT5(server_offset=server_offset, clock=clock)
+    simulator.initialize()
+    monkeypatch.setattr(poller_market, "mt5", simulator)
+    monkeypatch.setattr(poller_market, "_last_records", {})
+    monkeypatch.setattr(poller_market, "_digits", {})
+    return poller_market
+
+
+def test_server_time_ticks_are_stamped_in_utc(monkeypatch):
+    clock = FakeClock()
+    poller_market = _server_time_poller(monkeypatch, 3, clock)
+    now_ms = int(clock.now * 1000)
+
+    # Detected from the ticks
+    monkeypatch.setattr(poller_market, "server_clock", ServerClock("auto", clock=clock))
+    assert poller_market.fetch_price("EURUSD").time_ms == now_ms
+    poller_market.server_clock.end_pass()
+    assert poller_market.server_clock.offset_ms == 3 * 3_600_000
+
+    # Configured
+    monkeypatch.setattr(poller_market, "server_clock", ServerClock("3"))
+    assert poller_market.fetch_price("GBPUSD").time_ms == now_ms
+
+
+def test_server_offset_detection_ignores_stale_ticks(monkeypatch):
+    clock = FakeClock()
+    server_clock = ServerClock("auto", clock=clock)
+    now_ms = int(clock.now * 1000)
+    server_now = now_ms + 2 * 3_600_000
+
+    # A quote last updated 20 minutes ago, then a fresh one: the fresh one wins at the end of the pass
+    server_clock.to_utc(server_now - 20 * 60_000)
+    assert server_clock.to_utc(server_now) in (now_ms, now_ms + 1_800_000)
+    server_clock.end_pass()
+    assert server_clock.to_utc(server_now) == now_ms
+
+    # A weekend: every tick is days old, the known offset is kept
+    server_clock.to_utc(server_now - 2 * 86_400_000)
+    server_clock.end_pass()
+    assert server_clock.offset_ms == 2 * 3_600_000
@@ -0,0 +1,80 @@
+import json
+import math
+
+from app.models.price_models import PriceRecord, stream_entry
+from app.services.price_protocol import FRAME_DELTA, FRAME_FULL, HEADER, RECORD, PackedPriceEncoder, wants_packed
+
+
+def decode(frame):
+    frame_type, version, count = HEADER.unpack_from(frame)
+    records = [RECORD.unpack_from(frame, HEADER.size + i * RECORD.size) for i in range(count)]
+    return frame_type, version, records
+
+
+def test_dictionary_then_full_then_changes_only():
+    encoder = PackedPriceEncoder()
+    prices = {
+        "EURUSD": {"price": 1.08765, "change_pct": 0.12, "spread": 1.2},
+        "USDJPY": {"price": 151.234, "change_pct": None, "spread": 1.5},
+    }
+
+    dictionary, frame = encoder.encode(["EURUSD", "USDJPY"], prices)
+    assert json.loads(dictionary) == {"type": "symbols", "version": 1, "symbols": ["EURUSD", "USDJPY"]}
+    frame_type, version, records = decode(frame)
+    assert (frame_type, version, len(records)) == (FRAME_FULL, 1, 2)
+    assert records[0][:2] == (0, 1.08765)
+    assert math.isnan(records[1][2])
+
+    # Unchanged symbols are not resent
+    prices["USDJPY"] = {"price": 151.240, "change_pct": None, "spread": 1.5}
+    (frame,) = encoder.encode(["EURUSD", "USDJPY"], prices)
+    frame_type, _, records = decode(frame)
+    assert frame_type == FRAME_DELTA
+    assert [record[:2] for record in records] == [(1, 151.240)]
+    assert len(encoder.encode(["EURUSD", "USDJPY"], prices)[0]) == HEADER.size
+
+    # A new symbol list resends the dictionary and a full snapshot
+    dictionary, frame = encoder.encode(["USDJPY"], prices)
+    assert json.loads(dictionary)["version"] == 2
+    assert decode(frame)[0] == FRAME_FULL
+
+
+def test_packed_and_json_frames_carry_the_same_values():
+    records = [
+        PriceRecord("EURUSD", 1.08501, 1.08513, prev_close=1.08, seq=1),
+        PriceRecord("GBPUSD", 1.27001, 1.27018, prev_close=1.2712, seq=2),
+        PriceRecord("EURGBP", 0.85401, 0.85404, seq=3),
+        PriceRecord("USDJPY", 151.203, 151.219, digits=3, prev_close=150.9, seq=4),
+    ]
+    symbols = [record.symbol for record in records]
+    json_entries = [stream_entry(record.symbol, record) for record in records]
+
+    (_, frame) = PackedPriceEncoder().encode(symbols, {record.symbol: record for record in records})
+    # What packed_price_decoder.js does: float64 fields, NaN -> null
+    packed_entries = [
+        {"symbol": symbols[index], "price": price, "change_pct": None if math.isnan(change_pct) else change_pct,
+         "spread": None if math.isnan(spread) else spread}
+        for index, price, change_pct, spread in decode(frame)[2]
+    ]
+
+    assert packed_entries == json_entries
+    assert [entry["spread"] for entry in packed_entries[:3]] == [0.00012, 0.00017, 0.00003]
+
+
+def test_packed_frames_are_much_smaller_than_json():
+    symbols = [f"SYM{i:03d}" for i in range(100)]
+    prices = {symbol: {"price": 1.2345 + i, "change_pct": 0.25, "spread": 1.1} for i, symbol in enumerate(symbols)}
+    json_frame = json.dumps([{"symbol": s, **prices[s]} for s in symbols]).encode()
+
+    encoder = PackedPriceEncoder()
+    encoder.encode(symbols, prices)
+    prices["SYM007"] = {"price": 8.3, "change_pct": 0.3, "spread": 1.1}
+    (delta,) = encoder.encode(symbols, prices)
+
+    assert len(delta) * 10 < len(json_frame)
+
+
+def test_negotiation():
+    assert wants_packed(None, ["widgetforge.packed.v2"]) == (True, "widgetforge.packed.v2")
+    assert wants_packed("packed", []) == (True, None)
+    assert wants_packed(None, []) == (False, None)
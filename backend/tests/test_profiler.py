@@ -0,0 +1,27 @@
+import threading
+
+from app.services.profiler_service import SamplingProfiler
+
+
+def _busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampling_profiler_collapsed_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_worker, args=(stop,), name="busy worker")
+    worker.start()
+    try:
+        result = SamplingProfiler().sample(seconds=0.2, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result["samples"] > 0
+    lines = result["collapsed"].splitlines()
+    worker_lines = [line for line in lines if line.startswith("busy_worker;")]
+    assert worker_lines
+    stack, count = worker_lines[0].rsplit(" ", 1)
+    assert "_busy_worker_(tests/test_profiler.py" in stack
+    assert int(count) > 0
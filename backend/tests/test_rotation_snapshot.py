@@ -0,0 +1,68 @@
+import json
+
+from app.services import rotation_service
+from app.services.rotation_service import RotationSnapshot
+
+
+class FakeNews:
+    def __init__(self):
+        self.generation = 0
+        self.fetches = 0
+
+    def get_news_generation(self):
+        return self.generation
+
+    def fetch_all_economic_news(self, max_items):
+        self.fetches += 1
+        return [{"title": f"news {i}"} for i in range(max_items)]
+
+    def cross_reference_with_calendar(self, news_items, calendar_events):
+        return news_items
+
+    def get_recent_high_impact_news(self):
+        return None
+
+
+class FakeCalendar:
+    version = "v1"
+
+    def calendar_version(self):
+        return self.version
+
+    def get_recent_past_events(self, max_events, impact_filter):
+        return [{"title": f"past {i}", "country": "USD", "timestamp": 100 - i} for i in range(max_events)]
+
+    def get_upcoming_events(self, max_events, impact_filter):
+        return [{"title": f"next {i}", "country": "USD", "timestamp": 200 + i} for i in range(max_events)]
+
+    def get_todays_events(self):
+        return []
+
+
+def test_snapshot_rebuilds_only_when_inputs_change(monkeypatch):
+    news, calendar = FakeNews(), FakeCalendar()
+    monkeypatch.setattr(rotation_service, "rss_service", news)
+    monkeypatch.setattr(rotation_service, "forex_factory_service", calendar)
+    monkeypatch.setattr(rotation_service.time, "time", lambda: 1_700_000_000.0)
+    snapshot = RotationSnapshot()
+
+    body = snapshot.get_response_bytes(3, 8)
+    assert snapshot.peek_response_bytes(3, 8) is body
+    data = json.loads(body)["data"]
+    assert [item["title"] for item in data["news_feed"]["items"]] == ["news 0", "news 1", "news 2"]
+    # 6 upcoming events first, remaining slots filled with the most recent past events, in time order
+    assert [event["title"] for event in data["calendar_feed"]["items"]] == (
+        ["past 1", "past 0"] + [f"next {i}" for i in range(6)]
+    )
+
+    snapshot.get_data(20, 4)
+    assert snapshot.builds == 1 and news.fetches == 1
+
+    news.generation += 1
+    assert snapshot.peek_response_bytes(3, 8) is None
+    snapshot.get_data()
+    calendar.version = "v2"
+    snapshot.get_data()
+    monkeypatch.setattr(rotation_service.time, "time", lambda: 1_700_000_060.0)
+    snapshot.get_data()
+    assert snapshot.builds == 4
@@ -0,0 +1,122 @@
+import asyncio
+import os
+
+import pytest
+
+from app.models import auth_models
+from app.models.auth_models import AuthDatabase, LazyAuthDatabase
+from app.services import session_token_service as token_module
+from app.services.session_token_service import SessionTokenService
+
+
+def make_service(tmp_path, monkeypatch):
+    db = AuthDatabase(str(tmp_path / "auth.db"))
+    monkeypatch.setattr(token_module, "auth_db", db)
+    monkeypatch.setenv("AUTH_SESSION_MODE", "signed")
+    monkeypatch.setenv("SESSION_SECRET", "test-secret")
+    return SessionTokenService(), db
+
+
+def test_signed_session_roundtrip(tmp_path, monkeypatch):
+    service, db = make_service(tmp_path, monkeypatch)
+    user = db.create_user("trader@example.com", "Trader", "pw")
+
+    token = service.create_session(user)
+    assert service.is_signed_token(token)
+
+    claims = service.verify(token)
+    assert claims.user_id == user.id
+    assert claims.role == "trader"
+
+    light_user = service.get_session_user(token, full_profile=False)
+    assert light_user.id == user.id and light_user.role == "trader"
+    assert service.get_session_user(token).email == "trader@example.com"
+
+
+def test_signed_session_tampering_and_revocation(tmp_path, monkeypatch):
+    service, db = make_service(tmp_path, monkeypatch)
+    user = db.create_user("admin@example.com", "Admin", "pw", role="admin")
+    token = service.create_session(user)
+
+    body, signature = token.split(".")
+    assert service.verify(f"{body}x.{signature}") is None
+
+    assert service.end_session(token)
+    assert service.verify(token) is None
+
+    # A fresh login after logout is valid again
+    assert service.verify(service.create_session(user)) is not None
+
+
+def test_auth_db_opens_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth_models, "CACHE_DIR", str(tmp_path))
+    lazy_db = LazyAuthDatabase()
+    assert not lazy_db.initialized
+    assert not (tmp_path / "auth.db").exists()
+
+    assert lazy_db.get_user_by_email("nobody@example.com") is None
+    assert lazy_db.initialized
+    assert lazy_db.db_path == str(tmp_path / "auth.db")
+    assert (tmp_path / "auth_key.key").exists()
+
+
+def test_key_file_is_never_read_half_written(tmp_path, monkeypatch):
+    service, db = make_service(tmp_path, monkeypatch)
+    monkeypatch.delenv("SESSION_SECRET")
+    key_file = tmp_path / "session_secret.key"
+    real_link = token_module.os.link
+
+    def link(source, target):
+        # Another worker links its secret into place first
+        key_file.write_bytes(b"w" * token_module.SECRET_BYTES)
+        real_link(source, target)
+
+    monkeypatch.setattr(token_module.os, "link", link)
+    assert service._get_secret() == b"w" * token_module.SECRET_BYTES
+    # The temp file is gone
+    assert sorted(os.listdir(tmp_path)) == ["auth.db", "auth_key.key", "session_secret.key"]
+
+
+def test_short_key_file_is_refused(tmp_path, monkeypatch):
+    service, db = make_service(tmp_path, monkeypatch)
+    monkeypatch.delenv("SESSION_SECRET")
+    # What a worker saw between O_EXCL create and write in the old scheme
+    (tmp_path / "session_secret.key").write_bytes(b"")
+
+    with pytest.raises(RuntimeError, match="0 bytes"):
+        service._get_secret()
+    assert service._secret is None
+
+    (tmp_path / "session_secret.key").unlink()
+    assert len(service._get_secret()) == token_module.SECRET_BYTES
+
+
+def test_routes_need_no_user_row_and_password_change_revokes(tmp_path, monkeypatch):
+    from fastapi import Response
+
+    from app.routes import auth_routes
+
+    service, db = make_service(tmp_path, monkeypatch)
+    monkeypatch.setattr(auth_routes, "session_token_service", service)
+    monkeypatch.setattr(auth_routes, "auth_db", db)
+    user = db.create_user("trader@example.com", "Trader", "old-pw")
+    token, other_token = service.create_session(user), service.create_session(user, expires_hours=1)
+
+    row_reads = []
+    get_user_by_id = db.get_user_by_id
+    monkeypatch.setattr(db, "get_user_by_id", lambda user_id: row_reads.append(user_id) or get_user_by_id(user_id))
+
+    # Authenticated routes resolve signed tokens from the claims alone
+    light_user = auth_routes.require_auth(auth_routes.get_current_user(token))
+    assert light_user.id == user.id and light_user.role == "trader" and row_reads == []
+
+    profile = auth_routes.require_profile(light_user)
+    assert profile.email == "trader@example.com" and row_reads == [user.id]
+
+    response = Response()
+    request = auth_routes.ChangePasswordRequest(current_password="old-pw", new_password="new-pw")
+    asyncio.run(auth_routes.change_password(request, response, profile, token))
+
+    assert service.verify(token) is None and service.verify(other_token) is None
+    fresh_token = response.headers["set-cookie"].split(";")[0].split("=", 1)[1]
+    assert service.get_session_user(fresh_token).id == user.id
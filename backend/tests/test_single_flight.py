@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.single_flight import FLIGHT_CALLS, SingleFlight
+
+
+def test_concurrent_threads_share_one_computation():
+    flight = SingleFlight("test_threads")
+    calls = []
+    release = threading.Event()
+
+    def compute():
+        calls.append(1)
+        release.wait(2)
+        return {"value": 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("key", compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # Wait until every caller has joined the flight
+    for _ in range(200):
+        if FLIGHT_CALLS.labels("test_threads", "waiter").value == 7:
+            break
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 8
+    assert flight.in_flight() == 0
+    # The next miss computes again
+    assert flight.do("key", lambda: "fresh") == "fresh"
+
+
+def test_waiters_receive_the_leaders_exception():
+    flight = SingleFlight("test_errors")
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(2)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("key", fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(2)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    for _ in range(200):
+        if FLIGHT_CALLS.labels("test_errors", "waiter").value == 1:
+            break
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    waiter.join()
+    assert errors == ["upstream down", "upstream down"]
+
+
+def test_async_callers_coalesce_and_survive_cancellation():
+    flight = SingleFlight("test_async")
+    calls = []
+
+    async def query():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [1, 2, 3]
+
+    async def scenario():
+        first = asyncio.create_task(flight.do_async("chart", query))
+        await asyncio.sleep(0)
+        others = [asyncio.create_task(flight.do_async("chart", query)) for _ in range(4)]
+        await asyncio.sleep(0)
+        # The first caller going away does not cancel the shared query
+        first.cancel()
+        results = await asyncio.gather(*others)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return results
+
+    assert asyncio.run(scenario()) == [[1, 2, 3]] * 4
+    assert len(calls) == 1
+    assert flight.in_flight() == 0
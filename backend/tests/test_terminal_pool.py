@@ -0,0 +1,40 @@
+import asyncio
+import json
+
+from app.pollers.mt5_simulator import SimulatedMT5
+from app.pollers.terminal_pool import build_snapshot, get_terminal_snapshot, terminal_cache_key
+from app.routes.mt5_routes import get_multi_terminal_data
+from app.services.cache_service import set_account
+
+
+def test_build_snapshot_from_simulated_terminal():
+    mt5 = SimulatedMT5(seed=1)
+    mt5.initialize(path="C:/MT5Terminals/Account2/terminal64.exe")
+
+    snapshot = build_snapshot(mt5, 2)
+
+    assert snapshot["terminal_id"] == 2
+    assert snapshot["balance"] == snapshot["equity"]
+    assert snapshot["open_trades"] == []
+    assert snapshot["trade_count"] == 0
+
+
+def test_each_terminal_path_gets_its_own_account():
+    logins = set()
+    for terminal_id in (2, 3):
+        mt5 = SimulatedMT5(seed=1)
+        mt5.initialize(path=f"C:/MT5Terminals/Account{terminal_id}/terminal64.exe")
+        logins.add(mt5.account_info().login)
+
+    assert len(logins) == 2
+
+
+def test_multi_terminal_endpoint_serves_cached_snapshots():
+    set_account(terminal_cache_key(42), {"terminal_id": 42, "balance": 1000.0})
+
+    data = json.loads(asyncio.run(get_multi_terminal_data("42,43,abc")).body)
+
+    assert get_terminal_snapshot(42)["balance"] == 1000.0
+    assert data["terminals"] == {"42": {"terminal_id": 42, "balance": 1000.0}, "43": None}
+    assert data["status"]["43"] == {"status": "unknown"}
+    assert data["count"] == 1
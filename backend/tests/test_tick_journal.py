@@ -0,0 +1,162 @@
+import os
+
+from app.models.price_models import PriceRecord
+from app.services.tick_journal import (
+    HEADER, RECORD, TickJournal, TickJournalReader, journal_path,
+)
+
+# 2026-03-02 23:59:00 UTC
+START_MS = 1_772_495_940_000
+
+
+def _quote(symbol, offset_s, bid, seq, digits=5):
+    return PriceRecord(symbol, bid, bid + 0.0001, digits=digits, time_ms=START_MS + offset_s * 1000, seq=seq)
+
+
+def test_ticks_round_trip_across_days(tmp_path):
+    journal = TickJournal(str(tmp_path))
+    first = _quote("eurusd", 0, 1.1, seq=1)
+    assert journal.append_many([first, _quote("GBPUSD", 1, 1.27, seq=2)]) == 2
+    # An unchanged quote keeps its seq and is not journaled again
+    assert journal.append_many([first]) == 0
+    # After midnight UTC the next file starts
+    assert journal.append_many([_quote("EURUSD", 30, 1.1002, seq=3), _quote("EURUSD", 90, 1.1004, seq=4)]) == 2
+    journal.close()
+
+    assert os.path.exists(journal_path(str(tmp_path), "EURUSD", "20260302"))
+    assert os.path.exists(journal_path(str(tmp_path), "EURUSD", "20260303"))
+
+    reader = TickJournalReader(str(tmp_path))
+    ticks = list(reader.ticks("EURUSD", START_MS, START_MS + 3_600_000))
+    assert [tick.seq for tick in ticks] == [1, 3, 4]
+    assert ticks[0].bid == 1.1 and ticks[0].ask == 1.1001
+    # Half-open range, found by binary search
+    assert [tick.seq for tick in reader.ticks("EURUSD", START_MS + 30_000, START_MS + 90_000)] == [3]
+    assert list(reader.ticks("USDJPY", START_MS, START_MS + 60_000)) == []
+
+    replayed = [(symbol, tick.seq) for symbol, tick in reader.replay(["eurusd", "GBPUSD"], START_MS, START_MS + 3_600_000)]
+    assert replayed == [("EURUSD", 1), ("GBPUSD", 2), ("EURUSD", 3), ("EURUSD", 4)]
+
+
+def test_bars_are_rebuilt_from_ticks(tmp_path):
+    journal = TickJournal(str(tmp_path))
+    journal.append_many(_quote("USDJPY", offset, bid, seq=offset + 1, digits=3)
+                        for offset, bid in ((60, 150.0), (70, 150.2), (80, 149.9), (100, 150.1), (130, 150.3)))
+    journal.close()
+
+    bars = TickJournalReader(str(tmp_path)).bars("USDJPY", START_MS, START_MS + 600_000, 60)
+    assert bars == [
+        {"time": START_MS // 1000 + 60, "open": 150.0, "high": 150.2, "low": 149.9, "close": 150.1, "ticks": 4},
+        {"time": START_MS // 1000 + 120, "open": 150.3, "high": 150.3, "low": 150.3, "close": 150.3, "ticks": 1},
+    ]
+
+
+def test_partial_record_is_ignored_then_truncated(tmp_path):
+    journal = TickJournal(str(tmp_path))
+    journal.append_many([_quote("EURUSD", 0, 1.1, seq=1)])
+    journal.close()
+    path = journal_path(str(tmp_path), "EURUSD", "20260302")
+    with open(path, "ab") as file:
+        file.write(b"\x01" * 10)
+
+    reader = TickJournalReader(str(tmp_path))
+    assert [tick.seq for tick in reader.ticks("EURUSD", START_MS, START_MS + 60_000)] == [1]
+
+    # The writer reopens the file: cuts the partial record, keeps dedup state
+    journal = TickJournal(str(tmp_path))
+    assert journal.append_many([_quote("EURUSD", 0, 1.1, seq=1), _quote("EURUSD", 5, 1.1001, seq=2)]) == 1
+    journal.close()
+    assert os.path.getsize(path) == HEADER.size + 2 * RECORD.size
+    # Today's file grew: the reader maps it again
+    assert [tick.seq for tick in reader.ticks("EURUSD", START_MS, START_MS + 60_000)] == [1, 2]
+
+
+def test_tick_history_payload(tmp_path, monkeypatch):
+    from app.routes import mt5_routes
+
+    journal = TickJournal(str(tmp_path))
+    journal.append_many(_quote("EURUSD", offset, 1.1 + offset / 100_000, seq=offset + 1) for offset in range(10))
+    journal.close()
+    monkeypatch.setattr(mt5_routes, "tick_journal_reader", TickJournalReader(str(tmp_path)))
+
+    payload = mt5_routes._build_tick_history("EURUSD", START_MS, START_MS + 60_000, 0, 3)
+    assert payload["point_count"] == 3 and [tick["seq"] for tick in payload["data"]] == [8, 9, 10]
+    bars = mt5_routes._build_tick_history("EURUSD", START_MS, START_MS + 60_000, 60, 100)["data"]
+    assert len(bars) == 1 and bars[0]["ticks"] == 10
+
+
+def test_tick_history_lines_up_with_a_non_utc_server(tmp_path, monkeypatch):
+    import asyncio
+    import importlib
+    import time
+
+    from app.pollers.mt5_simulator import SimulatedMT5
+    from app.pollers.mt5_source import ServerClock
+    from app.routes import mt5_routes
+    from app.services.json_service import loads
+    from app.services.tick_journal import day_of
+
+    monkeypatch.setenv("MT5_BACKEND", "simulated")
+    poller_market = importlib.import_module("app.pollers.poller_market")
+    simulator = SimulatedMT5(server_offset=3)
+    simulator.initialize()
+    journal = TickJournal(str(tmp_path))
+    monkeypatch.setattr(poller_market, "mt5", simulator)
+    monkeypatch.setattr(poller_market, "server_clock", ServerClock("auto"))
+    monkeypatch.setattr(poller_market, "tick_journal", journal)
+    monkeypatch.setattr(poller_market, "_last_records", {})
+    monkeypatch.setattr(mt5_routes, "tick_journal_reader", TickJournalReader(str(tmp_path)))
+
+    before_ms = int(time.time() * 1000)
+    poller_market.poll_symbols(["EURUSD"], verbose=False)
+    journal.close()
+
+    # Stamped in UTC: filed under today's UTC day and inside the last minutes of the real clock
+    (day,) = os.listdir(tmp_path)
+    assert day in (day_of(before_ms), day_of(int(time.time() * 1000)))
+    body = loads(asyncio.run(mt5_routes.get_tick_history("EURUSD", minutes=5)).body)
+    assert body["point_count"] == 1
+    assert before_ms - 1000 <= body["data"][0]["time_ms"] <= int(time.time() * 1000)
+
+
+def test_prune_logs_days_it_cannot_remove(tmp_path, monkeypatch, caplog):
+    from app.services import tick_journal as tick_journal_module
+
+    for day in ("20260201", "20260220"):
+        (tmp_path / day).mkdir()
+        (tmp_path / day / "EURUSD.ticks").write_bytes(b"")
+    real_rmtree = tick_journal_module.shutil.rmtree
+
+    def rmtree(path, onerror=None):
+        if path.endswith("20260201"):
+            # What Windows does while a reader still maps the file
+            onerror(os.remove, os.path.join(path, "EURUSD.ticks"), (PermissionError, PermissionError(13, "in use"), None))
+            return
+        real_rmtree(path, onerror=onerror)
+
+    monkeypatch.setattr(tick_journal_module.shutil, "rmtree", rmtree)
+    monkeypatch.setenv("TICK_JOURNAL_RETENTION_DAYS", "7")
+    journal = TickJournal(str(tmp_path))
+    with caplog.at_level("WARNING", logger=tick_journal_module.__name__):
+        journal.append_many([_quote("EURUSD", 0, 1.1, seq=1)])
+    journal.close()
+
+    assert sorted(os.listdir(tmp_path)) == ["20260201", "20260302"]
+    assert "could not remove 20260201" in caplog.text and "in use" in caplog.text
+
+
+def test_reader_does_not_keep_expired_days_mapped(tmp_path, monkeypatch):
+    monkeypatch.setenv("TICK_JOURNAL_RETENTION_DAYS", "7")
+    journal = TickJournal(str(tmp_path))
+    journal.append_many([_quote("EURUSD", 0, 1.1, seq=1)])
+    journal.close()
+
+    reader = TickJournalReader(str(tmp_path))
+    # START_MS is long past the retention window of today's clock
+    assert [tick.seq for tick in reader.ticks("EURUSD", START_MS, START_MS + 60_000)] == [1]
+    assert reader._maps == {}
+
+    monkeypatch.setenv("TICK_JOURNAL_RETENTION_DAYS", "0")
+    reader = TickJournalReader(str(tmp_path))
+    assert [tick.seq for tick in reader.ticks("EURUSD", START_MS, START_MS + 60_000)] == [1]
+    assert len(reader._maps) == 1
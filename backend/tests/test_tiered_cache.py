@@ -0,0 +1,65 @@
+import time
+
+from diskcache import Cache
+
+from app.services import cache_service
+from app.services.cache_service import NamespaceLimits, TieredCache, namespace_of
+
+
+def make_cache(path, **limits):
+    return TieredCache(Cache(str(path)), {"default": NamespaceLimits(**limits)} if limits else None)
+
+
+def test_hot_reads_are_served_from_l1(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.set("financial_juice_news_50", [{"title": "CPI"}], expire=300)
+    for _ in range(5):
+        assert cache.get("financial_juice_news_50") == [{"title": "CPI"}]
+    stats = cache.stats()["default"]
+    assert (stats["l1_hits"], stats["l2_hits"], stats["misses"]) == (5, 0, 0)
+    assert cache.get("missing", 7) == 7
+    assert cache.stats()["default"]["misses"] == 1
+    assert namespace_of("price:EURUSD") == "price" and namespace_of("ff_todays_events_None_1") == "calendar"
+
+
+def test_l1_is_bounded_by_entries_and_bytes(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2, max_bytes=10_000, ttl=60)
+    for key in ("a", "b", "c"):
+        cache.set(key, key)
+    assert cache.stats()["default"]["entries"] == 2
+    # Evicted from L1, still in L2
+    assert cache.get("a") == "a"
+    assert cache.stats()["default"]["l2_hits"] == 1
+
+    cache.set("big", "x" * 20_000)
+    assert cache.get("big") == "x" * 20_000
+    assert cache.stats()["default"]["bytes"] <= 10_000
+
+
+def test_writes_from_other_processes_invalidate_l1(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_service, "VERSION_CHECK_INTERVAL", 0.05)
+    reader = make_cache(tmp_path)
+    writer = make_cache(tmp_path)  # stands in for another worker or a poller
+    writer.set("account:1", {"balance": 100})
+    assert reader.get("account:1") == {"balance": 100}
+
+    writer.set("account:1", {"balance": 250})
+    time.sleep(0.3)
+    assert reader.get("account:1") == {"balance": 250}
+    assert reader.stats()["account"]["invalidations"] == 1
+
+    # The reader's own writes do not invalidate what it holds
+    reader.set("account:2", {"balance": 5})
+    assert reader.get("account:1") == {"balance": 250}
+    assert reader.stats()["account"]["l1_hits"] >= 1
+
+
+def test_short_ttl_namespaces_expire_instead_of_stamping(tmp_path):
+    reader = make_cache(tmp_path)
+    writer = make_cache(tmp_path)
+    writer.set("price:EURUSD", {"bid": 1.1})
+    assert reader.get("price:EURUSD") == {"bid": 1.1}
+    writer.set("price:EURUSD", {"bid": 1.2})
+    time.sleep(cache_service.VERSION_CHECK_INTERVAL + 0.05)
+    assert reader.get("price:EURUSD") == {"bid": 1.2}
+    assert writer.disk.get("l1:version:price") is None
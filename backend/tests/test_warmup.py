@@ -0,0 +1,75 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from app.services import chart_history_service
+from app.services.chart_history_service import ChartHistoryDB
+from app.services.warmup_service import WarmupService
+
+
+def test_warmup_reports_ready_after_all_steps(monkeypatch):
+    monkeypatch.setenv("WARMUP_STEP_TIMEOUT", "0.2")
+    service = WarmupService()
+    service.register("ok", lambda: 3)
+    service.register("broken", lambda: 1 / 0)
+    service.register("slow", lambda: time.sleep(1))
+
+    async def scenario():
+        assert not service.ready
+        await service.start()
+        assert service.get_status()["state"] == "warming"
+        await service._task
+        return service.get_status()
+
+    status = asyncio.run(scenario())
+    assert status["ready"]
+    assert status["steps"]["ok"]["result"] == 3
+    assert status["steps"]["broken"]["status"] == "error"
+    assert status["steps"]["slow"]["status"] == "timeout"
+
+
+def test_warmup_disabled_is_ready_immediately(monkeypatch):
+    monkeypatch.setenv("WARMUP_ENABLED", "false")
+    service = WarmupService()
+    service.register("never", lambda: 1 / 0)
+    asyncio.run(service.start())
+    assert service.ready
+    assert service.get_status()["steps"]["never"]["status"] == "pending"
+
+
+def test_chart_db_pool_is_reused_until_file_is_replaced(monkeypatch, tmp_path):
+    monkeypatch.setattr(chart_history_service, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("CHART_DB_POOL_SIZE", "2")
+    path = str(tmp_path / "chart_history.db")
+
+    def create(price):
+        with sqlite3.connect(path) as conn:
+            conn.execute("CREATE TABLE price_history (symbol TEXT, timestamp INTEGER, price REAL)")
+            conn.execute("INSERT INTO price_history VALUES ('EURUSD', ?, ?)", (int(time.time()), price))
+
+    db = ChartHistoryDB()
+    assert not db.open()
+    create(1.1)
+    assert db.open()
+    pool = list(db._idle)
+    assert len(pool) == 2
+    assert db.query_history(db.find_path(), "EURUSD", 0)[0][1] == 1.1
+    assert sorted(map(id, db._idle)) == sorted(map(id, pool))
+
+    # Concurrent requests each get their own read-only connection
+    with db._connection(path) as first, db._connection(path) as second, db._connection(path) as third:
+        assert len({id(first), id(second), id(third)}) == 3
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            first.execute("DELETE FROM price_history")
+    # The pool keeps CHART_DB_POOL_SIZE idle connections
+    assert len(db._idle) == 2
+
+    # reset-chart-db.py deletes and recreates the file
+    (tmp_path / "chart_history.db").unlink()
+    create(1.2)
+    assert db.query_history(db.find_path(), "EURUSD", 0)[0][1] == 1.2
+    assert not set(map(id, db._idle)) & set(map(id, pool))
+    db.close()
+    assert db._idle == []
@@ -0,0 +1,113 @@
+import pytest
+
+from starlette.requests import Request
+
+from app.models.widget_models import CANVAS_TICKER_SCHEMA, ENHANCED_TICKER_SCHEMA
+from app.services.widget_service import WidgetRenderService
+
+
+def _request(query="", host="widgets.local:8000", headers=()):
+    from app.main import app
+
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/widgets/enhanced-ticker",
+        "root_path": "",
+        "query_string": query.encode("ascii"),
+        "headers": [(b"host", host.encode("ascii"))] + [(name.encode(), value.encode()) for name, value in headers],
+        "app": app,
+        "router": app.router,
+    })
+
+
+def test_identical_parameters_are_rendered_once():
+    service = WidgetRenderService(max_entries=8)
+    first = service.render(ENHANCED_TICKER_SCHEMA, _request("symbols=EURUSD&display_mode=grid"))
+    # Parameter order and invalid values do not change the key
+    again = service.render(ENHANCED_TICKER_SCHEMA, _request("display_mode=grid&itemLayout=diagonal&symbols=EURUSD"))
+    assert again is first
+    assert service.get_stats()["hits"] == 1 and service.get_stats()["misses"] == 1
+
+
+def test_base_url_is_part_of_the_key():
+    service = WidgetRenderService(max_entries=8)
+    local = service.render(CANVAS_TICKER_SCHEMA, _request("symbols=EURUSD", host="127.0.0.1:8000"))
+    public = service.render(CANVAS_TICKER_SCHEMA, _request("symbols=EURUSD", host="stream.example.com"))
+    assert public is not local
+    assert "stream.example.com" in public.html and "stream.example.com" not in local.html
+    assert service.get_stats()["entries"] == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    service = WidgetRenderService(max_entries=2)
+    eurusd = service.render(ENHANCED_TICKER_SCHEMA, _request("symbols=EURUSD"))
+    service.render(ENHANCED_TICKER_SCHEMA, _request("symbols=GBPUSD"))
+    # Touch EURUSD so GBPUSD becomes the oldest
+    assert service.render(ENHANCED_TICKER_SCHEMA, _request("symbols=EURUSD")) is eurusd
+    service.render(ENHANCED_TICKER_SCHEMA, _request("symbols=USDJPY"))
+
+    assert service.get_stats()["entries"] == 2
+    assert service.render(ENHANCED_TICKER_SCHEMA, _request("symbols=EURUSD")) is eurusd
+    misses = service.get_stats()["misses"]
+    service.render(ENHANCED_TICKER_SCHEMA, _request("symbols=GBPUSD"))
+    assert service.get_stats()["misses"] == misses + 1
+
+
+def _client():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    return TestClient(app)
+
+
+def test_etag_revalidation_answers_304():
+    client = _client()
+    url = "/widgets/enhanced-ticker?symbols=EURUSD,GBPUSD"
+    response = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.endswith('-gzip"')
+    assert response.headers["vary"] == "Accept-Encoding"
+
+    revalidated = client.get(url, headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert revalidated.status_code == 304 and revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+    # Weak comparison and lists of tags are accepted
+    assert client.get(url, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    # Different parameters are a different representation
+    assert client.get(url + ",USDJPY", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_gzip_variant_has_its_own_etag():
+    client = _client()
+    url = "/widgets/canvas-ticker?symbols=EURUSD"
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    gzipped = client.get(url, headers={"Accept-Encoding": "gzip;q=1.0, deflate"})
+
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert gzipped.text == plain.text
+    # A cached encoded copy still revalidates against the plain representation
+    assert client.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["etag"]}).status_code == 304
+
+
+def test_accept_encoding_negotiation(monkeypatch):
+    from app.services import widget_service
+
+    monkeypatch.setattr(widget_service, "brotli", None)
+    assert widget_service.negotiate_encoding("") is None
+    assert widget_service.negotiate_encoding("gzip;q=0, identity") is None
+    assert widget_service.negotiate_encoding("br, gzip") == "gzip"
+    assert widget_service.negotiate_encoding("GZIP;q=0.5") == "gzip"
+
+
+def test_brotli_variant():
+    pytest.importorskip("brotli")
+    client = _client()
+    url = "/widgets/smooth-ticker?symbols=EURUSD"
+    response = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["etag"].endswith('-br"')
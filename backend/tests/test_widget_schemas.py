@@ -0,0 +1,31 @@
+from app.models.widget_models import ENHANCED_TICKER_SCHEMA, WidgetParam
+
+
+def test_widget_param_validation():
+    assert WidgetParam("n", "n", 8, type="int").parse("abc") == 8
+    assert WidgetParam("n", "n", 8, type="int").parse("12") == 12
+    assert WidgetParam("b", "b", "false", type="bool").parse("TRUE") == "true"
+    assert WidgetParam("m", "m", "scroll", choices=("scroll", "grid")).parse("bogus") == "scroll"
+
+
+def test_schema_canonical_key_ignores_param_order_and_invalid_values():
+    first = ENHANCED_TICKER_SCHEMA.resolve({"symbols": "EURUSD", "display_mode": "grid"})
+    second = ENHANCED_TICKER_SCHEMA.resolve({"display_mode": "grid", "symbols": "EURUSD", "itemLayout": "diagonal"})
+    assert ENHANCED_TICKER_SCHEMA.canonical_key(first) == ENHANCED_TICKER_SCHEMA.canonical_key(second)
+
+
+def test_bool_params_normalise_to_template_strings():
+    param = WidgetParam("show_logo", "showLogo", "false", type="bool")
+    for raw in ("true", "1", "yes", "ON", " on "):
+        assert param.parse(raw) == "true"
+    # Anything else, including junk, is "false" rather than the default
+    for raw in ("false", "0", "no", "off", "junk", ""):
+        assert WidgetParam("show_spread", "showSpread", "true", type="bool").parse(raw) == "false"
+    assert param.parse(None) == "false"
+
+    resolved = ENHANCED_TICKER_SCHEMA.resolve({"showSpread": "no", "showLogo": "1"})
+    assert (resolved["show_spread"], resolved["show_logo"]) == ("false", "true")
+    # Spellings of the same flag share one cache key
+    assert ENHANCED_TICKER_SCHEMA.canonical_key(resolved) == ENHANCED_TICKER_SCHEMA.canonical_key(
+        ENHANCED_TICKER_SCHEMA.resolve({"showSpread": "off", "showLogo": "yes"})
+    )